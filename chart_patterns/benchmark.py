@@ -0,0 +1,352 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Benchmarks of the pivot points, the chart pattern detectors and the plotting, compared against a stored baseline.
+
+Run from the root of the repo:
+
+    python -m chart_patterns.chart_patterns.benchmark --output bench.json --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import numpy as np
+import os
+import pandas as pd
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+from chart_patterns.chart_patterns.doubles import find_doubles_pattern
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.head_and_shoulders_all import find_all_head_and_shoulders
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import find_inverse_head_and_shoulders
+from chart_patterns.chart_patterns.pennant import find_pennant
+from chart_patterns.chart_patterns.pivot_cache import PIVOT_CACHE
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
+from chart_patterns.chart_patterns.plotting import display_chart_pattern
+from chart_patterns.chart_patterns.triangles import find_triangle_pattern
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+
+# Version of the results file, a baseline with another version is not compared
+RESULTS_VERSION = 1
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "data", "eurusd-4h.csv")
+
+# The sizes of the slices of the data file, None is the whole file, and of the synthetic series
+SIZES           = [1_000, 10_000, None]
+SYNTHETIC_SIZES = [100_000]
+
+# The benchmarked functions and the column holding their matches
+DETECTORS: Dict[str, Tuple[Callable[[pd.DataFrame], pd.DataFrame], Union[None, str]]] = {
+    "pivots":   (find_all_pivot_points, None),
+    "flag":     (find_flag_pattern, "flag_point"),
+    "pennant":  (find_pennant, "pennant_point"),
+    "triangle": (lambda ohlc: find_triangle_pattern(ohlc, triangle_type="symmetrical"), "triangle_point"),
+    "double":   (lambda ohlc: find_doubles_pattern(ohlc, double="both"), "double_idx"),
+    "hs":       (find_head_and_shoulders, "hs_idx"),
+    "ihs":      (find_inverse_head_and_shoulders, "ihs_idx"),
+    "hs_all":   (find_all_head_and_shoulders, "chart_type"),
+}
+
+
+def synthetic_ohlc(size: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a random walk OHLC dataframe with the same columns as `data/eurusd-4h.csv`
+
+    :params size is the number of candlesticks
+    :type :int
+
+    :params seed is the seed of the random generator
+    :type :int
+
+    :return (pd.DataFrame)
+    """
+
+    rng    = np.random.default_rng(seed)
+    close  = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-3, size)))
+    open_  = np.concatenate([[1.1], close[:-1]])
+    spread = np.abs(rng.normal(0, 5e-4, size))
+
+    return pd.DataFrame({"Date":   pd.date_range("2000-01-01", periods=size, freq="4H").strftime("%d.%m.%Y %H:%M:%S.000"),
+                         "Open":   open_,
+                         "High":   np.maximum(open_, close) + spread,
+                         "Low":    np.minimum(open_, close) - spread,
+                         "Close":  close,
+                         "Volume": rng.uniform(1e4, 1e5, size)})
+
+
+def _count_matches(ohlc: pd.DataFrame, column: Union[None, str]) -> int:
+    """
+    Get the number of patterns found, or of pivot points for the pivots benchmark
+    """
+
+    if column is None:
+        return int((ohlc["pivot"] > 0).sum())
+
+    values = ohlc[column]
+    if column == "chart_type":
+        return int((values != "").sum())
+    if values.dtype == object:
+        return int((values.str.len() > 0).sum())
+
+    return int(values.notna().sum())
+
+
+def time_call(func: Callable[[], Any], repeat: int = 3) -> Tuple[float, int, Any]:
+    """
+    Time a function and measure its peak memory. The time is the best of `repeat` runs without memory tracing
+    and the peak memory is measured on one more run with `tracemalloc`. The pivot cache is cleared before each run.
+
+    :params func is the function to benchmark, called without arguments
+    :type :Callable[[], Any]
+
+    :params repeat is the number of timed runs
+    :type :int
+
+    :return (Tuple[float, int, Any]) the time in seconds, the peak memory in bytes and the output of the last run
+    """
+
+    seconds = np.inf
+    for _ in range(max(repeat, 1)):
+        PIVOT_CACHE.clear()
+        start   = time.perf_counter()
+        output  = func()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    PIVOT_CACHE.clear()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return seconds, peak, output
+
+
+def _benchmark_plot(ohlc: pd.DataFrame, pattern: str = "flag", repeat: int = 1) -> Dict[str, Any]:
+    """
+    Time the PNG export of all the patterns of the dataframe. The images are written to a temporary directory.
+    """
+
+    current = os.getcwd()
+
+    def export() -> int:
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)
+            try:
+                display_chart_pattern(ohlc.copy(), pattern, save=True)
+            except SystemExit:
+                # `display_chart_pattern` exits after saving more than one pattern
+                pass
+            finally:
+                os.chdir(current)
+
+            images = os.path.join(folder, "images", pattern)
+
+            return len(os.listdir(images)) if os.path.isdir(images) else 0
+
+    try:
+        seconds, peak, images = time_call(export, repeat)
+    except Exception as error:
+        # e.g. kaleido is not installed
+        return {"error": f"{type(error).__name__}: {error}"}
+
+    return {"seconds": seconds, "peak_memory": peak, "matches": images}
+
+
+def run_benchmarks(sizes: List[Union[None, int]] = SIZES, synthetic_sizes: List[int] = SYNTHETIC_SIZES,
+                   detectors: Union[None, List[str]] = None, repeat: int = 3, plots: bool = True,
+                   path: str = DATA_PATH,
+                   callback: Union[None, Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run the benchmarks of the detectors on slices of the data file and on synthetic series
+
+    :params sizes is the number of rows of each slice of the data file. None is the whole file
+    :type :List[Union[None, int]]
+
+    :params synthetic_sizes is the number of rows of each synthetic series
+    :type :List[int]
+
+    :params detectors is the names of the detectors to run. Options - the keys of `DETECTORS`. All of them if not given
+    :type :Union[None, List[str]]
+
+    :params repeat is the number of timed runs, the best time is kept
+    :type :int
+
+    :params plots is whether to benchmark the PNG export of the flag patterns of the first slice
+    :type :bool
+
+    :params path is the path of the data file
+    :type :str
+
+    :params callback is called with the name and the result of each benchmark when it is done
+    :type :Union[None, Callable[[str, Dict[str, Any]], None]]
+
+    :return (Dict[str, Any]) the results, with the benchmark `<detector>/<series>` as keys of `results`
+    """
+
+    if detectors is None:
+        detectors = list(DETECTORS)
+
+    for name in detectors:
+        if name not in DETECTORS:
+            raise ValueError(f"Unknown detector `{name}`. Options are {list(DETECTORS)}")
+
+    data   = pd.read_csv(path)
+    series = [(f"eurusd-{len(data) if size is None else size}", data if size is None else data.iloc[:size,:].reset_index())
+              for size in sizes]
+    series += [(f"synthetic-{size}", synthetic_ohlc(size)) for size in synthetic_sizes]
+
+    results = {}
+    for series_name, ohlc in series:
+        for name in detectors:
+            func, column = DETECTORS[name]
+
+            seconds, peak, found = time_call(lambda: func(ohlc.copy()), repeat)
+            results[f"{name}/{series_name}"] = {"rows": len(ohlc), "seconds": seconds, "peak_memory": peak,
+                                                "matches": _count_matches(found, column)}
+            if callback is not None:
+                callback(f"{name}/{series_name}", results[f"{name}/{series_name}"])
+
+    if plots and len(series) > 0:
+        series_name, ohlc = series[0]
+        result            = _benchmark_plot(find_flag_pattern(ohlc.copy()))
+
+        results[f"plot_flag/{series_name}"] = {"rows": len(ohlc), **result}
+        if callback is not None:
+            callback(f"plot_flag/{series_name}", results[f"plot_flag/{series_name}"])
+
+    return {"version": RESULTS_VERSION, "python": platform.python_version(), "numpy": np.__version__,
+            "pandas": pd.__version__, "machine": platform.machine(), "repeat": repeat, "results": results}
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """
+    Save the results of `run_benchmarks` as a JSON file
+
+    :params results is the output of `run_benchmarks`
+    :type :Dict[str, Any]
+
+    :params path is the path of the file
+    :type :str
+
+    :return (None)
+    """
+
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    Load the results saved by `save_results`
+
+    :params path is the path of the file
+    :type :str
+
+    :return (Dict[str, Any])
+    """
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any], time_threshold: float = 1.5,
+                    memory_threshold: float = 1.5, min_seconds: float = 0.01) -> List[str]:
+    """
+    Compare the results with the baseline. The benchmarks missing from one of them are ignored.
+
+    :params results is the output of `run_benchmarks`
+    :type :Dict[str, Any]
+
+    :params baseline is the stored output of `run_benchmarks` to compare with
+    :type :Dict[str, Any]
+
+    :params time_threshold is the largest allowed ratio of the time to the baseline time
+    :type :float
+
+    :params memory_threshold is the largest allowed ratio of the peak memory to the baseline peak memory
+    :type :float
+
+    :params min_seconds is the time below which the timings are too noisy to be compared
+    :type :float
+
+    :return (List[str]) a message for each regression, empty if there is none
+    """
+
+    if baseline.get("version") != results.get("version"):
+        raise ValueError(f"The baseline version {baseline.get('version')} is not {results.get('version')}")
+
+    regressions = []
+    for name, result in sorted(results["results"].items()):
+        expected = baseline["results"].get(name)
+        if expected is None or "error" in result or "error" in expected:
+            continue
+
+        if result["matches"] != expected["matches"]:
+            regressions.append(f"{name}: {result['matches']} matches instead of {expected['matches']}")
+
+        if max(result["seconds"], expected["seconds"]) >= min_seconds and \
+           result["seconds"] > time_threshold * expected["seconds"]:
+            regressions.append(f"{name}: {result['seconds']:.4f}s is {result['seconds'] / expected['seconds']:.2f}x "
+                               f"the baseline {expected['seconds']:.4f}s")
+
+        if result["peak_memory"] > memory_threshold * expected["peak_memory"]:
+            regressions.append(f"{name}: peak memory {result['peak_memory']} bytes is "
+                               f"{result['peak_memory'] / max(expected['peak_memory'], 1):.2f}x the baseline")
+
+    return regressions
+
+
+def main(argv: Union[None, List[str]] = None) -> int:
+    """
+    Run the benchmarks from the command line. The exit code is 1 if there is a regression against the baseline.
+
+    :params argv is the command line arguments, `sys.argv[1:]` if not given
+    :type :Union[None, List[str]]
+
+    :return (int)
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the chart pattern detectors")
+    parser.add_argument("--output", default="benchmark-results.json", help="path of the results file")
+    parser.add_argument("--baseline", default=None, help="path of the baseline results file to compare with")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None,
+                        help="rows of the slices of the data file, the whole file is always included")
+    parser.add_argument("--synthetic-sizes", type=int, nargs="*", default=SYNTHETIC_SIZES, help="rows of the synthetic series")
+    parser.add_argument("--detectors", nargs="*", default=None, help=f"detectors to run, from {list(DETECTORS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs, the best one is kept")
+    parser.add_argument("--no-plots", action="store_true", help="skip the PNG export benchmark")
+    parser.add_argument("--time-threshold", type=float, default=1.5, help="largest allowed slowdown against the baseline")
+    parser.add_argument("--memory-threshold", type=float, default=1.5, help="largest allowed peak memory growth")
+    args = parser.parse_args(argv)
+
+    def report(name: str, result: Dict[str, Any]) -> None:
+        if "error" in result:
+            print(f"{name}: {result['error']}")
+        else:
+            print(f"{name}: {result['seconds']:.4f}s, {result['peak_memory'] / 2**20:.1f}MB, {result['matches']} matches")
+
+    sizes   = SIZES if args.sizes is None else args.sizes + [None]
+    results = run_benchmarks(sizes, args.synthetic_sizes, args.detectors, args.repeat, not args.no_plots, callback=report)
+    save_results(results, args.output)
+
+    if args.baseline is None:
+        return 0
+
+    regressions = compare_results(results, load_results(args.baseline), args.time_threshold, args.memory_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
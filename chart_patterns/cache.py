@@ -0,0 +1,321 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Persistent cache of the chart patterns found, addressed by the content of the data and the parameters of the detector
+"""
+
+import hashlib
+import inspect
+import json
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import zipfile
+
+from chart_patterns.chart_patterns.doubles import find_doubles_pattern
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.head_and_shoulders_all import find_all_head_and_shoulders
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import find_inverse_head_and_shoulders
+from chart_patterns.chart_patterns.matches import MATCH_DTYPE, POINT_DTYPE, PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pennant import find_pennant
+from chart_patterns.chart_patterns.scan import scan_all_patterns
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.triangles import find_triangle_pattern
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Union
+
+
+# Version of the entries layout, part of the salt of every key
+CACHE_VERSION = 2
+
+# The cached detectors. They are run in read-only mode and return a `PatternMatches` table
+DETECTORS: Dict[str, Callable[..., PatternMatches]] = {
+    "flag":     find_flag_pattern,
+    "pennant":  find_pennant,
+    "triangle": find_triangle_pattern,
+    "double":   find_doubles_pattern,
+    "hs":       find_head_and_shoulders,
+    "ihs":      find_inverse_head_and_shoulders,
+    "hs_all":   find_all_head_and_shoulders,
+    "scan":     scan_all_patterns,
+}
+
+# The parameters that do not change the patterns found, left out of the keys. All the engines find the same patterns,
+# and a pivot strength index is built from the same prices, which are part of the key
+_IGNORED_PARAMS = ["engine", "ohlc", "progress", "readonly", "sparse", "strength"]
+
+_ENTRY_SUFFIX = ".npz"
+
+
+@lru_cache(maxsize=None)
+def library_salt() -> str:
+    """
+    Get the salt of the keys: the cache version and a digest of the source files of the library, so the entries
+    written by another version of the detectors are never read
+
+    :return (str)
+    """
+
+    digest = hashlib.blake2b(str(CACHE_VERSION).encode(), digest_size=16)
+    folder = os.path.dirname(os.path.realpath(__file__))
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".py"):
+            with open(os.path.join(folder, name), "rb") as file:
+                digest.update(name.encode())
+                digest.update(file.read())
+
+    return f"{CACHE_VERSION}-{digest.hexdigest()}"
+
+
+def detector_params(detector: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get all the parameters of a detector call, with the defaults of the ones not given, so two calls finding the
+    same patterns have the same parameters
+
+    :params detector is the name of the detector. Options - see `DETECTORS`
+    :type :str
+
+    :params params is the keyword parameters given to the detector
+    :type :Dict[str, Any]
+
+    :return (Dict[str, Any])
+    """
+
+    if detector not in DETECTORS:
+        raise ValueError(f"Unknown detector `{detector}`. Options are {list(DETECTORS)}")
+
+    try:
+        bound = inspect.signature(DETECTORS[detector]).bind(None, **params)
+    except TypeError as error:
+        raise ValueError(f"Wrong parameters for the detector `{detector}`: {error}")
+
+    bound.apply_defaults()
+
+    return {name: value for name, value in bound.arguments.items() if name not in _IGNORED_PARAMS}
+
+
+def _key_param(value: Any) -> Any:
+    """
+    Get the JSON value of a parameter that `json` cannot write. The numpy scalars are written as the Python ones,
+    so `lookback=np.int64(25)` has the same key as `lookback=25`
+    """
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _price_arrays(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore]) -> OHLCArrays:
+    if isinstance(ohlc, OHLCStore):
+        return OHLCArrays.from_store(ohlc)
+
+    if isinstance(ohlc, pd.DataFrame):
+        return OHLCArrays.from_frame(ohlc)
+
+    return ohlc
+
+
+class ResultCache:
+    """
+    Directory of the `PatternMatches` tables found by the detectors. Each entry is an uncompressed `.npz` file of the two
+    record arrays of the table, named by the hash of the open, high, low and close prices, the detector, all its
+    parameters and the library salt, so any change of the data or of a parameter reads another entry.
+    The least recently used entries are removed once the directory is larger than `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 2**20):
+        """
+        :params path is the directory of the cache, created if it does not exist
+        :type :str
+
+        :params max_bytes is the maximum size of the entries
+        :type :int
+        """
+
+        if max_bytes < 0:
+            raise ValueError("max_bytes cannot be negative")
+
+        os.makedirs(path, exist_ok=True)
+        self.path      = path
+        self.max_bytes = max_bytes
+
+    def __repr__(self) -> str:
+        return f"ResultCache({self.path!r}, {self.nbytes} bytes)"
+
+    def key(self, ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], detector: str, params: Dict[str, Any]) -> str:
+        """
+        Get the key of a detector call
+
+        :params ohlc is the OHLC dataframe, or an `OHLCArrays` container or an `OHLCStore`
+        :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+        :params detector is the name of the detector. Options - see `DETECTORS`
+        :type :str
+
+        :params params is the keyword parameters given to the detector
+        :type :Dict[str, Any]
+
+        :return (str)
+        """
+
+        try:
+            params = json.dumps(detector_params(detector, params), sort_keys=True, default=_key_param)
+        except TypeError as error:
+            raise ValueError(f"The parameters of `{detector}` cannot be part of a key: {error}")
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{library_salt()}\n{detector}\n{params}\n".encode())
+
+        prices = _price_arrays(ohlc)
+        for values in [prices.open, prices.high, prices.low, prices.close]:
+            digest.update(len(values).to_bytes(8, "little"))
+            digest.update(memoryview(np.ascontiguousarray(values)).cast("B"))
+
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}{_ENTRY_SUFFIX}")
+
+    def get(self, key: str) -> Union[None, PatternMatches]:
+        """
+        Read an entry. An entry that cannot be read is removed
+
+        :params key is the key of the entry
+        :type :str
+
+        :return (Union[None, PatternMatches]) None if there is no entry
+        """
+
+        path = self._entry(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                records, points = entry["records"], entry["points"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            self._remove(path)
+            return None
+
+        if records.dtype != MATCH_DTYPE or points.dtype != POINT_DTYPE:
+            self._remove(path)
+            return None
+
+        # The modification time orders the entries for the eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return PatternMatches(records, points)
+
+    def put(self, key: str, matches: PatternMatches) -> None:
+        """
+        Write an entry, then remove the least recently used entries if the cache is too large
+
+        :params key is the key of the entry
+        :type :str
+
+        :params matches is the table of the patterns found
+        :type :PatternMatches
+
+        :return (None)
+        """
+
+        # Written to a temporary file first so a reader never sees a partial entry
+        handle, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.path)
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.savez(file, records=matches.records, points=matches.points)
+            os.replace(tmp_path, self._entry(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def run(self, ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], detector: str = "flag", **params) -> PatternMatches:
+        """
+        Get the patterns found by a detector from the cache, or run the detector in read-only mode and keep its result
+
+        :params ohlc is the OHLC dataframe, or an `OHLCArrays` container or an `OHLCStore`. It is not changed
+        :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+        :params detector is the name of the detector. Options - ["flag", "pennant", "triangle", "double", "hs", "ihs",
+                "hs_all", "scan"]
+        :type :str
+
+        :params params is the keyword parameters of the detector, e.g. `lookback`
+        :type :Any
+
+        :return (PatternMatches)
+        """
+
+        key     = self.key(ohlc, detector, params)
+        matches = self.get(key)
+        if matches is not None:
+            return matches
+
+        params = {name: value for name, value in params.items() if name not in ["readonly", "sparse"]}
+        if detector == "scan":
+            matches = scan_all_patterns(ohlc, **params, sparse=True, readonly=True)
+        else:
+            matches = DETECTORS[detector](ohlc, **params, readonly=True)
+
+        self.put(key, matches)
+
+        return matches
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the entries
+        """
+
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [entry for entry in os.scandir(self.path) if entry.name.endswith(_ENTRY_SUFFIX)]
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is not larger than `max_bytes`
+
+        :return (None)
+        """
+
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+
+            self._remove(path)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """
+        Remove all the entries
+
+        :return (None)
+        """
+
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
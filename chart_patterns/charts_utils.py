@@ -8,51 +8,117 @@ import numpy as np
 import pandas as pd 
 
 
-from typing import Tuple
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from typing import Any, Dict, Tuple, Union
 
 
-def find_points(ohlc: pd.DataFrame, candle_idx: int, lookback: int) -> Tuple[np.array, np.array, np.array, int, int, int, int]:
+def find_points(ohlc: Union[None, pd.DataFrame], candle_idx: int, lookback: int, 
+                index: Union[None, PivotIndex] = None) -> Tuple[np.array, np.array, np.array, np.array, int, int, int, int]:
     """
     Find points provides all the necessary arrays and data of interest
 
     
-    :params ohlc is the OHLC dataframe that has the pivot points
-    :type :pd.DataFrame
+    :params ohlc is the OHLC dataframe that has the pivot points. Not used if `index` is given
+    :type :Union[None, pd.DataFrame]
     
     :params candle_idx is the candlestick index of interest
     :type :int 
     
     :params lookback is the number of back candlesticks to use 
     :type :int 
+
+    :params index is the pivot index of the `short_pivot` column. Build it once with `PivotIndex.from_ohlc(ohlc, "short_pivot")`
+            when calling this function for many candlesticks. If not given, only the rows of the window are read
+    :type :Union[None, PivotIndex]
     
-    :return (Tuple[np.array, np.array, np.array, int, int, int, int])    
+    :return (Tuple[np.array, np.array, np.array, np.array, int, int, int, int])    
     """
 
-    maxim = np.array([])
-    minim = np.array([])
-    xxmin = np.array([])
-    xxmax = np.array([])
-    minbcount     = 0 #minimas before head
-    maxbcount     = 0 #maximas before head
-    minacount     = 0 #minimas after head
-    maxacount     = 0 #maximas after head
     half_lookback = int(lookback/2)
+    idx           = candle_idx - half_lookback
+    start         = max(idx - half_lookback, 0)
+
+    if index is None:
+        # Index only the window, so each call reads `lookback` rows and not the whole dataframe
+        window = ohlc.loc[start:idx + half_lookback - 1]
+        index  = PivotIndex(window["short_pivot"].to_numpy(), window["high"].to_numpy(dtype=float),
+                            window["low"].to_numpy(dtype=float), start)
+
+    maxim, minim, xxmax, xxmin = index.window(start, idx + half_lookback)
+
+    maxbcount = int(np.searchsorted(xxmax, idx, side="left"))  #maximas before head
+    minbcount = int(np.searchsorted(xxmin, idx, side="left"))  #minimas before head
+    maxacount = len(xxmax) - int(np.searchsorted(xxmax, idx, side="right"))  #maximas after head
+    minacount = len(xxmin) - int(np.searchsorted(xxmin, idx, side="right"))  #minimas after head
     
-    idx = candle_idx - half_lookback
-    for i in range(idx-half_lookback, idx + half_lookback):
-        if ohlc.loc[i,"short_pivot"] == 1:
-            minim = np.append(minim, ohlc.loc[i, "low"])
-            xxmin = np.append(xxmin, i)        
-            if i < idx:
-                minbcount+=1
-            elif i> idx:
-                minacount+=1
-        if ohlc.loc[i, "short_pivot"] == 2:
-            maxim = np.append(maxim, ohlc.loc[i, "high"])
-            xxmax = np.append(xxmax, i)
-            if i < idx:
-                maxbcount+=1
-            elif i> idx:
-                maxacount+=1
-    
-    return maxim, minim, xxmax, xxmin, maxacount, minacount, maxbcount, minbcount
\ No newline at end of file
+    return maxim, minim, xxmax, xxmin, maxacount, minacount, maxbcount, minbcount
+
+
+def assign_pattern(ohlc: pd.DataFrame, candle_idx: int, result: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Write the chart pattern found at the candlestick into the OHLC dataframe
+
+    :params ohlc is the OHLC dataframe
+    :type :pd.DataFrame
+
+    :params candle_idx is the candlestick index of interest
+    :type :int
+
+    :params result is the column names and values of the chart pattern
+    :type :Dict[str, Any]
+
+    :return (pd.DataFrame)
+    """
+
+    for column, value in result.items():
+        if isinstance(value, (list, np.ndarray)):
+            ohlc.at[candle_idx, column] = value
+        else:
+            ohlc.loc[candle_idx, column] = value
+
+    return ohlc
+
+
+def window_counts(index: PivotIndex, size: int, lookback: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the pivot highs and pivot lows of the window [candle - lookback, candle] of every candlestick
+    as ranges of the pivot index arrays
+
+    :params index is the pivot index of the series
+    :type :PivotIndex
+
+    :params size is the number of candlesticks in the series
+    :type :int
+
+    :params lookback is the number of back candlesticks to use
+    :type :int
+
+    :return (Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]) the candlesticks and the
+             first and last (excluded) pivot high and pivot low of their windows
+    """
+
+    candles               = np.arange(lookback, size)
+    high_first, high_last = index.bounds(2, candles - lookback, candles + 1)
+    low_first, low_last   = index.bounds(1, candles - lookback, candles + 1)
+
+    return candles, high_first, high_last, low_first, low_last
+
+
+def enough_points(high_count: np.ndarray, low_count: np.ndarray, min_points: int) -> np.ndarray:
+    """
+    Check the number of pivot points of many windows, with the same condition as the trendline pattern checks
+
+    :return (np.ndarray) of bool
+    """
+
+    return ~((high_count < min_points) & (low_count < min_points)) & (high_count > 0) & (low_count > 0)
+
+
+def all_candles(index: PivotIndex, fits: Tuple[np.ndarray, ...], size: int, lookback: int, *params) -> np.ndarray:
+    """
+    Candidates kernel of the "python" engine: every candlestick with a full window is checked
+
+    :return (np.ndarray)
+    """
+
+    return np.arange(lookback, size)
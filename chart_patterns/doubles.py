@@ -9,17 +9,26 @@ import pandas as pd
 import plotly.graph_objects as go
 
 
+from chart_patterns.chart_patterns.charts_utils import assign_pattern
+from chart_patterns.chart_patterns.engines import get_kernel, register_kernel
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
 from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.timing import count_windows, stage
+from numpy.lib.stride_tricks import sliding_window_view
 from tqdm import tqdm
+from typing import Any, Dict, List, Tuple, Union
 
-def find_doubles_pattern(ohlc: pd.DataFrame, lookback: int = 25, double: str = "tops", 
+def find_doubles_pattern(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], lookback: int = 25, double: str = "tops", 
                          tops_max_ratio: float = 1.01, bottoms_min_ratio: float = 0.98,
-                         progress: bool = False) -> pd.DataFrame:
+                         progress: bool = False, engine: Union[None, str] = None, readonly: bool = False) -> Union[pd.DataFrame, PatternMatches]:
     """
     Find the Double chart patterns 
     
-    :params ohlc is the OHLC dataframe 
-    :type :pd.DataFrame
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container (or `OHLCStore`) that is always read in read-only mode
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
     
     :params lookback is the number of periods to use for back candles
     :type :int 
@@ -35,60 +44,173 @@ def find_doubles_pattern(ohlc: pd.DataFrame, lookback: int = 25, double: str = "
     
     :params progress bar to be displayed or not 
     :type:bool
+
+    :params engine is the implementation to use. Options - [None, "python", "numpy", "numba"]. The "numpy" engine checks 
+            every run of 5 consecutive pivot points at once and the "python" engine checks one candlestick at a time.
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
     
-    :return (pd.DataFrame)
+    :params readonly is whether to leave `ohlc` unchanged and only return the patterns found, as a `PatternMatches` table.
+            No column is added to `ohlc` and its columns are not renamed
+    :type :bool
+
+    :return (Union[pd.DataFrame, PatternMatches])
     """
+
+    if readonly or not isinstance(ohlc, pd.DataFrame):
+        # Imported here since the `scan` module imports this one
+        from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+        params = {"lookback": lookback, "double": double, "tops_max_ratio": tops_max_ratio,
+                  "bottoms_min_ratio": bottoms_min_ratio}
+
+        return scan_all_patterns(ohlc, {"double": params}, progress=progress, sparse=True, readonly=True, engine=engine)
+
     
     # Placeholders for the Double patterns     
-    ohlc["double_type"]   = ""
-    ohlc["chart_type"]    = ""
-    ohlc["double_idx"]    = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["double_point"]  = [np.array([]) for _ in range(len(ohlc)) ]
+    with stage("double", "setup"):
+        ohlc["double_type"]   = ""
+        ohlc["chart_type"]    = ""
+        ohlc["double_idx"]    = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["double_point"]  = [np.array([]) for _ in range(len(ohlc)) ]
     
     
     # Find the pivot points
-    ohlc = find_all_pivot_points(ohlc)
-    
+    with stage("double", "pivots"):
+        ohlc  = find_all_pivot_points(ohlc, engine=engine)
+    with stage("double", "index"):
+        index = PivotIndex.from_ohlc(ohlc)
+
+    # Every window is checked, the numpy engine checks each run of 5 pivot points once for all its windows
+    with stage("double", "check"):
+        found = get_kernel("doubles", engine)(index, len(ohlc), lookback, double, tops_max_ratio, bottoms_min_ratio, progress)
+    count_windows("double", max(len(ohlc) - lookback, 0), 0)
+
+    with stage("double", "writeback"):
+        for candle_idx, pivot_indx, pivots, double_type in found:
+            assign_pattern(ohlc, candle_idx, {"double_idx": pivot_indx, "double_point": pivots, "double_type": double_type, 
+                                              "chart_type": "double"})
+                        
+    return ohlc
+
+
+@register_kernel("doubles", "python")
+def _doubles_loop(index: PivotIndex, size: int, lookback: int = 25, double: str = "tops", tops_max_ratio: float = 1.01,
+                  bottoms_min_ratio: float = 0.98, progress: bool = False) -> List[Tuple[int, List[int], List[float], str]]:
+    """
+    Find the Double chart patterns one candlestick at a time. Same output as `_doubles_vectorized`.
+    """
+
     if not progress:
-        candle_iter =  range(lookback, len(ohlc))
+        candle_iter =  range(lookback, size)
     else:
-        candle_iter =  tqdm(range(lookback, len(ohlc)), desc=f"Finding doubles patterns...")
-           
+        candle_iter =  tqdm(range(lookback, size), desc=f"Finding doubles patterns...")
+
+    found = []
     for candle_idx in candle_iter:
-        sub_ohlc = ohlc.loc[candle_idx-lookback: candle_idx,:]
-        
-        pivot_indx = [ i for i, p in zip(sub_ohlc["pivot"].index.values, sub_ohlc["pivot"].tolist()) if p != 0 ]
+        pivot_indx, pivots = index.pivots(candle_idx - lookback, candle_idx + 1)
         if len(pivot_indx) != 5:
             continue
         
-        if len(pivot_indx) == 5: # Must have only 5 pivots
-            pivots = ohlc.loc[pivot_indx, "pivot_pos"].tolist() 
-            
-            # Find Double Tops
-            if double == "tops" or double == "both":
-                if (pivots[0] < pivots[1]) and (pivots[0] < pivots[3]) and (pivots[2] < pivots[1]) and \
-                    (pivots[2] < pivots[3]) and (pivots[4] < pivots[1]) and (pivots[4] < pivots[3]) and \
-                        (pivots[1] > pivots[3]) and (pivots[1]/pivots[3] <= tops_max_ratio):  
-                        ohlc.at[candle_idx, "double_idx"]     = pivot_indx
-                        ohlc.at[candle_idx, "double_point"]   = pivots
-                        ohlc.loc[candle_idx, "double_type"]   = "tops"
-                        ohlc.loc[candle_idx, "chart_type"]    = "double"
-                        
-                        
-            # Find Double Bottoms            
-            elif double == "bottoms" or double == "both":
-              if (pivots[0] > pivots[1]) and (pivots[0] > pivots[3]) and (pivots[2] > pivots[1]) and \
-                    (pivots[2] > pivots[3]) and (pivots[4] > pivots[1]) and (pivots[4] > pivots[3]) and \
-                        (pivots[1] < pivots[3]) and  (pivots[1]/pivots[3] >= bottoms_min_ratio) :
-                        ohlc.at[candle_idx, "double_idx"]     = pivot_indx
-                        ohlc.at[candle_idx, "double_point"]   = pivots
-                        ohlc.loc[candle_idx, "double_type"]   = "bottoms"                         
-                        ohlc.loc[candle_idx, "chart_type"]    = "double"
-                        
-    return ohlc
-    
+        result = _doubles_check(pivot_indx.tolist(), pivots.tolist(), double, tops_max_ratio, bottoms_min_ratio)
+        if result is not None:
+            found.append((candle_idx, result["double_idx"], result["double_point"], result["double_type"]))
 
+    return found
 
-    
-        
-        
\ No newline at end of file
+
+def _doubles_check(pivot_indx: List[int], pivots: List[float], double: str = "tops", 
+                   tops_max_ratio: float = 1.01, bottoms_min_ratio: float = 0.98) -> Union[None, Dict[str, Any]]:
+    """
+    Check if the 5 pivot points in the lookback window of the candlestick form a Double chart pattern
+
+    :params pivot_indx is the indexes of the 5 pivot points
+    :type :List[int]
+
+    :params pivots is the pivot point positions of the 5 pivot points
+    :type :List[float]
+
+    The other parameters are the same as in `find_doubles_pattern`
+
+    :return (Union[None, Dict[str, Any]])
+    """
+
+    # Find Double Tops
+    if double == "tops" or double == "both":
+        if (pivots[0] < pivots[1]) and (pivots[0] < pivots[3]) and (pivots[2] < pivots[1]) and \
+            (pivots[2] < pivots[3]) and (pivots[4] < pivots[1]) and (pivots[4] < pivots[3]) and \
+                (pivots[1] > pivots[3]) and (pivots[1]/pivots[3] <= tops_max_ratio):  
+                return {"double_idx": pivot_indx, "double_point": pivots, "double_type": "tops", "chart_type": "double"}
+                
+    # Find Double Bottoms            
+    if double == "bottoms" or double == "both":
+        if (pivots[0] > pivots[1]) and (pivots[0] > pivots[3]) and (pivots[2] > pivots[1]) and \
+            (pivots[2] > pivots[3]) and (pivots[4] > pivots[1]) and (pivots[4] > pivots[3]) and \
+                (pivots[1] < pivots[3]) and  (pivots[1]/pivots[3] >= bottoms_min_ratio) :
+                return {"double_idx": pivot_indx, "double_point": pivots, "double_type": "bottoms", "chart_type": "double"}
+
+    return None
+
+
+def _doubles_masks(pivots: np.ndarray, tops_max_ratio: float = 1.01, 
+                   bottoms_min_ratio: float = 0.98) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Check the Double tops and bottoms conditions of many runs of 5 pivot points at once
+
+    :params pivots is the 2-D array of the pivot point positions with one run of 5 pivot points per row
+    :type :np.ndarray
+
+    The other parameters are the same as in `find_doubles_pattern`
+
+    :return (Tuple[np.ndarray, np.ndarray]) the tops and bottoms boolean masks
+    """
+
+    p0, p1, p2, p3, p4 = pivots.T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tops    = (p0 < p1) & (p0 < p3) & (p2 < p1) & (p2 < p3) & (p4 < p1) & (p4 < p3) & \
+                  (p1 > p3) & (p1/p3 <= tops_max_ratio)
+        bottoms = (p0 > p1) & (p0 > p3) & (p2 > p1) & (p2 > p3) & (p4 > p1) & (p4 > p3) & \
+                  (p1 < p3) & (p1/p3 >= bottoms_min_ratio)
+
+    return tops, bottoms
+
+
+@register_kernel("doubles", "numpy")
+def _doubles_vectorized(index: PivotIndex, size: int, lookback: int = 25, double: str = "tops", tops_max_ratio: float = 1.01,
+                        bottoms_min_ratio: float = 0.98, progress: bool = False) -> List[Tuple[int, List[int], List[float], str]]:
+    """
+    Find the Double chart patterns of all the candlesticks at once. Every run of 5 consecutive pivot points
+    is checked once and the result is mapped back to the candlesticks whose lookback window holds exactly 
+    those 5 pivot points.
+
+    :params index is the pivot index of the series
+    :type :PivotIndex
+
+    :params size is the number of candlesticks in the series
+    :type :int
+
+    The other parameters are the same as in `find_doubles_pattern`. There is no progress bar
+
+    :return (List[Tuple[int, List[int], List[float], str]]) the candlestick index, pivot indexes, pivot positions
+             and double type of each pattern found
+    """
+
+    if len(index.pivot_idx) < 5 or size <= lookback:
+        return []
+
+    runs          = sliding_window_view(index.pivot_pos, 5)
+    tops, bottoms = _doubles_masks(runs, tops_max_ratio, bottoms_min_ratio)
+    tops          = tops & (double in ["tops", "both"])
+    bottoms       = bottoms & (double in ["bottoms", "both"])
+
+    # The first pivot point of the window of each candlestick, if it has exactly 5 
+    candles       = np.arange(lookback, size)
+    first, last   = np.searchsorted(index.pivot_idx, [candles - lookback, candles + 1], side="left")
+    has_five      = (last - first) == 5
+    candles, runs_idx = candles[has_five], first[has_five]
+
+    found = tops[runs_idx] | bottoms[runs_idx]
+
+    return [(int(candle_idx), index.pivot_idx[run:run + 5].tolist(), runs[run].tolist(), "tops" if tops[run] else "bottoms")
+            for candle_idx, run in zip(candles[found], runs_idx[found])]
@@ -0,0 +1,138 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Registry of the compute engines and of the kernels each engine provides to the detectors
+"""
+
+import importlib
+import warnings
+
+from typing import Callable, Dict, Union
+
+
+# The engines from the reference implementation to the fastest one. A kernel missing
+# from an engine falls back to the one of the engine before it.
+ENGINES = ["python", "numpy", "numba"]
+
+_KERNELS: Dict[str, Dict[str, Callable]] = {}
+_ENGINE  = "numpy"
+
+
+def numba_available() -> bool:
+    """
+    Check if numba can be imported
+
+    :return (bool)
+    """
+
+    try:
+        importlib.import_module("numba")
+    except ImportError:
+        return False
+
+    return True
+
+
+def set_engine(engine: str) -> str:
+    """
+    Set the engine used by all the detectors when no engine is given to them
+
+    :params engine is the name of the engine. Options - ["python", "numpy", "numba"]
+    :type :str
+
+    :return (str) the previous engine
+    """
+
+    global _ENGINE
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine `{engine}`. Options are {ENGINES}")
+
+    previous = _ENGINE
+    _ENGINE  = engine
+
+    return previous
+
+
+def get_engine() -> str:
+    """
+    Get the engine used by the detectors when no engine is given to them
+
+    :return (str)
+    """
+
+    return _ENGINE
+
+
+def resolve_engine(engine: Union[None, str] = None) -> str:
+    """
+    Get the engine to use: the given one, or the global one if not given. The "numba" engine falls
+    back to "numpy" with a warning when numba cannot be imported.
+
+    :params engine is the name of the engine. Options - [None, "python", "numpy", "numba"]
+    :type :Union[None, str]
+
+    :return (str)
+    """
+
+    if engine is None:
+        engine = _ENGINE
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine `{engine}`. Options are {ENGINES}")
+
+    if engine == "numba":
+        if not numba_available():
+            warnings.warn("numba is not installed, the `numpy` engine is used instead")
+            return "numpy"
+
+        # The numba kernels are compiled on first use and register themselves when imported
+        importlib.import_module("chart_patterns.chart_patterns.numba_kernels")
+
+    return engine
+
+
+def register_kernel(name: str, engine: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator to register a function as the `name` kernel of the engine
+
+    :params name is the name of the kernel
+    :type :str
+
+    :params engine is the name of the engine. Options - ["python", "numpy", "numba"]
+    :type :str
+
+    :return (Callable[[Callable], Callable])
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine `{engine}`. Options are {ENGINES}")
+
+    def register(kernel: Callable) -> Callable:
+        _KERNELS.setdefault(name, {})[engine] = kernel
+        return kernel
+
+    return register
+
+
+def get_kernel(name: str, engine: Union[None, str] = None) -> Callable:
+    """
+    Get the `name` kernel of the engine, or of the closest engine before it that has one
+
+    :params name is the name of the kernel
+    :type :str
+
+    :params engine is the name of the engine, the global one if not given
+    :type :Union[None, str]
+
+    :return (Callable)
+    """
+
+    engine  = resolve_engine(engine)
+    kernels = _KERNELS.get(name, {})
+
+    for candidate in reversed(ENGINES[:ENGINES.index(engine) + 1]):
+        if candidate in kernels:
+            return kernels[candidate]
+
+    raise ValueError(f"No kernel `{name}` for the engine `{engine}`")
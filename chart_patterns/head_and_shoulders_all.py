@@ -0,0 +1,224 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Function used to detect the head and shoulders and the inverse head and shoulders patterns together
+"""
+
+import numpy as np
+import pandas as pd
+
+from chart_patterns.chart_patterns.charts_utils import assign_pattern
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points, find_pivot_strength, PivotStrength
+from chart_patterns.chart_patterns.regression import linregress_windows
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.timing import stage
+from typing import Any, Dict, List, Tuple, Union
+
+
+def find_all_head_and_shoulders(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], lookback: int = 60, pivot_interval: int = 10, short_pivot_interval: int = 5,
+                                head_ratio_before: float = 1.0002, head_ratio_after: float = 1.0002, upper_slmin: float = 1e-4,
+                                inverse_head_ratio_before: float = 0.98, inverse_head_ratio_after: float = 0.98,
+                                upper_slmax: float = 1e-4, strength: Union[None, PivotStrength] = None,
+                                engine: Union[None, str] = None, readonly: bool = False) -> Union[pd.DataFrame, PatternMatches]:
+    """
+    Find all the head and shoulders and inverse head and shoulders chart patterns. The pivot points are found once
+    for both patterns and the checks are run on all the candidate candlesticks at once. Same result as running
+    `find_head_and_shoulders` and `find_inverse_head_and_shoulders` one after the other.
+
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container (or `OHLCStore`) that is always read in read-only mode
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+    :params lookback is the number of periods to use for back candles
+    :type :int
+
+    :params pivot_interval is the number of candles to consider when detecting a pivot point
+    :type :int
+
+    :params short_pivot_interval is same as pivot_interval but must be less than it.
+    :type :int
+
+    :params head_ratio_before, head_ratio_after and upper_slmin are the parameters of `find_head_and_shoulders`
+    :type :float
+
+    :params inverse_head_ratio_before, inverse_head_ratio_after and upper_slmax are the `head_ratio_before`,
+            `head_ratio_after` and `upper_slmax` parameters of `find_inverse_head_and_shoulders`
+    :type :float
+
+    :params strength is a pivot strength index built from the same `ohlc`. It is built here if not given
+    :type :Union[None, PivotStrength]
+
+    :params engine is the compute engine of the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :params readonly is whether to leave `ohlc` unchanged and only return the patterns found, as a `PatternMatches` table.
+            No column is added to `ohlc` and its columns are not renamed
+    :type :bool
+
+    :return (Union[pd.DataFrame, PatternMatches]) with the columns of both `find_head_and_shoulders` and
+             `find_inverse_head_and_shoulders`
+    """
+
+    if readonly or not isinstance(ohlc, pd.DataFrame):
+        # Imported here since the `scan` module imports the head and shoulders modules
+        from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+        intervals = {"lookback": lookback, "pivot_interval": pivot_interval, "short_pivot_interval": short_pivot_interval}
+        patterns  = {"hs": {**intervals, "head_ratio_before": head_ratio_before, "head_ratio_after": head_ratio_after,
+                            "upper_slmin": upper_slmin},
+                     "ihs": {**intervals, "head_ratio_before": inverse_head_ratio_before,
+                             "head_ratio_after": inverse_head_ratio_after, "upper_slmax": upper_slmax}}
+
+        return scan_all_patterns(ohlc, patterns, sparse=True, readonly=True, engine=engine, strength=strength)
+
+    if short_pivot_interval <= 0 or pivot_interval <= 0:
+        raise ValueError("Value cannot be less or equal to 0")
+
+    if short_pivot_interval >= pivot_interval:
+        raise ValueError(f"short_pivot_interval must be less than pivot_interval")
+
+    with stage("hs_all", "setup"):
+        ohlc.loc[:,"hs_lookback"]  = lookback
+        ohlc.loc[:,"ihs_lookback"] = lookback
+        ohlc.loc[:,"chart_type"]   = ""
+        ohlc.loc[:,"hs_idx"]       = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc.loc[:,"hs_point"]     = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc.loc[:,"ihs_idx"]      = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc.loc[:,"ihs_point"]    = [np.array([]) for _ in range(len(ohlc)) ]
+
+    # Find the pivot points once for both patterns
+    with stage("hs_all", "pivots"):
+        if strength is None:
+            strength = find_pivot_strength(ohlc, engine)
+
+        ohlc = find_all_pivot_points(ohlc, left_count=pivot_interval, right_count=pivot_interval, strength=strength,
+                                     engine=engine)
+        ohlc = find_all_pivot_points(ohlc, left_count=short_pivot_interval, right_count=short_pivot_interval, name_pivot="short_pivot",
+                                     strength=strength, engine=engine)
+
+    with stage("hs_all", "index"):
+        short_index = PivotIndex.from_ohlc(ohlc, "short_pivot")
+
+    with stage("hs_all", "check"):
+        matches = _head_and_shoulders_vectorized(ohlc["pivot"].to_numpy(), ohlc["short_pivot"].to_numpy(), short_index, lookback,
+                                                 {"head_ratio_before": head_ratio_before, "head_ratio_after": head_ratio_after,
+                                                  "upper_sl": upper_slmin},
+                                                 {"head_ratio_before": inverse_head_ratio_before,
+                                                  "head_ratio_after": inverse_head_ratio_after, "upper_sl": upper_slmax})
+
+    with stage("hs_all", "writeback"):
+        for candle_idx, result in matches:
+            assign_pattern(ohlc, candle_idx, result)
+
+    return ohlc
+
+
+def _padded(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, fill: float) -> np.ndarray:
+    """
+    Gather the windows [starts[k], starts[k] + counts[k]) of the values into rows padded with `fill`
+    """
+
+    cols = np.arange(max(int(counts.max()), 2))
+    idx  = np.minimum(starts[:, None] + cols[None, :], max(len(values) - 1, 0))
+
+    if len(values) == 0:
+        return np.full(idx.shape, fill)
+
+    return np.where(cols[None, :] < counts[:, None], values[idx], fill)
+
+
+def _head_and_shoulders_vectorized(pivot: np.ndarray, short_pivot: np.ndarray, index: PivotIndex, lookback: int,
+                                   hs_params: Dict[str, float], ihs_params: Dict[str, float]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Check the head and shoulders patterns at all the candidate candlesticks at once. The candidates are the
+    pivot highs (hs) and pivot lows (ihs) of both intervals. The window of each candidate is the same as in `find_points`.
+
+    :params pivot is the array of the long pivot point codes
+    :type :np.ndarray
+
+    :params short_pivot is the array of the short pivot point codes
+    :type :np.ndarray
+
+    :params index is the pivot index of the short pivot points
+    :type :PivotIndex
+
+    :params lookback is the number of periods to use for back candles
+    :type :int
+
+    :params hs_params and ihs_params are the head ratios and the neckline slope limit (`upper_sl`) of each pattern
+    :type :Dict[str, float]
+
+    :return (List[Tuple[int, Dict[str, Any]]]) the candlestick index and the columns of each pattern found
+    """
+
+    half_lookback = int(lookback/2)
+    matches       = []
+
+    for code, name, params in [(2, "hs", hs_params), (1, "ihs", ihs_params)]:
+
+        candles = np.flatnonzero((pivot == code) & (short_pivot == code))
+        candles = candles[candles >= lookback]
+        if len(candles) == 0:
+            continue
+
+        # The head is found among the highs for hs and among the lows for ihs, the neckline is fitted on the other ones
+        idx                      = candles - half_lookback
+        starts, stops            = idx - half_lookback, idx + half_lookback
+        head_first, head_last    = index.bounds(code, starts, stops)
+        neck_first, neck_last    = index.bounds(3 - code, starts, stops)
+        head_xx, head_prices     = (index.high_idx, index.high_prices) if code == 2 else (index.low_idx, index.low_prices)
+        neck_xx, neck_prices     = (index.low_idx, index.low_prices) if code == 2 else (index.high_idx, index.high_prices)
+
+        head_count = head_last - head_first
+        neck_count = neck_last - neck_first
+        idx_head   = np.searchsorted(head_xx, idx, side="left")
+        idx_neck   = np.searchsorted(neck_xx, idx, side="left")
+
+        # At least one pivot high and one pivot low before and after the middle of the window
+        valid = (idx_head - head_first >= 1) & (idx_neck - neck_first >= 1) & \
+                (head_last - np.searchsorted(head_xx, idx, side="right") >= 1) & \
+                (neck_last - np.searchsorted(neck_xx, idx, side="right") >= 1)
+
+        candles, head_first, head_count, neck_first, neck_count = \
+            candles[valid], head_first[valid], head_count[valid], neck_first[valid], neck_count[valid]
+        if len(candles) == 0:
+            continue
+
+        slope, _, _ = linregress_windows(neck_xx, neck_prices, neck_first, neck_first + neck_count)
+
+        rows   = np.arange(len(candles))
+        prices = _padded(head_prices, head_first, head_count, -np.inf if code == 2 else np.inf)
+        xx     = _padded(head_xx, head_first, head_count, np.nan)
+        neck   = _padded(neck_prices, neck_first, neck_count, np.nan)
+        neckxx = _padded(neck_xx, neck_first, neck_count, np.nan)
+
+        # Same head as `np.argmax`/`np.argmin`, the point before the first one is the last one like `maxim[headidx-1]`
+        head = np.argmax(prices, axis=1) if code == 2 else np.argmin(prices, axis=1)
+        prev = np.where(head == 0, head_count - 1, head - 1)
+        nxt  = np.minimum(head + 1, head_count - 1)
+
+        head_price, prev_price, next_price = prices[rows, head], prices[rows, prev], prices[rows, nxt]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if code == 2:
+                shoulders = (head_price - prev_price > 0) & (head_price/prev_price > params["head_ratio_before"]) & \
+                            (head_price - next_price > 0) & (head_price/next_price > params["head_ratio_after"])
+            else:
+                shoulders = (prev_price - head_price > 0) & (head_price/prev_price < 1) & \
+                            (head_price/prev_price >= params["head_ratio_before"]) & \
+                            (head_price/next_price < 1) & (head_price/next_price >= params["head_ratio_after"]) & \
+                            (next_price - head_price > 0)
+
+            found = (head != head_count - 1) & shoulders & (np.abs(slope) <= params["upper_sl"]) & \
+                    (neckxx[:, 0] > xx[rows, prev]) & (neckxx[:, 1] < xx[rows, nxt])
+
+        for k in np.flatnonzero(found):
+            indexes = [int(xx[k, prev[k]]), int(neckxx[k, 0]), int(xx[k, head[k]]), int(neckxx[k, 1]), int(xx[k, nxt[k]])]
+            values  = [prices[k, prev[k]], neck[k, 0], prices[k, head[k]], neck[k, 1], prices[k, nxt[k]]]
+
+            matches.append((int(candles[k]), {"chart_type": name, f"{name}_idx": indexes, f"{name}_point": values}))
+
+    return sorted(matches, key=lambda match: match[0])
@@ -8,21 +8,28 @@ import numpy as np
 import pandas as pd 
 import plotly.graph_objects as go
 
-from chart_patterns.chart_patterns.charts_utils import find_points
-from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
-from scipy.stats import linregress
+from chart_patterns.chart_patterns.charts_utils import assign_pattern, find_points
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points, find_pivot_strength, PivotStrength
+from chart_patterns.chart_patterns.regression import linregress_points
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.timing import count_windows, stage
 from tqdm import tqdm
-from typing import Tuple
+from typing import Any, Dict, Tuple, Union
 
 
-def find_inverse_head_and_shoulders(ohlc: pd.DataFrame, lookback: int = 60, pivot_interval: int = 10, short_pivot_interval: int = 5,
+def find_inverse_head_and_shoulders(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], lookback: int = 60, pivot_interval: int = 10, short_pivot_interval: int = 5,
                                     head_ratio_before: float = 0.98, head_ratio_after: float = 0.98,
-                                    upper_slmax: float = 1e-4, progress: bool = False) -> pd.DataFrame:
+                                    upper_slmax: float = 1e-4, progress: bool = False,
+                                    strength: Union[None, PivotStrength] = None, engine: Union[None, str] = None,
+                                    readonly: bool = False) -> Union[pd.DataFrame, PatternMatches]:
     """
     Find all the inverse head and shoulders chart patterns
 
-    :params ohlc is the OHLC dataframe
-    :type :pd.DataFrame 
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container (or `OHLCStore`) that is always read in read-only mode
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
     
     :params lookback is the number of periods to use for back candles
     :type :int 
@@ -44,70 +51,124 @@ def find_inverse_head_and_shoulders(ohlc: pd.DataFrame, lookback: int = 60, pivo
     
     :params progress bar to be displayed or not 
     :type :bool
+
+    :params strength is a pivot strength index built from the same `ohlc`. It is built here if not given
+    :type :Union[None, PivotStrength]
+
+    :params engine is the implementation used to find the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
     
-    :return (pd.DataFrame)
+    :params readonly is whether to leave `ohlc` unchanged and only return the patterns found, as a `PatternMatches` table.
+            No column is added to `ohlc` and its columns are not renamed
+    :type :bool
+
+    :return (Union[pd.DataFrame, PatternMatches])
     """
+
+    if readonly or not isinstance(ohlc, pd.DataFrame):
+        # Imported here since the `scan` module imports this one
+        from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+        params = {"lookback": lookback, "pivot_interval": pivot_interval,
+                  "short_pivot_interval": short_pivot_interval, "head_ratio_before": head_ratio_before,
+                  "head_ratio_after": head_ratio_after, "upper_slmax": upper_slmax}
+
+        return scan_all_patterns(ohlc, {"ihs": params}, progress=progress, sparse=True, readonly=True, engine=engine,
+                                 strength=strength)
+
     if short_pivot_interval <= 0 or pivot_interval <= 0:
             raise ValueError("Value cannot be less or equal to 0")  
 
     if short_pivot_interval >= pivot_interval:
         raise ValueError(f"short_pivot_interval must be less than pivot_interval")
     
-    ohlc["ihs_lookback"]   = lookback
-    ohlc["chart_type"]     = ""
-    ohlc["ihs_idx"]        = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["ihs_point"]      = [np.array([]) for _ in range(len(ohlc)) ]    
-    
-     # Find the pivot points   
-    ohlc = find_all_pivot_points(ohlc, left_count=pivot_interval, right_count=pivot_interval)
-    ohlc = find_all_pivot_points(ohlc, left_count=short_pivot_interval, right_count=short_pivot_interval, name_pivot="short_pivot")
+    with stage("ihs", "setup"):
+        ohlc["ihs_lookback"]   = lookback
+        ohlc["chart_type"]     = ""
+        ohlc["ihs_idx"]        = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["ihs_point"]      = [np.array([]) for _ in range(len(ohlc)) ]
+
+    # Find the pivot points   
+    with stage("ihs", "pivots"):
+        if strength is None:
+            strength = find_pivot_strength(ohlc, engine)
+
+        ohlc = find_all_pivot_points(ohlc, left_count=pivot_interval, right_count=pivot_interval, strength=strength,
+                                     engine=engine)
+        ohlc = find_all_pivot_points(ohlc, left_count=short_pivot_interval, right_count=short_pivot_interval, name_pivot="short_pivot",
+                                     strength=strength, engine=engine)
+
+    # Index the short pivot points once for all the candlesticks
+    with stage("ihs", "index"):
+        pivot       = ohlc["pivot"].to_numpy()
+        short_pivot = ohlc["short_pivot"].to_numpy()
+        short_index = PivotIndex.from_ohlc(ohlc, "short_pivot")
+
+    # Only the candlesticks that are both a long and a short pivot low are checked
+    with stage("ihs", "candidates"):
+        candles = np.flatnonzero((pivot == 1) & (short_pivot == 1))
+        candles = candles[candles >= lookback]
+    count_windows("ihs", len(candles), max(len(ohlc) - lookback, 0) - len(candles))
     
     
     if not progress:
-        candle_iter = range(lookback, len(ohlc))
+        candle_iter = candles.tolist()
     else:
-        candle_iter = tqdm(range(lookback, len(ohlc)), desc="Finding inverse head and shoulder patterns...")
+        candle_iter = tqdm(candles.tolist(), desc="Finding inverse head and shoulder patterns...")
        
-    for candle_idx in candle_iter:
-        
-        if ohlc.loc[candle_idx, "pivot"] != 1 or ohlc.loc[candle_idx,"short_pivot"] != 1:
-            continue
-        
-
-        maxim, minim, xxmax, xxmin, maxacount, minacount, maxbcount, minbcount = find_points(ohlc, candle_idx, lookback)
-        if minbcount<1 or minacount<1 or maxbcount<1 or maxacount<1:
-            continue
-
-        slmax, _, _, _, _ = linregress(xxmax, maxim)
-        
-        headidx = np.argmin(minim, axis=0)
-        
-         # If the head index is the last value, then continue
-        if len(minim) - 1 == headidx:
-            continue       
-
-  
-        if minim[headidx-1]-minim[headidx]>0 and (minim[headidx]/minim[headidx-1] < 1 and minim[headidx]/minim[headidx-1] >= head_ratio_before)  and \
-            (minim[headidx]/minim[headidx+1] < 1 and minim[headidx]/minim[headidx+1] >= head_ratio_after) and \
-            minim[headidx+1]-minim[headidx]> 0 and abs(slmax)<=upper_slmax and \
-            xxmax[0]>xxmin[headidx-1] and xxmax[1]<xxmin[headidx+1]: 
-
-
-                ohlc.loc[candle_idx, "chart_type"] = "ihs"
-            
-                # Get the index and values of the IHS chart pattern
-                indexes = [int(xxmin[headidx-1]), int(xxmax[0]), int(xxmin[headidx]), int(xxmax[1]), int(xxmin[headidx+1]) ]
-                values  = [minim[headidx-1], maxim[0], minim[headidx], maxim[1], minim[headidx+1]]
-            
-                # Create a tuple of the index and values and sort them by the index
-                list_idx_values       =  [ (i, v) for i, v in zip(indexes, values)]
-                 
-                # Assign the index and values
-                ohlc.at[candle_idx, "ihs_idx"]   = [ t[0] for t in list_idx_values]
-                ohlc.at[candle_idx, "ihs_point"] = [ t[1] for t in list_idx_values]    
- 
-            
+    found = []
+    with stage("ihs", "check"):
+        for candle_idx in candle_iter:
+
+            maxim, minim, xxmax, xxmin, maxacount, minacount, maxbcount, minbcount = find_points(ohlc, candle_idx, lookback, short_index)
+
+            result = _ihs_check(maxim, minim, xxmax, xxmin, maxacount, minacount, maxbcount, minbcount,
+                                head_ratio_before, head_ratio_after, upper_slmax)
+            if result is not None:
+                found.append((candle_idx, result))
+
+    with stage("ihs", "writeback"):
+        for candle_idx, result in found:
+            assign_pattern(ohlc, candle_idx, result)
 
     return ohlc
 
 
+def _ihs_check(maxim: np.array, minim: np.array, xxmax: np.array, xxmin: np.array, maxacount: int, minacount: int,
+               maxbcount: int, minbcount: int, head_ratio_before: float = 0.98, head_ratio_after: float = 0.98,
+               upper_slmax: float = 1e-4) -> Union[None, Dict[str, Any]]:
+    """
+    Check if the short pivot points around the candlestick form an inverse head and shoulders pattern
+
+    :params maxim, minim, xxmax, xxmin and the counts are the output of `find_points`
+    :type :np.array
+
+    The other parameters are the same as in `find_inverse_head_and_shoulders`
+
+    :return (Union[None, Dict[str, Any]])
+    """
+
+    if minbcount<1 or minacount<1 or maxbcount<1 or maxacount<1:
+        return None
+
+    slmax, _, _ = linregress_points(xxmax, maxim)
+
+    headidx = np.argmin(minim, axis=0)
+
+    # If the head index is the last value, then continue
+    if len(minim) - 1 == headidx:
+        return None       
+
+    if minim[headidx-1]-minim[headidx]>0 and (minim[headidx]/minim[headidx-1] < 1 and minim[headidx]/minim[headidx-1] >= head_ratio_before)  and \
+        (minim[headidx]/minim[headidx+1] < 1 and minim[headidx]/minim[headidx+1] >= head_ratio_after) and \
+        minim[headidx+1]-minim[headidx]> 0 and abs(slmax)<=upper_slmax and \
+        xxmax[0]>xxmin[headidx-1] and xxmax[1]<xxmin[headidx+1]: 
+
+            # Get the index and values of the IHS chart pattern
+            indexes = [int(xxmin[headidx-1]), int(xxmax[0]), int(xxmin[headidx]), int(xxmax[1]), int(xxmin[headidx+1]) ]
+            values  = [minim[headidx-1], maxim[0], minim[headidx], maxim[1], minim[headidx+1]]
+
+            return {"chart_type": "ihs", "ihs_idx": indexes, "ihs_point": values}
+
+    return None
@@ -0,0 +1,181 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Fast loading of OHLC CSV files in the Dukascopy format of `data/eurusd-4h.csv`
+"""
+
+import numpy as np
+import pandas as pd
+
+from chart_patterns.chart_patterns.utils import columns_message
+from typing import Dict, Iterator, Tuple, Union
+
+
+# Format of the `Date` column, e.g. `04.05.2003 21:00:00.000`
+DATE_FORMAT = "%d.%m.%Y %H:%M:%S.%f"
+
+# Positions of the separators and of the digits of the day, month, year, hours, minutes, seconds and milliseconds
+_DATE_SEPARATORS = {2: ".", 5: ".", 10: " ", 13: ":", 16: ":", 19: "."}
+_DATE_FIELDS     = {"day": (0, 2), "month": (3, 5), "year": (6, 10), "hours": (11, 13), "minutes": (14, 16),
+                    "seconds": (17, 19), "milliseconds": (20, 23)}
+
+
+def parse_dates(values: Union[np.ndarray, pd.Series], date_format: str = DATE_FORMAT) -> np.ndarray:
+    """
+    Parse the timestamps of the `Date` column. The default format is parsed from the bytes of the strings with
+    array operations, which is much faster than `pd.to_datetime`. Other formats, and timestamps that do not have
+    exactly the default layout, are parsed by `pd.to_datetime` with the format.
+
+    :params values is the array of timestamp strings
+    :type :Union[np.ndarray, pd.Series]
+
+    :params date_format is the format of the timestamps
+    :type :str
+
+    :return (np.ndarray) of `datetime64[ms]`
+    """
+
+    values = np.asarray(values)
+
+    if date_format == DATE_FORMAT and len(values) > 0:
+        try:
+            # One byte more than the format so longer timestamps are not truncated
+            raw = values.astype("S24")
+        except (UnicodeEncodeError, ValueError):
+            raw = None
+
+        if raw is not None and (np.char.str_len(raw) == 23).all():
+            chars = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, 24)[:, :23]
+
+            separators = all((chars[:, pos] == ord(char)).all() for pos, char in _DATE_SEPARATORS.items())
+            digits     = np.delete(chars, list(_DATE_SEPARATORS), axis=1)
+
+            if separators and ((digits >= ord("0")) & (digits <= ord("9"))).all():
+                fields = {}
+                for name, (start, stop) in _DATE_FIELDS.items():
+                    fields[name] = np.zeros(len(chars), dtype=np.int64)
+                    for pos in range(start, stop):
+                        fields[name] = fields[name] * 10 + chars[:, pos] - ord("0")
+
+                # Any field out of range is left to `pd.to_datetime`, which raises
+                in_range = (fields["month"] >= 1) & (fields["month"] <= 12) & (fields["day"] >= 1) & \
+                           (fields["hours"] < 24) & (fields["minutes"] < 60) & (fields["seconds"] < 60)
+
+                if in_range.all():
+                    months = ((fields["year"] - 1970) * 12 + fields["month"] - 1).astype("datetime64[M]")
+                    days   = months.astype("datetime64[D]") + (fields["day"] - 1)
+
+                    # A day past the end of its month, e.g. 31.04, would roll over into the next month
+                    if (days.astype("datetime64[M]") == months).all():
+                        milliseconds = ((fields["hours"] * 60 + fields["minutes"]) * 60 + fields["seconds"]) * 1000 + \
+                                       fields["milliseconds"]
+
+                        return days.astype("datetime64[ms]") + milliseconds.astype("timedelta64[ms]")
+
+    return pd.to_datetime(values, format=date_format).to_numpy().astype("datetime64[ms]")
+
+
+def _column_dtypes(path: str, price_dtype: str, volume_dtype: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Get the dtype and the new name of each column read from the file. The prices columns are found without case
+    like in `check_ohlc_names`
+    """
+
+    columns = pd.read_csv(path, nrows=0).columns
+    lower   = columns.str.lower()
+    dtypes  = {}
+    names   = {}
+
+    for name in ["open", "high", "low", "close"]:
+        matches = np.flatnonzero(lower.str.contains(name))
+        if len(matches) == 0:
+            columns_message(name)
+
+        dtypes[columns[matches[0]]] = price_dtype
+        names[columns[matches[0]]]  = name
+
+    for column, name in zip(columns, lower):
+        if name in ["date", "volume"]:
+            dtypes[column] = "object" if name == "date" else volume_dtype
+            names[column]  = name
+
+    return dtypes, names
+
+
+def _prepare_chunk(chunk: pd.DataFrame, names: Dict[str, str], date_format: str) -> pd.DataFrame:
+    """
+    Rename the columns of a chunk read from the file, put them in the OHLC order and parse the dates
+    """
+
+    chunk = chunk.rename(columns=names)
+    chunk = chunk[[name for name in ["date", "open", "high", "low", "close", "volume"] if name in chunk.columns]]
+
+    if "date" in chunk.columns:
+        chunk["date"] = parse_dates(chunk["date"].to_numpy(), date_format)
+
+    return chunk
+
+
+def iter_ohlc_csv(path: str, chunksize: int = 1_000_000, date_format: str = DATE_FORMAT, price_dtype: str = "float64",
+                  volume_dtype: str = "float32") -> Iterator[pd.DataFrame]:
+    """
+    Read an OHLC CSV file in chunks. Only the date, prices and volume columns are read, the other ones are skipped.
+    Each chunk has the `date`, `open`, `high`, `low`, `close` and `volume` columns (the date and volume if they are in
+    the file) and its index continues the one of the previous chunk.
+
+    :params path is the path of the CSV file
+    :type :str
+
+    :params chunksize is the number of rows of each chunk
+    :type :int
+
+    :params date_format is the format of the `Date` column
+    :type :str
+
+    :params price_dtype is the dtype of the prices. The detectors compute with float64, so "float32" halves the memory
+            of the prices but can change the patterns found
+    :type :str
+
+    :params volume_dtype is the dtype of the volume
+    :type :str
+
+    :return (Iterator[pd.DataFrame])
+    """
+
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    dtypes, names = _column_dtypes(path, price_dtype, volume_dtype)
+
+    for chunk in pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize):
+        yield _prepare_chunk(chunk, names, date_format)
+
+
+def read_ohlc_csv(path: str, chunksize: Union[None, int] = None, date_format: str = DATE_FORMAT,
+                  price_dtype: str = "float64", volume_dtype: str = "float32") -> pd.DataFrame:
+    """
+    Read an OHLC CSV file such as `data/eurusd-4h.csv`. The dates are parsed and the columns are renamed to the
+    names of `check_ohlc_names`, so the dataframe can be given to the detectors as is.
+
+    :params path is the path of the CSV file
+    :type :str
+
+    :params chunksize is the number of rows read at a time, which bounds the memory used by the parser.
+            The whole file is read at once if not given
+    :type :Union[None, int]
+
+    The other parameters are the same as in `iter_ohlc_csv`
+
+    :return (pd.DataFrame)
+    """
+
+    if chunksize is not None:
+        chunks = list(iter_ohlc_csv(path, chunksize, date_format, price_dtype, volume_dtype))
+        if len(chunks) > 0:
+            return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+    # A file without rows has no chunk, it is read at once like the header only
+
+    dtypes, names = _column_dtypes(path, price_dtype, volume_dtype)
+
+    return _prepare_chunk(pd.read_csv(path, usecols=list(dtypes), dtype=dtypes), names, date_format)
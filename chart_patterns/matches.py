@@ -0,0 +1,307 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Compact table of the chart patterns found, with one record per pattern instead of one object per candlestick
+"""
+
+import numpy as np
+import pandas as pd
+
+from numpy.lib.recfunctions import repack_fields
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+
+# Lookup tables of the codes stored in the `chart_type` and `pattern_type` fields of the records
+CHART_TYPES   = ["flag", "pennant", "triangle", "double", "hs", "ihs"]
+PATTERN_TYPES = ["", "ascending", "descending", "symmetrical", "tops", "bottoms"]
+
+# One record per pattern found. The pivot points of the pattern are the rows [points_start, points_start + points_count)
+# of the points table. The slopes and intercepts are NaN for the patterns without trendlines (double, hs, ihs).
+MATCH_DTYPE = np.dtype([("chart_type", "u1"), ("pattern_type", "u1"), ("candle_idx", "i8"), ("points_start", "i8"),
+                        ("points_count", "i4"), ("slmin", "f8"), ("intercmin", "f8"), ("slmax", "f8"), ("intercmax", "f8")])
+
+# The kind of a point is 1 for a pivot low, 2 for a pivot high and 0 for the ordered points of the double, hs and ihs patterns
+POINT_DTYPE = np.dtype([("idx", "i8"), ("price", "f8"), ("kind", "i1")])
+
+# Patterns with trendlines: the names of their columns of highs, lows, highs indexes and lows indexes
+_TRENDLINE_COLUMNS = {"flag":     ("flag_highs", "flag_lows", "flag_highs_idx", "flag_lows_idx"),
+                      "pennant":  ("pennant_highs", "pennant_lows", "pennant_highs_idx", "pennant_lows_idx"),
+                      "triangle": (None, None, "triangle_high_idx", "triangle_low_idx")}
+
+# Patterns made of ordered points: the names of their indexes and prices columns
+_SEQUENCE_COLUMNS = {"double": ("double_idx", "double_point"), "hs": ("hs_idx", "hs_point"), "ihs": ("ihs_idx", "ihs_point")}
+
+
+class PatternMatches:
+    """
+    Sparse result of a chart pattern scan. Only the patterns found are stored, in two record arrays:
+    `records` with one row per pattern and `points` with the pivot points of all the patterns.
+    Use `to_frame` to get the same dataframe as `scan_all_patterns`.
+    """
+
+    __slots__ = ("records", "points")
+
+    def __init__(self, records: Union[None, np.ndarray] = None, points: Union[None, np.ndarray] = None):
+        """
+        :params records is the record array of the patterns with the `MATCH_DTYPE` dtype
+        :type :Union[None, np.ndarray]
+
+        :params points is the record array of the pivot points with the `POINT_DTYPE` dtype
+        :type :Union[None, np.ndarray]
+        """
+
+        self.records = np.zeros(0, dtype=MATCH_DTYPE) if records is None else records
+        self.points  = np.zeros(0, dtype=POINT_DTYPE) if points is None else points
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __repr__(self) -> str:
+        return f"PatternMatches({len(self)} patterns)"
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the two record arrays
+        """
+
+        return self.records.nbytes + self.points.nbytes
+
+    @classmethod
+    def from_results(cls, results: Iterable[Tuple[int, Dict[str, Any]]], high: Union[None, np.ndarray] = None,
+                     low: Union[None, np.ndarray] = None) -> "PatternMatches":
+        """
+        Build the table from the candlestick index and the columns returned by the pattern checks
+
+        :params results is the candlestick index and the columns of each pattern found
+        :type :Iterable[Tuple[int, Dict[str, Any]]]
+
+        :params high is the high prices of the series, read for the prices of the triangle points that the triangle
+                check does not return. They are NaN if not given
+        :type :Union[None, np.ndarray]
+
+        :params low is the low prices of the series, same as `high`
+        :type :Union[None, np.ndarray]
+
+        :return (PatternMatches)
+        """
+
+        records = []
+        points  = []
+        count   = 0
+
+        for candle_idx, result in results:
+            chart_type = result["chart_type"]
+
+            if chart_type in _TRENDLINE_COLUMNS:
+                highs, lows, highs_idx, lows_idx = _TRENDLINE_COLUMNS[chart_type]
+                high_idx  = np.asarray(result[highs_idx], dtype=float)
+                low_idx   = np.asarray(result[lows_idx], dtype=float)
+                high_vals = _point_prices(result, highs, high_idx, high)
+                low_vals  = _point_prices(result, lows, low_idx, low)
+
+                new_points = [(idx, price, 2) for idx, price in zip(high_idx, high_vals)] + \
+                             [(idx, price, 1) for idx, price in zip(low_idx, low_vals)]
+                fit        = tuple(result[f"{chart_type}_{name}"] for name in ["slmin", "intercmin", "slmax", "intercmax"])
+
+            elif chart_type in _SEQUENCE_COLUMNS:
+                idx_column, point_column = _SEQUENCE_COLUMNS[chart_type]
+
+                new_points = [(idx, price, 0) for idx, price in zip(result[idx_column], result[point_column])]
+                fit        = (np.nan, np.nan, np.nan, np.nan)
+
+            else:
+                raise ValueError(f"Unknown chart type `{chart_type}`")
+
+            pattern_type = result.get(f"{chart_type}_type", "")
+            if pattern_type not in PATTERN_TYPES:
+                raise ValueError(f"Unknown {chart_type} type `{pattern_type}`")
+
+            records.append((CHART_TYPES.index(chart_type), PATTERN_TYPES.index(pattern_type), candle_idx, count,
+                            len(new_points)) + fit)
+            points += new_points
+            count  += len(new_points)
+
+        return cls(np.array(records, dtype=MATCH_DTYPE), np.array(points, dtype=POINT_DTYPE))
+
+    @classmethod
+    def from_frame(cls, matches: pd.DataFrame, high: Union[None, np.ndarray] = None,
+                   low: Union[None, np.ndarray] = None) -> "PatternMatches":
+        """
+        Build the table from a dataframe of patterns such as the one of `scan_all_patterns`
+
+        :params matches is the dataframe with the `candle_idx` column and the columns of each pattern
+        :type :pd.DataFrame
+
+        :params high is the high prices of the series, read for the prices of the triangle points that the dataframe
+                does not have. They are NaN if not given
+        :type :Union[None, np.ndarray]
+
+        :params low is the low prices of the series, same as `high`
+        :type :Union[None, np.ndarray]
+
+        :return (PatternMatches)
+        """
+
+        columns = matches.columns.tolist()
+        results = []
+        for row in matches.itertuples(index=False):
+            row = dict(zip(columns, row))
+            results.append((int(row["candle_idx"]), {name: value for name, value in row.items() if _is_set(value)}))
+
+        return cls.from_results(results, high, low)
+
+    def select(self, chart_type: str) -> "PatternMatches":
+        """
+        Get the patterns of one chart type
+
+        :params chart_type is the name of the pattern. Options - ["flag", "pennant", "triangle", "double", "hs", "ihs"]
+        :type :str
+
+        :return (PatternMatches)
+        """
+
+        if chart_type not in CHART_TYPES:
+            return PatternMatches()
+
+        return self.take(np.flatnonzero(self.records["chart_type"] == CHART_TYPES.index(chart_type)))
+
+    def take(self, positions: Union[List[int], np.ndarray]) -> "PatternMatches":
+        """
+        Get the patterns at the given positions of the table
+
+        :params positions is the positions of the patterns
+        :type :Union[List[int], np.ndarray]
+
+        :return (PatternMatches)
+        """
+
+        records = self.records[np.asarray(positions, dtype=np.int64)]
+        points  = [self.points[start:start + count] for start, count in zip(records["points_start"], records["points_count"])]
+        starts  = np.concatenate([[0], np.cumsum(records["points_count"])[:-1]]).astype(np.int64)
+
+        records                 = records.copy()
+        records["points_start"] = starts[:len(records)]
+
+        return PatternMatches(records, np.concatenate(points) if len(points) > 0 else None)
+
+    @classmethod
+    def concat(cls, tables: Iterable["PatternMatches"]) -> "PatternMatches":
+        """
+        Join tables of patterns one after the other
+
+        :params tables is the tables to join
+        :type :Iterable[PatternMatches]
+
+        :return (PatternMatches)
+        """
+
+        tables = [table.take(np.arange(len(table))) for table in tables]
+        if len(tables) == 0:
+            return cls()
+
+        records = np.concatenate([table.records for table in tables])
+        offsets = np.cumsum([0] + [len(table.points) for table in tables[:-1]])
+
+        records["points_start"] += np.repeat(offsets, [len(table) for table in tables]).astype(np.int64)
+
+        return cls(records, np.concatenate([table.points for table in tables]))
+
+    def keys(self) -> List[bytes]:
+        """
+        Get a key of each pattern that is equal for two patterns with the same candlestick, type, trendlines and points
+
+        :return (List[bytes])
+        """
+
+        records = repack_fields(self.records[[name for name in MATCH_DTYPE.names if name != "points_start"]])
+
+        return [records[k].tobytes() + self.points[start:start + count].tobytes()
+                for k, (start, count) in enumerate(zip(self.records["points_start"], self.records["points_count"]))]
+
+    def result(self, k: int) -> Tuple[int, Dict[str, Any]]:
+        """
+        Get the candlestick index and the columns of the k-th pattern, as returned by the pattern checks
+
+        :params k is the position of the pattern in the table
+        :type :int
+
+        :return (Tuple[int, Dict[str, Any]])
+        """
+
+        record       = self.records[k]
+        chart_type   = CHART_TYPES[record["chart_type"]]
+        pattern_type = PATTERN_TYPES[record["pattern_type"]]
+        candle_idx   = int(record["candle_idx"])
+        points     = self.points[record["points_start"]:record["points_start"] + record["points_count"]]
+
+        # Same columns, in the same order, as the pattern checks
+        if chart_type == "double":
+            result = {"double_idx": points["idx"].tolist(), "double_point": points["price"].tolist(),
+                      "double_type": pattern_type, "chart_type": "double"}
+
+        elif chart_type in _SEQUENCE_COLUMNS:
+            idx_column, point_column = _SEQUENCE_COLUMNS[chart_type]
+            result = {"chart_type": chart_type, idx_column: points["idx"].tolist(), point_column: points["price"].tolist()}
+
+        elif chart_type == "triangle":
+            result = {"chart_type": "triangle", "triangle_type": pattern_type,
+                      "triangle_slmax": float(record["slmax"]), "triangle_slmin": float(record["slmin"]),
+                      "triangle_intercmin": float(record["intercmin"]), "triangle_intercmax": float(record["intercmax"]),
+                      "triangle_high_idx": points["idx"][points["kind"] == 2].astype(float),
+                      "triangle_low_idx": points["idx"][points["kind"] == 1].astype(float), "triangle_point": candle_idx}
+
+        else:
+            highs, lows, highs_idx, lows_idx = _TRENDLINE_COLUMNS[chart_type]
+            high_points = points[points["kind"] == 2]
+            low_points  = points[points["kind"] == 1]
+
+            result = {"chart_type": chart_type, f"{chart_type}_point": candle_idx, highs: high_points["price"], lows: low_points["price"],
+                      highs_idx: high_points["idx"].astype(float), lows_idx: low_points["idx"].astype(float),
+                      f"{chart_type}_slmax": float(record["slmax"]), f"{chart_type}_slmin": float(record["slmin"]),
+                      f"{chart_type}_intercmin": float(record["intercmin"]), f"{chart_type}_intercmax": float(record["intercmax"])}
+
+        return candle_idx, result
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the patterns as a dataframe with one row per pattern, like `scan_all_patterns`
+
+        :return (pd.DataFrame)
+        """
+
+        rows = []
+        for k in range(len(self)):
+            candle_idx, result = self.result(k)
+            rows.append({"candle_idx": candle_idx, **result})
+
+        if len(rows) == 0:
+            return pd.DataFrame(columns=["candle_idx", "chart_type"])
+
+        return pd.DataFrame(rows)
+
+
+def _point_prices(result: Dict[str, Any], column: Union[None, str], idx: np.ndarray,
+                  prices: Union[None, np.ndarray]) -> np.ndarray:
+    """
+    Get the prices of the pivot points of a pattern, from its column or else from the prices of the series
+    """
+
+    if column is not None:
+        return np.asarray(result[column], dtype=float)
+
+    if prices is None:
+        return np.full(len(idx), np.nan)
+
+    return np.asarray(prices, dtype=float)[idx.astype(np.int64)]
+
+
+def _is_set(value: Any) -> bool:
+    """
+    Check if a cell of a dataframe of patterns holds a value, the missing columns of a pattern are NaN
+    """
+
+    if isinstance(value, (list, np.ndarray)):
+        return True
+
+    return not pd.isna(value)
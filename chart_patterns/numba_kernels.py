@@ -0,0 +1,318 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Kernels of the "numba" engine. Only imported when numba is installed, see `engines.resolve_engine`
+"""
+
+import numba
+import numpy as np
+
+from chart_patterns.chart_patterns.engines import register_kernel
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from typing import List, Tuple
+
+
+@numba.njit(cache=True)
+def _pivot_codes(high: np.ndarray, low: np.ndarray, left_count: int, right_count: int) -> np.ndarray:
+
+    size  = len(high)
+    codes = np.zeros(size, dtype=np.int64)
+
+    for row in range(left_count, size - right_count):
+        pivot_low  = True
+        pivot_high = True
+
+        # NaN comparisons are False, so a NaN never stops a pivot point, like `find_pivot_codes`
+        for idx in range(row - left_count, row + right_count + 1):
+            if low[row] > low[idx]:
+                pivot_low = False
+            if high[row] < high[idx]:
+                pivot_high = False
+
+        if pivot_low and pivot_high:
+            codes[row] = 3
+        elif pivot_low:
+            codes[row] = 1
+        elif pivot_high:
+            codes[row] = 2
+
+    return codes
+
+
+@register_kernel("pivot_codes", "numba")
+def find_pivot_codes(high: np.ndarray, low: np.ndarray, left_count: int = 3, right_count: int = 3) -> np.ndarray:
+    """
+    Same as `pivot_points.find_pivot_codes` with a compiled loop over the rows
+
+    :return (np.ndarray)
+    """
+
+    return _pivot_codes(np.ascontiguousarray(high, dtype=np.float64), np.ascontiguousarray(low, dtype=np.float64),
+                        left_count, right_count)
+
+
+@numba.njit(cache=True)
+def _extreme_reach_stack(values: np.ndarray) -> np.ndarray:
+
+    size  = len(values)
+    reach = np.empty(size, dtype=np.int64)
+    stack = np.empty(size, dtype=np.int64)
+    top   = 0
+
+    for idx in range(size):
+        value = values[idx]
+        if value != value:
+            reach[idx] = idx
+            continue
+
+        while top > 0 and values[stack[top - 1]] >= value:
+            top -= 1
+
+        reach[idx]  = idx - stack[top - 1] - 1 if top > 0 else idx
+        stack[top]  = idx
+        top        += 1
+
+    return reach
+
+
+@register_kernel("extreme_reach", "numba")
+def extreme_reach(values: np.ndarray) -> np.ndarray:
+    """
+    Same as `pivot_points._extreme_reach_loop` with a compiled monotonic stack
+
+    :return (np.ndarray)
+    """
+
+    return _extreme_reach_stack(np.ascontiguousarray(values, dtype=np.float64))
+
+
+@numba.njit(cache=True)
+def _window_bounds(positions: np.ndarray, size: int, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+
+    # Same as `PivotIndex.bounds` for the windows [candle - lookback, candle] of `window_counts`, the bounds only move forward
+    count = max(size - lookback, 0)
+    first = np.empty(count, dtype=np.int64)
+    last  = np.empty(count, dtype=np.int64)
+    lo    = 0
+    hi    = 0
+
+    for k in range(count):
+        candle = lookback + k
+        while lo < len(positions) and positions[lo] < candle - lookback:
+            lo += 1
+        while hi < len(positions) and positions[hi] < candle + 1:
+            hi += 1
+
+        first[k] = lo
+        last[k]  = hi
+
+    return first, last
+
+
+@numba.njit(cache=True)
+def _enough_points(high_count: int, low_count: int, min_points: int) -> bool:
+    return not (high_count < min_points and low_count < min_points) and high_count > 0 and low_count > 0
+
+
+@numba.njit(cache=True)
+def _drop_counts(prices: np.ndarray) -> np.ndarray:
+
+    # Number of prices lower than the one before them up to each point, like `PivotIndex.drops`
+    drops = np.zeros(len(prices), dtype=np.int64)
+    for idx in range(1, len(prices)):
+        drops[idx] = drops[idx - 1] + (prices[idx] < prices[idx - 1])
+
+    return drops
+
+
+@numba.njit(cache=True, error_model="numpy")
+def _flag_mask(high_idx: np.ndarray, high_prices: np.ndarray, low_idx: np.ndarray, low_prices: np.ndarray,
+               slmin: np.ndarray, rmin: np.ndarray, slmax: np.ndarray, rmax: np.ndarray, size: int, lookback: int,
+               min_points: int, r_max: float, r_min: float, slope_max: float, slope_min: float,
+               lower_ratio_slope: float, upper_ratio_slope: float) -> np.ndarray:
+
+    high_first, high_last = _window_bounds(high_idx, size, lookback)
+    low_first, low_last   = _window_bounds(low_idx, size, lookback)
+    high_drops            = _drop_counts(high_prices)
+    low_drops             = _drop_counts(low_prices)
+    found                 = np.zeros(len(high_first), dtype=np.bool_)
+
+    for k in range(len(found)):
+        if not _enough_points(high_last[k] - high_first[k], low_last[k] - low_first[k], min_points):
+            continue
+        if high_last[k] - 1 > high_first[k] and high_drops[high_last[k] - 1] > high_drops[high_first[k]]:
+            continue
+        if low_last[k] - 1 > low_first[k] and low_drops[low_last[k] - 1] > low_drops[low_first[k]]:
+            continue
+
+        candle = lookback + k
+        rising = abs(rmax[candle]) >= r_max and abs(rmin[candle]) >= r_min and slmin[candle] > slope_min and \
+                 slmax[candle] > slope_max
+        if not (rising or (slmin[candle] < slope_min and slmax[candle] < slope_max)):
+            continue
+
+        ratio    = slmin[candle] / slmax[candle]
+        found[k] = ratio > lower_ratio_slope and ratio < upper_ratio_slope
+
+    return found
+
+
+@numba.njit(cache=True, error_model="numpy")
+def _pennant_mask(high_idx: np.ndarray, low_idx: np.ndarray, slmin: np.ndarray, rmin: np.ndarray, slmax: np.ndarray,
+                  rmax: np.ndarray, size: int, lookback: int, min_points: int, r_max: float, r_min: float,
+                  slope_max: float, slope_min: float, lower_ratio_slope: float, upper_ratio_slope: float) -> np.ndarray:
+
+    high_first, high_last = _window_bounds(high_idx, size, lookback)
+    low_first, low_last   = _window_bounds(low_idx, size, lookback)
+    found                 = np.zeros(len(high_first), dtype=np.bool_)
+
+    for k in range(len(found)):
+        candle = lookback + k
+        ratio  = abs(slmax[candle] / slmin[candle])
+
+        found[k] = _enough_points(high_last[k] - high_first[k], low_last[k] - low_first[k], min_points) and \
+                   abs(rmax[candle]) >= r_max and abs(rmin[candle]) >= r_min and slmin[candle] >= slope_min and \
+                   slmax[candle] <= slope_max and ratio > lower_ratio_slope and ratio < upper_ratio_slope
+
+    return found
+
+
+# Codes of the triangle types of `_triangle_mask`
+_TRIANGLE_CODES = {"symmetrical": 0, "ascending": 1, "descending": 2}
+
+
+@numba.njit(cache=True)
+def _triangle_mask(high_idx: np.ndarray, low_idx: np.ndarray, slmin: np.ndarray, rmin: np.ndarray, slmax: np.ndarray,
+                   rmax: np.ndarray, size: int, lookback: int, min_points: int, rlimit: float, slmax_limit: float,
+                   slmin_limit: float, triangle_code: int) -> np.ndarray:
+
+    high_first, high_last = _window_bounds(high_idx, size, lookback)
+    low_first, low_last   = _window_bounds(low_idx, size, lookback)
+    found                 = np.zeros(len(high_first), dtype=np.bool_)
+
+    for k in range(len(found)):
+        candle = lookback + k
+        if not (_enough_points(high_last[k] - high_first[k], low_last[k] - low_first[k], min_points) and
+                abs(rmax[candle]) >= rlimit and abs(rmin[candle]) >= rlimit):
+            continue
+
+        if triangle_code == 0:
+            found[k] = slmin[candle] >= slmin_limit and slmax[candle] <= -1*slmax_limit
+        elif triangle_code == 1:
+            found[k] = slmin[candle] >= slmin_limit and slmax[candle] >= -1*slmax_limit and slmax[candle] <= slmax_limit
+        elif triangle_code == 2:
+            found[k] = slmax[candle] <= -1*slmax_limit and slmin[candle] >= -1*slmin_limit and slmin[candle] <= slmin_limit
+
+    return found
+
+
+def _fit_arrays(fits: Tuple[np.ndarray, ...]) -> List[np.ndarray]:
+    """
+    Get the slmin, rmin, slmax and rmax arrays of the output of `linregress_pivot_windows`
+    """
+
+    slmin, _, rmin, slmax, _, rmax = fits
+
+    return [np.ascontiguousarray(values, dtype=np.float64) for values in [slmin, rmin, slmax, rmax]]
+
+
+@register_kernel("flag_candidates", "numba")
+def flag_candidates(index: PivotIndex, fits: Tuple[np.ndarray, ...], size: int, lookback: int, min_points: int = 3,
+                    r_max: float = 0.9, r_min: float = 0.9, slope_max: float = 0, slope_min: float = 0,
+                    lower_ratio_slope: float = 0.9, upper_ratio_slope: float = 1.05) -> np.ndarray:
+    """
+    Same as `flag._flag_candidates` with a compiled loop over the candlesticks
+
+    :return (np.ndarray)
+    """
+
+    found = _flag_mask(index.high_idx, index.high_prices, index.low_idx, index.low_prices, *_fit_arrays(fits), size,
+                       lookback, min_points, r_max, r_min, slope_max, slope_min, lower_ratio_slope, upper_ratio_slope)
+
+    return np.flatnonzero(found) + lookback
+
+
+@register_kernel("pennant_candidates", "numba")
+def pennant_candidates(index: PivotIndex, fits: Tuple[np.ndarray, ...], size: int, lookback: int, min_points: int = 3,
+                       r_max: float = 0.9, r_min: float = 0.9, slope_max: float = -0.0001, slope_min: float = 0.0001,
+                       lower_ratio_slope: float = 0.95, upper_ratio_slope: float = 1) -> np.ndarray:
+    """
+    Same as `pennant._pennant_candidates` with a compiled loop over the candlesticks
+
+    :return (np.ndarray)
+    """
+
+    found = _pennant_mask(index.high_idx, index.low_idx, *_fit_arrays(fits), size, lookback, min_points, r_max, r_min,
+                          slope_max, slope_min, lower_ratio_slope, upper_ratio_slope)
+
+    return np.flatnonzero(found) + lookback
+
+
+@register_kernel("triangle_candidates", "numba")
+def triangle_candidates(index: PivotIndex, fits: Tuple[np.ndarray, ...], size: int, lookback: int, min_points: int = 3,
+                        rlimit: int = 0.9, slmax_limit: float = 0.00001, slmin_limit: float = 0.00001,
+                        triangle_type: str = "ascending") -> np.ndarray:
+    """
+    Same as `triangles._triangle_candidates` with a compiled loop over the candlesticks
+
+    :return (np.ndarray)
+    """
+
+    found = _triangle_mask(index.high_idx, index.low_idx, *_fit_arrays(fits), size, lookback, min_points, float(rlimit),
+                           float(slmax_limit), float(slmin_limit), _TRIANGLE_CODES.get(triangle_type, -1))
+
+    return np.flatnonzero(found) + lookback
+
+
+@numba.njit(cache=True, error_model="numpy")
+def _doubles_runs(pivot_idx: np.ndarray, pivot_pos: np.ndarray, size: int, lookback: int, tops: bool, bottoms: bool,
+                  tops_max_ratio: float, bottoms_min_ratio: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    count      = max(size - lookback, 0)
+    candles    = np.empty(count, dtype=np.int64)
+    runs       = np.empty(count, dtype=np.int64)
+    run_tops   = np.empty(count, dtype=np.bool_)
+    found      = 0
+    lo         = 0
+    hi         = 0
+
+    for candle in range(lookback, size):
+        while lo < len(pivot_idx) and pivot_idx[lo] < candle - lookback:
+            lo += 1
+        while hi < len(pivot_idx) and pivot_idx[hi] < candle + 1:
+            hi += 1
+        if hi - lo != 5:
+            continue
+
+        p0, p1, p2, p3, p4 = pivot_pos[lo], pivot_pos[lo + 1], pivot_pos[lo + 2], pivot_pos[lo + 3], pivot_pos[lo + 4]
+        is_top    = tops and p0 < p1 and p0 < p3 and p2 < p1 and p2 < p3 and p4 < p1 and p4 < p3 and \
+                    p1 > p3 and p1/p3 <= tops_max_ratio
+        is_bottom = bottoms and p0 > p1 and p0 > p3 and p2 > p1 and p2 > p3 and p4 > p1 and p4 > p3 and \
+                    p1 < p3 and p1/p3 >= bottoms_min_ratio
+
+        if is_top or is_bottom:
+            candles[found]  = candle
+            runs[found]     = lo
+            run_tops[found] = is_top
+            found          += 1
+
+    return candles[:found], runs[:found], run_tops[:found]
+
+
+@register_kernel("doubles", "numba")
+def doubles(index: PivotIndex, size: int, lookback: int = 25, double: str = "tops", tops_max_ratio: float = 1.01,
+            bottoms_min_ratio: float = 0.98, progress: bool = False) -> List[Tuple[int, List[int], List[float], str]]:
+    """
+    Same as `doubles._doubles_vectorized` with a compiled loop over the candlesticks. There is no progress bar
+
+    :return (List[Tuple[int, List[int], List[float], str]])
+    """
+
+    pivot_idx = np.ascontiguousarray(index.pivot_idx, dtype=np.int64)
+    pivot_pos = np.ascontiguousarray(index.pivot_pos, dtype=np.float64)
+
+    candles, runs, run_tops = _doubles_runs(pivot_idx, pivot_pos, size, lookback, double in ["tops", "both"],
+                                            double in ["bottoms", "both"], tops_max_ratio, bottoms_min_ratio)
+
+    return [(int(candle_idx), pivot_idx[run:run + 5].tolist(), pivot_pos[run:run + 5].tolist(), "tops" if top else "bottoms")
+            for candle_idx, run, top in zip(candles, runs, run_tops)]
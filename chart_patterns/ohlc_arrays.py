@@ -0,0 +1,95 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Validated OHLC container of positional NumPy arrays, used by the detectors instead of a dataframe
+"""
+
+import numpy as np
+import pandas as pd
+
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.utils import find_ohlc_column
+
+
+class OHLCArrays:
+    """
+    The open, high, low and close prices of a series as read-only float64 arrays. The columns are checked once when
+    the container is built, and the candlesticks are indexed by position, so no RangeIndex is needed.
+    Slicing returns a container of views of the same arrays, without a copy.
+
+    Every `find_*` function and `scan_all_patterns` accept it in place of the dataframe and return the
+    `PatternMatches` table, as with `readonly=True`.
+    """
+
+    __slots__ = ("open", "high", "low", "close")
+
+    def __init__(self, open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+        """
+        :params open, high, low and close are the arrays of prices. They are only copied if they are not float64
+        :type :np.ndarray
+        """
+
+        prices = []
+        for name, values in [("open", open), ("high", high), ("low", low), ("close", close)]:
+            values = np.asarray(values, dtype=np.float64)
+            if values.ndim != 1:
+                raise ValueError(f"The `{name}` prices must be a 1-d array")
+            if len(values) != len(high):
+                raise ValueError(f"The `{name}` prices do not have the same length as the high prices")
+
+            values = values.view()
+            values.flags.writeable = False
+            prices.append(values)
+
+        self.open, self.high, self.low, self.close = prices
+
+    @classmethod
+    def from_frame(cls, ohlc: pd.DataFrame) -> "OHLCArrays":
+        """
+        Build the container from an OHLC dataframe. The columns are found like in `check_ohlc_names` but are not
+        renamed, and float64 columns are not copied.
+
+        :params ohlc is a dataframe with Open, High, Low, Close data
+        :type :pd.DataFrame
+
+        :return (OHLCArrays)
+        """
+
+        return cls(*(ohlc[find_ohlc_column(ohlc, name)].to_numpy(dtype=float) for name in ["open", "high", "low", "close"]))
+
+    @classmethod
+    def from_store(cls, store: OHLCStore) -> "OHLCArrays":
+        """
+        Build the container from the memory mapped columns of an `OHLCStore`, without a copy
+
+        :params store is the OHLC store
+        :type :OHLCStore
+
+        :return (OHLCArrays)
+        """
+
+        return cls(*(store.column(name) for name in ["open", "high", "low", "close"]))
+
+    def __len__(self) -> int:
+        return len(self.high)
+
+    def __repr__(self) -> str:
+        return f"OHLCArrays({len(self)} bars)"
+
+    def __getitem__(self, index: slice) -> "OHLCArrays":
+        """
+        Get the candlesticks of a slice, indexed from 0 like a dataframe slice after `reset_index`
+
+        :params index is the slice of the candlesticks
+        :type :slice
+
+        :return (OHLCArrays)
+        """
+
+        if not isinstance(index, slice):
+            raise ValueError("Only slices of the candlesticks are supported")
+
+        if index.step not in [None, 1]:
+            raise ValueError("The step of the slice must be 1")
+
+        return OHLCArrays(self.open[index], self.high[index], self.low[index], self.close[index])
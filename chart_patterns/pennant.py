@@ -8,22 +8,33 @@ import numpy as np
 import pandas as pd 
 import plotly.graph_objects as go
 
-from chart_patterns.chart_patterns.charts_utils import find_points
+from chart_patterns.chart_patterns.charts_utils import all_candles, assign_pattern, enough_points, window_counts
+from chart_patterns.chart_patterns.engines import get_kernel, register_kernel
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
 from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
-from scipy.stats import linregress
+from chart_patterns.chart_patterns.regression import linregress_pivot_windows, linregress_points
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.timing import count_windows, stage
 from tqdm import tqdm
+from typing import Any, Dict, Tuple, Union
 
 
 
-def find_pennant(ohlc: pd.DataFrame, lookback: int = 20, min_points: int = 3,
+register_kernel("pennant_candidates", "python")(all_candles)
+
+
+def find_pennant(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], lookback: int = 20, min_points: int = 3,
                 r_max: float = 0.9, r_min: float = 0.9, slope_max: float = -0.0001, slope_min: float = 0.0001, 
                  lower_ratio_slope: float = 0.95, upper_ratio_slope: float = 1,
-                 progress: bool = False) -> pd.DataFrame:
+                 progress: bool = False, engine: Union[None, str] = None,
+                 readonly: bool = False) -> Union[pd.DataFrame, PatternMatches]:
     """
     Find the pennant pattern point
     
-    :params ohlc is the OHLC dataframe
-    :type :pd.DataFrame 
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container (or `OHLCStore`) that is always read in read-only mode
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
     
     :params lookback is the number of periods to use for back candles
     :type :int 
@@ -52,65 +63,143 @@ def find_pennant(ohlc: pd.DataFrame, lookback: int = 20, min_points: int = 3,
     :params progress bar to be displayed or not 
     :type :bool
     
-    :return (pd.DataFrame)
+    :params engine is the implementation to use. Options - [None, "python", "numpy", "numba"]. The "numpy" engine checks the
+            conditions of all the candlesticks at once. The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :params readonly is whether to leave `ohlc` unchanged and only return the patterns found, as a `PatternMatches` table.
+            No column is added to `ohlc` and its columns are not renamed
+    :type :bool
+
+    :return (Union[pd.DataFrame, PatternMatches])
     """
+
+    if readonly or not isinstance(ohlc, pd.DataFrame):
+        # Imported here since the `scan` module imports this one
+        from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+        params = {"lookback": lookback, "min_points": min_points, "r_max": r_max, "r_min": r_min,
+                  "slope_max": slope_max, "slope_min": slope_min, "lower_ratio_slope": lower_ratio_slope,
+                  "upper_ratio_slope": upper_ratio_slope}
+
+        return scan_all_patterns(ohlc, {"pennant": params}, progress=progress, sparse=True, readonly=True, engine=engine)
+
     
-    ohlc["chart_type"]        = ""
-    ohlc["pennant_point"]        = np.nan 
-    ohlc["pennant_highs_idx"]    = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["pennant_lows_idx"]     = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["pennant_highs"]        = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["pennant_lows"]         = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["pennant_slmax"]        = np.nan 
-    ohlc["pennant_slmin"]        = np.nan 
-    ohlc["pennant_intercmin"]    = np.nan
-    ohlc["pennant_intercmax"]    = np.nan
-    
+    with stage("pennant", "setup"):
+        ohlc["chart_type"]        = ""
+        ohlc["pennant_point"]        = np.nan 
+        ohlc["pennant_highs_idx"]    = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["pennant_lows_idx"]     = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["pennant_highs"]        = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["pennant_lows"]         = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["pennant_slmax"]        = np.nan 
+        ohlc["pennant_slmin"]        = np.nan 
+        ohlc["pennant_intercmin"]    = np.nan
+        ohlc["pennant_intercmax"]    = np.nan
+
     # Find the pivot points
-    ohlc = find_all_pivot_points(ohlc, progress=progress)
+    with stage("pennant", "pivots"):
+        ohlc = find_all_pivot_points(ohlc, progress=progress, engine=engine)
     
 
+    # Index the pivot points and fit the pivot lows and highs lines of every window in one pass
+    with stage("pennant", "index"):
+        index = PivotIndex.from_ohlc(ohlc)
+    with stage("pennant", "regression"):
+        fits = linregress_pivot_windows(index, len(ohlc), lookback)
+
+    # Only the candlesticks that can pass the check are visited
+    with stage("pennant", "candidates"):
+        candles = get_kernel("pennant_candidates", engine)(index, fits, len(ohlc), lookback, min_points, r_max, r_min, slope_max, slope_min, lower_ratio_slope, upper_ratio_slope)
+    count_windows("pennant", len(candles), max(len(ohlc) - lookback, 0) - len(candles))
+
     if not progress:
-        candle_iter = range(lookback, len(ohlc))
+        candle_iter = candles.tolist()
     else:
-        candle_iter = tqdm(range(lookback, len(ohlc)), desc="Finding pennant patterns...")
+        candle_iter = tqdm(candles.tolist(), desc="Finding pennant patterns...")
         
-    for candle_idx in candle_iter:
+    found = []
+    with stage("pennant", "check"):
+        for candle_idx in candle_iter:
     
-        maxim = np.array([])
-        minim = np.array([])
-        xxmin = np.array([])
-        xxmax = np.array([])
-
-        for i in range(candle_idx-lookback, candle_idx+1):
-            if ohlc.loc[i,"pivot"] == 1:
-                minim = np.append(minim, ohlc.loc[i, "low"])
-                xxmin = np.append(xxmin, i) 
-            if ohlc.loc[i,"pivot"] == 2:
-                maxim = np.append(maxim, ohlc.loc[i,"high"])
-                xxmax = np.append(xxmax, i)
+            maxim, minim, xxmax, xxmin = index.window(candle_idx - lookback, candle_idx + 1)
 
-        
-        # Check the correct number of pivot points have been found
-        if (xxmax.size < min_points and xxmin.size < min_points) or xxmax.size==0 or xxmin.size==0:
-            continue
+            result = _pennant_check(candle_idx, maxim, minim, xxmax, xxmin, min_points, r_max, r_min, slope_max, slope_min,
+                                    lower_ratio_slope, upper_ratio_slope, fit=tuple(values[candle_idx] for values in fits))
+            if result is not None:
+                found.append((candle_idx, result))
 
-         # Run the regress to get the slope, intercepts and r-squared
-        slmin, intercmin, rmin, pmin, semin = linregress(xxmin, minim)
-        slmax, intercmax, rmax, pmax, semax = linregress(xxmax, maxim)
-        
-        
-        
-        if abs(rmax)>=r_max and abs(rmin)>=r_min and slmin>=slope_min  and slmax<= slope_max  and abs(slmax/slmin) > lower_ratio_slope and abs(slmax/slmin) < upper_ratio_slope:
-                ohlc.loc[candle_idx,"chart_type"]          = "pennant"
-                ohlc.loc[candle_idx, "pennant_point"]         = candle_idx
-                ohlc.at[candle_idx, "pennant_highs"]          = maxim
-                ohlc.at[candle_idx, "pennant_lows"]           = minim
-                ohlc.at[candle_idx, "pennant_highs_idx"]      = xxmax
-                ohlc.at[candle_idx, "pennant_lows_idx"]       = xxmin
-                ohlc.loc[candle_idx, "pennant_slmax"]         = slmax
-                ohlc.loc[candle_idx, "pennant_slmin"]         = slmin 
-                ohlc.loc[candle_idx, "pennant_intercmin"]     = intercmin
-                ohlc.loc[candle_idx, "pennant_intercmax"]     = intercmax
-                
-    return ohlc 
\ No newline at end of file
+    with stage("pennant", "writeback"):
+        for candle_idx, result in found:
+            assign_pattern(ohlc, candle_idx, result)
+
+    return ohlc
+
+
+@register_kernel("pennant_candidates", "numpy")
+def _pennant_candidates(index: PivotIndex, fits: Tuple[np.ndarray, ...], size: int, lookback: int, min_points: int = 3,
+                        r_max: float = 0.9, r_min: float = 0.9, slope_max: float = -0.0001, slope_min: float = 0.0001,
+                        lower_ratio_slope: float = 0.95, upper_ratio_slope: float = 1) -> np.ndarray:
+    """
+    Get the candlesticks that pass the conditions of `_pennant_check`, checked for all the candlesticks at once
+
+    :params index is the pivot index of the series
+    :type :PivotIndex
+
+    :params fits is the output of `linregress_pivot_windows`
+    :type :Tuple[np.ndarray, ...]
+
+    The other parameters are the same as in `find_pennant`
+
+    :return (np.ndarray)
+    """
+
+    candles, high_first, high_last, low_first, low_last = window_counts(index, size, lookback)
+    slmin, _, rmin, slmax, _, rmax = (values[candles] for values in fits)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        found = enough_points(high_last - high_first, low_last - low_first, min_points) & \
+                (np.abs(rmax)>=r_max) & (np.abs(rmin)>=r_min) & (slmin>=slope_min) & (slmax<=slope_max) & \
+                (np.abs(slmax/slmin) > lower_ratio_slope) & (np.abs(slmax/slmin) < upper_ratio_slope)
+
+    return candles[found]
+
+
+def _pennant_check(candle_idx: int, maxim: np.array, minim: np.array, xxmax: np.array, xxmin: np.array, min_points: int = 3,
+                   r_max: float = 0.9, r_min: float = 0.9, slope_max: float = -0.0001, slope_min: float = 0.0001,
+                   lower_ratio_slope: float = 0.95, upper_ratio_slope: float = 1,
+                   fit: Union[None, Tuple[float, float, float, float, float, float]] = None) -> Union[None, Dict[str, Any]]:
+    """
+    Check if the pivot points in the lookback window of the candlestick form a pennant pattern 
+
+    :params candle_idx is the candlestick index of interest
+    :type :int
+
+    :params maxim, minim are the pivot highs and lows in the window and xxmax, xxmin their indexes
+    :type :np.array
+
+    :params fit is the (slmin, intercmin, rmin, slmax, intercmax, rmax) of the window if already computed
+    :type :Union[None, Tuple[float, float, float, float, float, float]]
+
+    The other parameters are the same as in `find_pennant`
+
+    :return (Union[None, Dict[str, Any]])
+    """
+
+    # Check the correct number of pivot points have been found
+    if (xxmax.size < min_points and xxmin.size < min_points) or xxmax.size==0 or xxmin.size==0:
+        return None
+
+    # Run the regress to get the slope, intercepts and r-squared
+    if fit is None:
+        slmin, intercmin, rmin = linregress_points(xxmin, minim)
+        slmax, intercmax, rmax = linregress_points(xxmax, maxim)
+    else:
+        slmin, intercmin, rmin, slmax, intercmax, rmax = fit
+    
+    if abs(rmax)>=r_max and abs(rmin)>=r_min and slmin>=slope_min  and slmax<= slope_max  and abs(slmax/slmin) > lower_ratio_slope and abs(slmax/slmin) < upper_ratio_slope:
+        return {"chart_type": "pennant", "pennant_point": candle_idx, "pennant_highs": maxim, "pennant_lows": minim,
+                "pennant_highs_idx": xxmax, "pennant_lows_idx": xxmin, "pennant_slmax": slmax, "pennant_slmin": slmin,
+                "pennant_intercmin": intercmin, "pennant_intercmax": intercmax}
+
+    return None
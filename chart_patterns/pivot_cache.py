@@ -0,0 +1,170 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Cache of pivot points shared by all the chart pattern detectors
+"""
+
+import hashlib
+import numpy as np
+import threading
+
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple, Union
+
+
+def fingerprint(high: np.ndarray, low: np.ndarray) -> str:
+    """
+    Get a cheap fingerprint of the high and low prices
+
+    :params high is the array of high prices
+    :type :np.ndarray
+
+    :params low is the array of low prices
+    :type :np.ndarray
+
+    :return (str)
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.int64(len(high)).tobytes())
+    digest.update(np.ascontiguousarray(high, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(low, dtype=np.float64).tobytes())
+
+    return digest.hexdigest()
+
+
+class PivotCache:
+    """
+    Bounded LRU cache of pivot point codes keyed by the fingerprint of the high/low prices
+    and the `(left_count, right_count)` window
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :params max_bytes is the maximum memory used by the stored pivot arrays
+        :type :int
+        """
+
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self.nbytes    = 0
+        self._entries  = OrderedDict()
+        self._lock     = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[str, int, int]) -> Union[None, np.ndarray]:
+        """
+        Get the stored pivot codes, if any
+
+        :params key is the (fingerprint, left_count, right_count) key
+        :type :Tuple[str, int, int]
+
+        :return (Union[None, np.ndarray])
+        """
+
+        with self._lock:
+            codes = self._entries.get(key)
+            if codes is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return codes
+
+    def put(self, key: Tuple[str, int, int], codes: np.ndarray) -> None:
+        """
+        Store the pivot codes and evict the least recently used entries if over the memory limit
+
+        :params key is the (fingerprint, left_count, right_count) key
+        :type :Tuple[str, int, int]
+
+        :params codes is the array of pivot codes
+        :type :np.ndarray
+
+        :return (None)
+        """
+
+        # Entries that can never fit are not stored
+        if codes.nbytes > self.max_bytes:
+            return
+
+        codes = np.array(codes)
+        codes.flags.writeable = False
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key).nbytes
+
+            self._entries[key] = codes
+            self.nbytes       += codes.nbytes
+
+            while self.nbytes > self.max_bytes:
+                _, evicted      = self._entries.popitem(last=False)
+                self.nbytes    -= evicted.nbytes
+                self.evictions += 1
+
+    def get_or_compute(self, high: np.ndarray, low: np.ndarray, left_count: int, right_count: int,
+                       compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Get the stored pivot codes or compute and store them
+
+        :params high is the array of high prices
+        :type :np.ndarray
+
+        :params low is the array of low prices
+        :type :np.ndarray
+
+        :params left_count is the number of candles to the left to consider
+        :type :int
+
+        :params right_count is the number of candles to right to consider
+        :type :int
+
+        :params compute is called without arguments to get the pivot codes on a miss
+        :type :Callable[[], np.ndarray]
+
+        :return (np.ndarray)
+        """
+
+        key   = (fingerprint(high, low), left_count, right_count)
+        codes = self.get(key)
+
+        if codes is None:
+            codes = compute()
+            self.put(key, codes)
+
+        return codes
+
+    def clear(self) -> None:
+        """
+        Remove all the entries and reset the counters
+
+        :return (None)
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.nbytes    = 0
+            self.hits      = 0
+            self.misses    = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters
+
+        :return (Dict[str, int])
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "nbytes": self.nbytes, "max_bytes": self.max_bytes}
+
+
+# Cache shared by all the detectors
+PIVOT_CACHE = PivotCache()
@@ -0,0 +1,146 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Sorted index of the pivot points to read the pivot points of any window without scanning it
+"""
+
+import numpy as np
+import pandas as pd
+
+from chart_patterns.chart_patterns.pivot_points import find_pivot_positions
+from typing import Tuple
+
+
+class PivotIndex:
+    """
+    Sorted arrays of the pivot highs and pivot lows positions and prices. The pivot points in a window
+    are found with two `searchsorted` calls and returned as slices (views) of these arrays.
+
+    The positions are stored as floats, like the indexes built by the `find_*` functions.
+    """
+
+    __slots__ = ("high_idx", "high_prices", "low_idx", "low_prices", "pivot_idx", "pivot_pos")
+
+    def __init__(self, pivot: np.ndarray, high: np.ndarray, low: np.ndarray, offset: int = 0):
+        """
+        :params pivot is the array of pivot point codes
+        :type :np.ndarray
+
+        :params high is the array of high prices
+        :type :np.ndarray
+
+        :params low is the array of low prices
+        :type :np.ndarray
+
+        :params offset is the position of the first value of the arrays in the full series, when they are a slice of it.
+                All the positions of the index are positions in the full series
+        :type :int
+        """
+
+        pivot = np.asarray(pivot)
+        high  = np.asarray(high, dtype=float)
+        low   = np.asarray(low, dtype=float)
+
+        high_idx  = np.flatnonzero(pivot == 2)
+        low_idx   = np.flatnonzero(pivot == 1)
+        pivot_idx = np.flatnonzero(pivot != 0)
+
+        self.high_idx    = (high_idx + offset).astype(float)
+        self.high_prices = high[high_idx]
+        self.low_idx     = (low_idx + offset).astype(float)
+        self.low_prices  = low[low_idx]
+
+        # All the pivot points (including the codes 3) with their `pivot_pos` value
+        self.pivot_idx = pivot_idx + offset
+        self.pivot_pos = find_pivot_positions(pivot[pivot_idx], high[pivot_idx], low[pivot_idx])
+
+    @classmethod
+    def from_ohlc(cls, ohlc: pd.DataFrame, name_pivot: str = "pivot") -> "PivotIndex":
+        """
+        Build the index from an OHLC dataframe that has the pivot points
+
+        :params ohlc is the OHLC dataframe with the pivot points column
+        :type :pd.DataFrame
+
+        :params name_pivot is the name of the pivot points column
+        :type :str
+
+        :return (PivotIndex)
+        """
+
+        return cls(ohlc[name_pivot].to_numpy(), ohlc["high"].to_numpy(dtype=float), ohlc["low"].to_numpy(dtype=float))
+
+    def highs(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the pivot highs indexes and prices in the window [start, stop)
+
+        :return (Tuple[np.ndarray, np.ndarray])
+        """
+
+        first, last = np.searchsorted(self.high_idx, [start, stop], side="left")
+
+        return self.high_idx[first:last], self.high_prices[first:last]
+
+    def lows(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the pivot lows indexes and prices in the window [start, stop)
+
+        :return (Tuple[np.ndarray, np.ndarray])
+        """
+
+        first, last = np.searchsorted(self.low_idx, [start, stop], side="left")
+
+        return self.low_idx[first:last], self.low_prices[first:last]
+
+    def window(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the pivot highs, pivot lows and their indexes in the window [start, stop), in the
+        same order as used by the `find_*` functions
+
+        :return (Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]) maxim, minim, xxmax, xxmin
+        """
+
+        xxmax, maxim = self.highs(start, stop)
+        xxmin, minim = self.lows(start, stop)
+
+        return maxim, minim, xxmax, xxmin
+
+    def pivots(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the indexes and `pivot_pos` values of all the pivot points in the window [start, stop)
+
+        :return (Tuple[np.ndarray, np.ndarray])
+        """
+
+        first, last = np.searchsorted(self.pivot_idx, [start, stop], side="left")
+
+        return self.pivot_idx[first:last], self.pivot_pos[first:last]
+
+    def bounds(self, pivot: int, starts: np.ndarray, stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the positions in the pivot highs (`pivot=2`) or pivot lows (`pivot=1`) arrays of many windows [start, stop)
+
+        :return (Tuple[np.ndarray, np.ndarray])
+        """
+
+        positions = self.high_idx if pivot == 2 else self.low_idx
+
+        return np.searchsorted(positions, starts, side="left"), np.searchsorted(positions, stops, side="left")
+
+    def drops(self, pivot: int, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+        """
+        Check for many ranges [first, last) of the pivot highs (`pivot=2`) or pivot lows (`pivot=1`) arrays
+        if a price is lower than the one before it, like `np.any(np.diff(prices) < 0)`
+
+        :return (np.ndarray) of bool
+        """
+
+        prices = self.high_prices if pivot == 2 else self.low_prices
+        if len(prices) < 2:
+            return np.zeros(len(first), dtype=bool)
+
+        # Number of drops up to each point
+        drops = np.concatenate([[0], np.cumsum(np.diff(prices) < 0)])
+        last  = np.maximum(last - 1, first)
+
+        return drops[np.minimum(last, len(prices) - 1)] - drops[np.minimum(first, len(prices) - 1)] > 0
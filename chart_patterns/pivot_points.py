@@ -8,7 +8,11 @@ import numpy as np
 import pandas as pd 
 
 
+from chart_patterns.chart_patterns.engines import register_kernel, get_kernel, resolve_engine
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pivot_cache import PIVOT_CACHE, PivotCache
 from chart_patterns.chart_patterns.utils import check_ohlc_names
+from numpy.lib.stride_tricks import sliding_window_view
 from tqdm import tqdm
 from typing import Union
 
@@ -68,13 +72,262 @@ def find_pivot_point(ohlc: pd.DataFrame, current_row: int, left_count:int = 3, r
     else:
         return 0
 
-def find_all_pivot_points(ohlc: pd.DataFrame, left_count:int = 3, right_count:int = 3, name_pivot: Union[None, str] = None, 
-                          progress: bool = False ) -> pd.DataFrame:
+@register_kernel("pivot_codes", "numpy")
+def find_pivot_codes(high: np.ndarray, low: np.ndarray, left_count: int = 3, right_count: int = 3) -> np.ndarray:
     """
-    Find the all the pivot points for the given OHLC dataframe
+    Find the pivot point codes for the whole series at once. The codes are the same as the 
+    ones returned by `find_pivot_point`: `1` pivot low, `2` pivot high, `3` both and `0` none.
+
+    :params high is the array of high prices
+    :type :np.ndarray
+
+    :params low is the array of low prices
+    :type :np.ndarray
+
+    :params left_count is the number of candles to the left to consider
+    :type :int 
+    
+    :params right_count is the number of candles to right to consider 
+    :type :int
+
+    :return (np.ndarray)
+    """
+
+    high   = np.asarray(high, dtype=float)
+    low    = np.asarray(low, dtype=float)
+    codes  = np.zeros(len(high), dtype=np.int64)
+    window = left_count + right_count + 1
+
+    # Rows without a full window on both sides are never pivots
+    if len(high) < window:
+        return codes
+
+    # Rolling max/min over the window centred (left_count, right_count) on each row.
+    # fmax/fmin skip NaN the same way the scalar comparisons in `find_pivot_point` do.
+    window_max = np.fmax.reduce(sliding_window_view(high, window), axis=1)
+    window_min = np.fmin.reduce(sliding_window_view(low, window), axis=1)
+
+    centre     = slice(left_count, len(high) - right_count)
+    pivot_high = ~(high[centre] < window_max)
+    pivot_low  = ~(low[centre] > window_min)
+
+    codes[centre] = np.where(pivot_low & pivot_high, 3, np.where(pivot_low, 1, np.where(pivot_high, 2, 0)))
+
+    return codes
+
+
+class PivotStrength:
+    """
+    Per-bar index of how far to the left and right each bar stays the extreme high or low.
+    Once built, the pivot point codes for any `(left_count, right_count)` are a comparison 
+    instead of a rescan of the series.
+    """
+
+    __slots__ = ("high_left", "high_right", "low_left", "low_right")
+
+    def __init__(self, high: np.ndarray, low: np.ndarray, engine: Union[None, str] = None):
+        """
+        :params high is the array of high prices
+        :type :np.ndarray
+
+        :params low is the array of low prices
+        :type :np.ndarray
+
+        :params engine is the engine of the reach computation, the global one if not given. Options - [None, "python", "numpy", "numba"]
+        :type :Union[None, str]
+        """
+
+        high          = np.asarray(high, dtype=float)
+        low           = np.asarray(low, dtype=float)
+        extreme_reach = get_kernel("extreme_reach", engine)
+
+        # A bar stays the highest high for as long as no neighbour is strictly higher
+        self.high_left  = extreme_reach(-high)
+        self.high_right = extreme_reach(-high[::-1])[::-1]
+        self.low_left   = extreme_reach(low)
+        self.low_right  = extreme_reach(low[::-1])[::-1]
+
+    def __len__(self) -> int:
+        return len(self.low_left)
+
+    def pivot_codes(self, left_count: int = 3, right_count: int = 3) -> np.ndarray:
+        """
+        Get the pivot point codes for the given window. Same codes as `find_pivot_codes`.
+
+        :params left_count is the number of candles to the left to consider
+        :type :int 
+        
+        :params right_count is the number of candles to right to consider 
+        :type :int
+
+        :return (np.ndarray)
+        """
+
+        codes = np.zeros(len(self), dtype=np.int64)
+        if len(self) < left_count + right_count + 1:
+            return codes
+
+        centre     = slice(left_count, len(self) - right_count)
+        pivot_high = (self.high_left[centre] >= left_count) & (self.high_right[centre] >= right_count)
+        pivot_low  = (self.low_left[centre] >= left_count) & (self.low_right[centre] >= right_count)
+
+        codes[centre] = np.where(pivot_low & pivot_high, 3, np.where(pivot_low, 1, np.where(pivot_high, 2, 0)))
+
+        return codes
+
+
+@register_kernel("extreme_reach", "python")
+def _extreme_reach_loop(values: np.ndarray) -> np.ndarray:
+    """
+    For each bar count the consecutive bars to its left that are not strictly lower than it, 
+    using a monotonic stack. NaN values never break a run, like in `find_pivot_point`.
+
+    :params values is the array of prices
+    :type :np.ndarray
+
+    :return (np.ndarray)
+    """
+
+    reach  = np.empty(len(values), dtype=np.int64)
+    stack  = []
+    values = values.tolist()
+
+    for idx, value in enumerate(values):
+        if value != value:
+            reach[idx] = idx
+            continue
+
+        while stack and values[stack[-1]] >= value:
+            stack.pop()
+
+        reach[idx] = idx - stack[-1] - 1 if stack else idx
+        stack.append(idx)
+
+    return reach
+
+
+# Number of bars of the blocks of `_extreme_reach`, and of the bars whose block is searched at once
+REACH_BLOCK_SIZE = 32
+_REACH_BATCH     = 1 << 15
+
+
+@register_kernel("extreme_reach", "numpy")
+def _extreme_reach(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of `_extreme_reach_loop`. The series is cut into blocks of `REACH_BLOCK_SIZE` bars.
+    The previous strictly lower bar is first searched inside the block of each bar by pointer jumping, then in the
+    blocks before it with a sparse table of the minimum of each block, so the time is O(n log n) for any series.
+
+    :params values is the array of prices
+    :type :np.ndarray
+
+    :return (np.ndarray)
+    """
+
+    values  = np.asarray(values, dtype=float)
+    size    = len(values)
+    missing = np.isnan(values)
+    bars    = np.arange(size)
+
+    # A NaN is never lower than a bar, so it never breaks a run
+    blocks = np.full(-(-size // REACH_BLOCK_SIZE) * REACH_BLOCK_SIZE, np.inf)
+    blocks[:size] = np.where(missing, np.inf, values)
+    filled = blocks[:size]
+    blocks = blocks.reshape(-1, REACH_BLOCK_SIZE)
+    first  = bars - bars % REACH_BLOCK_SIZE
+
+    # The bars between `prev` and each bar are never lower than it. Jump over the bars of the block that are not lower
+    prev   = bars - 1
+    active = np.flatnonzero(prev >= first)
+    while len(active) > 0:
+        active = active[filled[prev[active]] >= filled[active]]
+        prev[active] = prev[prev[active]]
+        active = active[prev[active] >= first[active]]
+
+    # The bars with no lower bar in their block: find the last block before with a lower bar by binary lifting on the
+    # minimum of the blocks ending at each block, then the last lower bar in that block
+    todo = np.flatnonzero(prev < first)
+    if len(todo) > 0:
+        levels = [blocks.min(axis=1)]
+        while (1 << len(levels)) <= len(blocks):
+            step  = 1 << (len(levels) - 1)
+            level = levels[-1].copy()
+            level[step:] = np.minimum(levels[-1][step:], levels[-1][:-step])
+            levels.append(level)
+
+        for start in range(0, len(todo), _REACH_BATCH):
+            batch = todo[start:start + _REACH_BATCH]
+            value = filled[batch]
+            block = batch // REACH_BLOCK_SIZE - 1
+
+            for level in range(len(levels) - 1, -1, -1):
+                skip        = block >= 0
+                skip[skip] &= levels[level][block[skip]] >= value[skip]
+                block[skip] -= 1 << level
+
+            found = np.flatnonzero(block >= 0)
+            lower = blocks[block[found]] < value[found, None]
+            last  = REACH_BLOCK_SIZE - 1 - np.argmax(lower[:, ::-1], axis=1)
+
+            prev[batch]        = -1
+            prev[batch[found]] = block[found] * REACH_BLOCK_SIZE + last
+
+    reach          = bars - prev - 1
+    reach[missing] = bars[missing]
+
+    return reach
+
+
+def find_pivot_strength(ohlc: pd.DataFrame, engine: Union[None, str] = None) -> PivotStrength:
+    """
+    Build the pivot strength index for the given OHLC dataframe
 
     :params ohlc is a dataframe with Open, High, Low, Close data
     :type :pd.DataFrame
+
+    :params engine is the engine of the reach computation, the global one if not given
+    :type :Union[None, str]
+
+    :return (PivotStrength)
+    """
+
+    check_ohlc_names(ohlc)
+
+    return PivotStrength(ohlc["high"].to_numpy(dtype=float), ohlc["low"].to_numpy(dtype=float), engine)
+
+
+def find_pivot_positions(pivot: np.ndarray, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of `find_pivot_point_position` for the whole series
+
+    :params pivot is the array of pivot point codes
+    :type :np.ndarray
+
+    :params high is the array of high prices
+    :type :np.ndarray
+
+    :params low is the array of low prices
+    :type :np.ndarray
+
+    :return (np.ndarray)
+    """
+    
+    pivot = np.asarray(pivot)
+    high  = np.asarray(high, dtype=float)
+    low   = np.asarray(low, dtype=float)
+
+    return np.where(pivot == 1, low - 1e-3, np.where(pivot == 2, high + 1e-3, np.nan))
+
+
+def find_all_pivot_points(ohlc: Union[pd.DataFrame, OHLCArrays], left_count:int = 3, right_count:int = 3, name_pivot: Union[None, str] = None, 
+                          progress: bool = False, engine: Union[None, str] = None, strength: Union[None, PivotStrength] = None,
+                          cache: Union[bool, PivotCache] = True) -> Union[pd.DataFrame, np.ndarray]:
+    """
+    Find the all the pivot points for the given OHLC dataframe
+
+    :params ohlc is a dataframe with Open, High, Low, Close data, or an `OHLCArrays` container. The array of the pivot
+            point codes is returned for the container instead of the dataframe with the pivot columns
+    :type :Union[pd.DataFrame, OHLCArrays]
     
     :params left_count is the number of candles to the left to consider
     :type :int 
@@ -84,10 +337,92 @@ def find_all_pivot_points(ohlc: pd.DataFrame, left_count:int = 3, right_count:in
     
     :params progress bar to be displayed or not 
     :type :bool 
+
+    :params engine is the implementation to use. Options - [None, "python", "numpy", "numba"]. The "python" engine is the 
+            row by row reference implementation. The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :params strength is a pivot strength index built from the same `ohlc`. When given, the pivot points are 
+            read from it instead of scanning the series
+    :type :Union[None, PivotStrength]
+
+    :params cache is the pivot cache to use. `True` uses the cache shared by all the detectors and `False` disables it
+    :type :Union[bool, PivotCache]
      
-    :return (pd.DataFrame)
+    :return (Union[pd.DataFrame, np.ndarray])
     """
 
+    engine = resolve_engine(engine)
+
+    if isinstance(ohlc, OHLCArrays):
+        # The columns were checked when the container was built
+        high, low = ohlc.high, ohlc.low
+
+        # There is no row by row implementation for the arrays, all the engines give the same codes
+        if engine == "python":
+            engine = "numpy"
+
+    elif engine == "python":
+        return _find_all_pivot_points_python(ohlc, left_count, right_count, name_pivot)
+
+    else:
+        # Check the columns once for the whole series 
+        check_ohlc_names(ohlc)
+
+        high  = ohlc["high"].to_numpy(dtype=float)
+        low   = ohlc["low"].to_numpy(dtype=float)
+
+    if strength is not None and len(strength) != len(ohlc):
+        raise ValueError("The pivot strength index was not built for this `ohlc`")
+
+    def compute() -> np.ndarray:
+        if strength is not None:
+            return strength.pivot_codes(left_count, right_count)
+        return get_kernel("pivot_codes", engine)(high, low, left_count, right_count)
+
+    if cache is True:
+        cache = PIVOT_CACHE
+
+    if isinstance(cache, PivotCache):
+        codes = cache.get_or_compute(high, low, left_count, right_count, compute)
+    else:
+        codes = compute()
+
+    if isinstance(ohlc, OHLCArrays):
+        return codes
+
+    name  = "pivot" if name_pivot is None else name_pivot
+
+    ohlc.loc[:, name] = codes
+
+    # The position is always taken from the `pivot` column, as in `find_pivot_point_position`
+    if "pivot" in ohlc.columns:
+        ohlc.loc[:, f"{name}_pos"] = find_pivot_positions(ohlc["pivot"].to_numpy(), high, low)
+    else:
+        ohlc.loc[:, f"{name}_pos"] = np.nan
+
+    return ohlc 
+
+
+def _find_all_pivot_points_python(ohlc: pd.DataFrame, left_count:int = 3, right_count:int = 3, 
+                                  name_pivot: Union[None, str] = None) -> pd.DataFrame:
+    """
+    Reference implementation of `find_all_pivot_points` that checks every row with `find_pivot_point`
+
+    :params ohlc is a dataframe with Open, High, Low, Close data
+    :type :pd.DataFrame
+    
+    :params left_count is the number of candles to the left to consider
+    :type :int 
+    
+    :params right_count is the number of candles to right to consider 
+    :type :int 
+
+    :params name_pivot is the name of the column for the pivot points
+    :type :Union[None, str]
+
+    :return (pd.DataFrame)
+    """
 
     if name_pivot != None:
         ohlc.loc[:,name_pivot] = ohlc.apply(lambda row: find_pivot_point(ohlc, row.name, left_count, right_count), axis=1)
@@ -5,16 +5,20 @@ Author: Zetra Team
 For slider: https://community.plotly.com/t/multiple-traces-with-a-single-slider-in-plotly/16356/2
 """
 
+import numpy as np
 import os
 import pandas as pd
 import plotly.graph_objects as go
 import sys
 
 
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
 from chart_patterns.chart_patterns.utils import check_ohlc_names
+from concurrent.futures import ProcessPoolExecutor
 from plotly.subplots import make_subplots
 from tqdm import tqdm
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 
 def set_theme(fig: go.Candlestick, theme: Dict[str,str] = {"bg_color": "black", "up_color":"#3D9970", 
@@ -135,7 +139,7 @@ def _plot_pivot_points(ohlc: pd.DataFrame, fig: go.Candlestick, pivot_name: int
 def display_pivot_points(ohlc : pd.DataFrame, 
                          theme: Dict[str, str] = {"bg_color": "black", "up_color":"#3D9970", 
                                                       "down_color": "#FF4136", "legend_font_color": "white", "xaxes_color": "white", "yaxes_color": "white"}, 
-                         plot_obs:int = 500 ) -> None:
+                         plot_obs:int = 500, decimate: bool = False) -> None:
     """
     Display the pivot points and the OHLC data in a graph
     
@@ -147,18 +151,26 @@ def display_pivot_points(ohlc : pd.DataFrame,
     
     :params plot_obs is the total number of observations to plot
     :type :int 
+
+    :params decimate is whether to plot the whole series in at most `plot_obs` candlesticks, see `decimate_ohlc`,
+            instead of only the first `plot_obs` observations
+    :type :bool
     
     :return (None)
     """
-    
-    # Get the Candlestick figure object
-    fig = _plot_candlestick(ohlc, plot_obs)
-    
-    # Add the pivot points 
-    fig = _plot_pivot_points(ohlc, fig)    
-                
-    # Set the theme   
-    fig = set_theme(fig, theme)
+
+    if decimate:
+        check_ohlc_names(ohlc)
+        fig = ChartTemplate(theme, lines=0).render(ohlc, max_bars=plot_obs)
+    else:
+        # Get the Candlestick figure object
+        fig = _plot_candlestick(ohlc, plot_obs)
+        
+        # Add the pivot points 
+        fig = _plot_pivot_points(ohlc, fig)    
+                    
+        # Set the theme   
+        fig = set_theme(fig, theme)
     
     
     fig.show()
@@ -374,9 +386,10 @@ def save_chart_pattern(fig: go.Candlestick, pattern: str, row: Union[None,tuple]
         fig.write_image(os.path.join(os.path.realpath(''), "images", pattern, f"fig-{pattern}.png"))
                    
 def display_chart_pattern(ohlc: pd.DataFrame, pattern: str = "flag", 
-                          save: bool = True, lookback: int = 60, pivot_name: str = "pivot") -> None:
+                          save: bool = True, lookback: int = 60, pivot_name: str = "pivot",
+                          matches: Union[None, PatternMatches] = None) -> None:
     """
-    Display the specified chart pattern. 
+    Display the specified chart pattern. Use `export_chart_patterns` to save the charts of many patterns in parallel.
     
     :params ohlc is the dataframe that contains the OHLC data and the chart pattern points
     :type :pd.DataFrame
@@ -393,29 +406,36 @@ def display_chart_pattern(ohlc: pd.DataFrame, pattern: str = "flag",
     :params pivot_name is the name of the column that has the pivot points. Note the column should have int values
             where `1` is pivot lows and `2` is pivot highs
     :type :str 
+
+    :params matches is the table of the patterns found, e.g. by `scan_all_patterns(ohlc, sparse=True)`. If given, `ohlc`
+            only needs the OHLC data and the pivot points are found if the `pivot` column is missing
+    :type :Union[None, PatternMatches]
     
     
     :return (None)
     """
-    
-    # Check if the columns have the `pattern` results
-    if ohlc.columns.str.lower().str.contains(pattern).sum() == 0:
-        print(f"No columns for the pattern `{pattern}`. Did you run the function to get the pattern?")
-        sys.exit()
-    
 
-    if pattern == "flag":
-        pattern_points = ohlc.loc[ohlc["chart_type"]== "flag"]
-    elif pattern == "double":
-        pattern_points = ohlc.loc[ohlc["chart_type"]== "double"]
-    elif pattern == "hs":
-        pattern_points = ohlc.loc[ohlc["chart_type"]=="hs"]
-    elif pattern == "ihs":
-        pattern_points = ohlc.loc[ohlc["chart_type"]=="ihs"]        
-    elif pattern == "triangle":
-        pattern_points = ohlc.loc[ohlc["chart_type"]=="triangle"]
-    elif pattern == "pennant":
-        pattern_points = ohlc.loc[ohlc["chart_type"]=="pennant"]
+    if matches is not None:
+        ohlc, pattern_points = _matches_points(ohlc, pattern, pivot_name, matches)
+
+    else:
+        # Check if the columns have the `pattern` results
+        if ohlc.columns.str.lower().str.contains(pattern).sum() == 0:
+            print(f"No columns for the pattern `{pattern}`. Did you run the function to get the pattern?")
+            sys.exit()
+    
+        if pattern == "flag":
+            pattern_points = ohlc.loc[ohlc["chart_type"]== "flag"]
+        elif pattern == "double":
+            pattern_points = ohlc.loc[ohlc["chart_type"]== "double"]
+        elif pattern == "hs":
+            pattern_points = ohlc.loc[ohlc["chart_type"]=="hs"]
+        elif pattern == "ihs":
+            pattern_points = ohlc.loc[ohlc["chart_type"]=="ihs"]        
+        elif pattern == "triangle":
+            pattern_points = ohlc.loc[ohlc["chart_type"]=="triangle"]
+        elif pattern == "pennant":
+            pattern_points = ohlc.loc[ohlc["chart_type"]=="pennant"]
             
     
     if len(pattern_points) == 0: # There is no pattern found
@@ -450,46 +470,334 @@ def display_chart_pattern(ohlc: pd.DataFrame, pattern: str = "flag",
             fig.show()
     elif len(pattern_points) > 1:
              
+      # The themed figure is built once and only its data is changed for each pattern
+      template = ChartTemplate()
+
       for row in tqdm(pattern_points.iterrows(), desc=f"Saving the {pattern} charts..."):
-            # Get the row index
-            pattern_point = row[0]
-            
-            # Make sure at least 50 candlesticks are available, if possible
-            if pattern_point - lookback < 0:
-                start  = 0
-            else:
-                start = pattern_point - lookback
-            
-            # Get a subset of the ohlc plus chart pattens included
-            ohlc_copy = ohlc.loc[start:pattern_point,]
-            
-            # Add the ohlc data
-            fig = _plot_candlestick(ohlc_copy)
-                
-            # Add the pivot points 
-            fig = _plot_pivot_points(ohlc_copy, fig, pivot_name)    
-                        
-            # Set the theme   
-            fig = set_theme(fig)   
-            
-            if pattern == "flag":    
-                # Add the flag pattern 
-                fig = _add_flag_pattern_plot(row, fig)
-            elif pattern == "double":
-                # Add the double pattern         
-                fig = _add_doubles_pattern_plot(row, fig)
-            elif pattern == "hs":
-                fig = _add_head_shoulder_pattern_plot(row, fig)
-            elif pattern == "ihs":
-                fig  = _add_head_shoulder_pattern_plot(row, fig, "ihs_idx", "ihs_point")
-            elif pattern == "triangle":
-                fig  = _add_triangle_pattern_plot(row, fig)
-            elif pattern == "pennant":
-                fig = _add_pennant_pattern_plot(row, fig)
+            fig = _pattern_figure(ohlc, row, pattern, lookback, pivot_name, template)
             
             # Save the figures 
             save_chart_pattern(fig, pattern, row)
                 
       if save:
         sys.exit()
-              
+
+
+# The functions adding each pattern to a figure
+_PATTERN_PLOTS = {"flag":     _add_flag_pattern_plot,
+                  "double":   _add_doubles_pattern_plot,
+                  "hs":       _add_head_shoulder_pattern_plot,
+                  "ihs":      lambda row, fig: _add_head_shoulder_pattern_plot(row, fig, "ihs_idx", "ihs_point"),
+                  "triangle": _add_triangle_pattern_plot,
+                  "pennant":  _add_pennant_pattern_plot}
+
+# The image formats of `export_chart_patterns`. The "html" and "json" formats are written by plotly without kaleido
+IMAGE_FORMATS = ["png", "jpeg", "webp", "svg", "pdf", "html", "json"]
+
+# The OHLC data of a worker process of `export_chart_patterns`, sent once when the worker starts, and its chart template
+_EXPORT_OHLC     = None
+_EXPORT_TEMPLATE = None
+
+
+class _LineRecorder:
+    """
+    Stands in for the figure given to the functions adding a pattern, and records the lines they add
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def add_scatter(self, x, y, **kwargs) -> "_LineRecorder":
+        self.lines.append((list(x), list(y)))
+        return self
+
+
+def pattern_lines(row: Union[tuple, pd.DataFrame], pattern: str) -> List[Tuple[list, list]]:
+    """
+    Get the x and y values of the lines drawn for a pattern, as added to the figures by `display_chart_pattern`
+
+    :params row is either a pandas dataframe or a row that has the chart pattern info
+    :type :Union[tuple, pd.DataFrame]
+
+    :params pattern is the name of the pattern. Options - ["flag", "double", "hs", "ihs", "triangle", "pennant"]
+    :type :str
+
+    :return (List[Tuple[list, list]])
+    """
+
+    if pattern not in _PATTERN_PLOTS:
+        raise ValueError(f"Unknown pattern `{pattern}`. Options are {list(_PATTERN_PLOTS)}")
+
+    return _PATTERN_PLOTS[pattern](row, _LineRecorder()).lines
+
+
+def decimate_ohlc(ohlc: pd.DataFrame, max_bars: int = 2000) -> pd.DataFrame:
+    """
+    Merge runs of consecutive candlesticks so the series has at most `max_bars` candlesticks. Each candlestick of the
+    result has the open of the first bar of its run, the highest high, the lowest low and the close of the last bar,
+    so no high or low is lost. It is indexed by the index of the first bar of the run.
+
+    :params ohlc is a dataframe with the open, high, low and close columns
+    :type :pd.DataFrame
+
+    :params max_bars is the maximum number of candlesticks
+    :type :int
+
+    :return (pd.DataFrame)
+    """
+
+    if max_bars < 1:
+        raise ValueError("max_bars must be at least 1")
+
+    if len(ohlc) <= max_bars:
+        return ohlc[["open", "high", "low", "close"]]
+
+    starts = np.arange(0, len(ohlc), _bucket_size(len(ohlc), max_bars))
+    ends   = np.append(starts[1:], len(ohlc)) - 1
+
+    return pd.DataFrame({"open":  ohlc["open"].to_numpy(dtype=float)[starts],
+                         "high":  np.maximum.reduceat(ohlc["high"].to_numpy(dtype=float), starts),
+                         "low":   np.minimum.reduceat(ohlc["low"].to_numpy(dtype=float), starts),
+                         "close": ohlc["close"].to_numpy(dtype=float)[ends]}, index=ohlc.index[starts])
+
+
+def _bucket_size(length: int, max_bars: int) -> int:
+    return -(-length // max_bars)
+
+
+def _pivot_markers(ohlc: pd.DataFrame, pivot_name: str = "pivot",
+                   bucket: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the x and y values of the pivot lows and highs. With runs of more than one bar, only the lowest pivot low and
+    the highest pivot high of each run are kept
+    """
+
+    if pivot_name not in ohlc.columns:
+        raise ValueError(f"No column named `{pivot_name}`. Did you run `find_all_pivot_points`?")
+
+    codes     = ohlc[pivot_name].to_numpy()
+    positions = ohlc[f"{pivot_name}_pos"].to_numpy(dtype=float)
+
+    markers = []
+    for code, sign in [(1, 1.0), (2, -1.0)]:
+        idx = np.flatnonzero(codes == code)
+        if bucket > 1 and len(idx) > 0:
+            # Sort by run then by how extreme the pivot is, and keep the first of each run
+            order  = np.lexsort((sign * positions[idx], idx // bucket))
+            idx    = idx[order]
+            _, first = np.unique(idx // bucket, return_index=True)
+            idx    = np.sort(idx[first])
+
+        markers += [ohlc.index.to_numpy()[idx], positions[idx]]
+
+    return tuple(markers)
+
+
+class ChartTemplate:
+    """
+    Themed figure with the candlesticks, the pivot points and the lines of a pattern, built once and reused for many
+    charts. `render` only changes the data of the traces, which is much faster than building and theming a new figure
+    for each chart. The figure is the same object after every call, so it should be written or shown before the next one.
+    """
+
+    def __init__(self, theme: Dict[str, str] = {"bg_color": "black", "up_color":"#3D9970", "down_color": "#FF4136",
+                                                "legend_font_color": "white", "xaxes_color": "white", "yaxes_color": "white"},
+                 lines: int = 2):
+        """
+        :params theme is the set of parameters to set the aesthetics of the graph, as in `set_theme`
+        :type :Dict[str, str]
+
+        :params lines is the maximum number of pattern lines of a chart. The patterns have at most 2
+        :type :int
+        """
+
+        fig = go.Figure(data=[go.Candlestick(x=[], open=[], high=[], low=[], close=[], name="OHLC")])
+        fig.add_scatter(x=[], y=[], mode="markers", marker=dict(size=20, color="red"), name="Pivot Low")
+        fig.add_scatter(x=[], y=[], mode="markers", marker=dict(size=20, color="green"), name="Pivot High")
+        for _ in range(lines):
+            fig.add_scatter(x=[], y=[], mode='lines', name=None, line=dict(color='royalblue', width=4), showlegend=False)
+
+        self.figure = set_theme(fig, theme)
+        self.lines  = lines
+
+    def render(self, ohlc: pd.DataFrame, pivot_name: str = "pivot", lines: List[Tuple[list, list]] = [],
+               max_bars: Union[None, int] = None) -> go.Figure:
+        """
+        Put the data of a chart in the figure
+
+        :params ohlc is the dataframe with the open, high, low and close columns and the pivot points
+        :type :pd.DataFrame
+
+        :params pivot_name is the name of the column that has the pivot points
+        :type :str
+
+        :params lines is the x and y values of the pattern lines, e.g. from `pattern_lines`
+        :type :List[Tuple[list, list]]
+
+        :params max_bars is the maximum number of candlesticks plotted. Longer series are merged by `decimate_ohlc`
+                and only the most extreme pivot points of each merged candlestick are kept. All are plotted if not given
+        :type :Union[None, int]
+
+        :return (go.Figure)
+        """
+
+        if len(lines) > self.lines:
+            raise ValueError(f"The template has room for {self.lines} lines, not {len(lines)}")
+
+        bucket  = 1 if max_bars is None else _bucket_size(len(ohlc), max_bars)
+        candles = ohlc if bucket == 1 else decimate_ohlc(ohlc, max_bars)
+        markers = _pivot_markers(ohlc, pivot_name, bucket)
+
+        with self.figure.batch_update():
+            self.figure.data[0].update(x=candles.index.to_numpy(), open=candles["open"].to_numpy(),
+                                       high=candles["high"].to_numpy(), low=candles["low"].to_numpy(),
+                                       close=candles["close"].to_numpy())
+            self.figure.data[1].update(x=markers[0], y=markers[1])
+            self.figure.data[2].update(x=markers[2], y=markers[3])
+
+            for trace, (x_values, y_values) in zip(self.figure.data[3:], list(lines) + [([], [])] * self.lines):
+                trace.update(x=x_values, y=y_values)
+
+        return self.figure
+
+
+def _matches_points(ohlc: pd.DataFrame, pattern: str, pivot_name: str,
+                    matches: PatternMatches) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Get the OHLC data with the pivot points and the patterns of the table as rows indexed by candlestick
+    """
+
+    # Renamed on a shallow copy so the dataframe of the caller is not changed
+    ohlc = check_ohlc_names(ohlc.copy(deep=False))
+    if pivot_name not in ohlc.columns and pivot_name == "pivot":
+        ohlc = find_all_pivot_points(ohlc.copy())
+
+    return ohlc, matches.select(pattern).to_frame().set_index("candle_idx")
+
+
+def _pattern_figure(ohlc: pd.DataFrame, row: Tuple[int, pd.Series], pattern: str, lookback: int = 60,
+                    pivot_name: str = "pivot", template: Union[None, "ChartTemplate"] = None) -> go.Figure:
+    """
+    Build the figure of one pattern, same as the ones saved by `display_chart_pattern`. The figure of the template is
+    returned if one is given
+    """
+
+    pattern_point = row[0]
+
+    # Get a subset of the ohlc plus chart pattens included
+    ohlc_copy = ohlc.loc[max(pattern_point - lookback, 0):pattern_point,]
+
+    if template is None:
+        template = ChartTemplate()
+
+    return template.render(ohlc_copy, pivot_name, pattern_lines(row, pattern))
+
+
+def _write_figure(fig: go.Figure, path: str, image_format: str) -> str:
+    """
+    Write the figure in the format, the images are rendered by kaleido
+    """
+
+    if image_format == "html":
+        fig.write_html(path)
+    elif image_format == "json":
+        fig.write_json(path)
+    else:
+        fig.write_image(path, format=image_format)
+
+    return path
+
+
+def _init_export_worker(ohlc: pd.DataFrame) -> None:
+    global _EXPORT_OHLC, _EXPORT_TEMPLATE
+    _EXPORT_OHLC     = ohlc
+    _EXPORT_TEMPLATE = ChartTemplate()
+
+
+def _export_job(args: Tuple[Tuple[int, pd.Series], str, int, str, str, str]) -> str:
+    row, pattern, lookback, pivot_name, path, image_format = args
+
+    return _write_figure(_pattern_figure(_EXPORT_OHLC, row, pattern, lookback, pivot_name, _EXPORT_TEMPLATE), path,
+                         image_format)
+
+
+def export_chart_patterns(ohlc: pd.DataFrame, pattern: str = "flag", folder: Union[None, str] = None, lookback: int = 60,
+                          pivot_name: str = "pivot", matches: Union[None, PatternMatches] = None, image_format: str = "png",
+                          workers: Union[None, int] = None, progress: bool = False) -> List[str]:
+    """
+    Save the chart of every pattern found, like `display_chart_pattern` with `save=True`, on a pool of worker processes.
+    The workers live for the whole export and each one keeps its kaleido renderer, which is started on the first image,
+    and a `ChartTemplate` whose data is swapped for each chart.
+    The OHLC data is sent once to each worker and only the pattern rows are sent with each image.
+
+    :params ohlc is the dataframe that contains the OHLC data and the chart pattern points
+    :type :pd.DataFrame
+
+    :params pattern is the name of the pattern to plot. Options - ["flag", "double", "hs", "ihs", "triangle", "pennant"]
+    :type :str
+
+    :params folder is the directory the images are written to, created if needed. Defaults to `images/<pattern>`
+    :type :Union[None, str]
+
+    :params lookback is the number of candlesticks to plot
+    :type :int
+
+    :params pivot_name is the name of the column that has the pivot points
+    :type :str
+
+    :params matches is the table of the patterns found, as in `display_chart_pattern`
+    :type :Union[None, PatternMatches]
+
+    :params image_format is the format of the images. Options - ["png", "jpeg", "webp", "svg", "pdf", "html", "json"]
+    :type :str
+
+    :params workers is the number of processes. Defaults to the number of CPUs. The images are written in this process if 1
+    :type :Union[None, int]
+
+    :params progress bar to be displayed or not
+    :type :bool
+
+    :return (List[str]) the paths of the images written, in the order of the patterns
+    """
+
+    if pattern not in _PATTERN_PLOTS:
+        raise ValueError(f"Unknown pattern `{pattern}`. Options are {list(_PATTERN_PLOTS)}")
+
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format `{image_format}`. Options are {IMAGE_FORMATS}")
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    if matches is not None:
+        ohlc, pattern_points = _matches_points(ohlc, pattern, pivot_name, matches)
+    else:
+        if "chart_type" not in ohlc.columns:
+            raise ValueError(f"No columns for the pattern `{pattern}`. Did you run the function to get the pattern?")
+
+        ohlc           = check_ohlc_names(ohlc.copy(deep=False))
+        pattern_points = ohlc.loc[ohlc["chart_type"] == pattern]
+
+    if folder is None:
+        folder = os.path.join(os.path.realpath(''), "images", pattern)
+    os.makedirs(folder, exist_ok=True)
+
+    # Only the columns used by the charts are sent to the workers
+    ohlc = ohlc[["open", "high", "low", "close", pivot_name, f"{pivot_name}_pos"]]
+    jobs = [(row, pattern, lookback, pivot_name, os.path.join(folder, f"fig{row[0]}.{image_format}"), image_format)
+            for row in pattern_points.iterrows()]
+
+    if workers == 1 or len(jobs) <= 1:
+        job_iter = jobs if not progress else tqdm(jobs, desc=f"Saving the {pattern} charts...")
+        template = ChartTemplate()
+
+        return [_write_figure(_pattern_figure(ohlc, row, pattern, lookback, pivot_name, template), path, image_format)
+                for row, pattern, lookback, pivot_name, path, image_format in job_iter]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker, initargs=(ohlc,)) as executor:
+        chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        paths     = executor.map(_export_job, jobs, chunksize=chunksize)
+        if progress:
+            paths = tqdm(paths, total=len(jobs), desc=f"Saving the {pattern} charts...")
+
+        return list(paths)
@@ -0,0 +1,136 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Closed-form linear regression of the pivot points for many windows at once
+"""
+
+import numpy as np
+
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from typing import Tuple
+
+
+def _row_sums(values: np.ndarray) -> np.ndarray:
+    """
+    Sum each row from left to right. Unlike `np.sum` the order does not depend on the row width,
+    so padding a window with zeros never changes its result.
+    """
+
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+
+    return np.add.accumulate(values, axis=1)[:, -1]
+
+
+def linregress_windows(x: np.ndarray, y: np.ndarray, starts: np.ndarray, stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the slope, intercept and r value of the least squares line for every window [starts[k], stops[k])
+    of the (x, y) points in a single vectorized pass. Same results as `scipy.stats.linregress` up to
+    floating point rounding, including `r = 0` when x or y is constant. Empty windows give NaN.
+
+    :params x is the array of the points x values, e.g. the pivot points indexes
+    :type :np.ndarray
+
+    :params y is the array of the points y values, e.g. the pivot points prices
+    :type :np.ndarray
+
+    :params starts is the array of first point of each window
+    :type :np.ndarray
+
+    :params stops is the array of the point after the last one of each window
+    :type :np.ndarray
+
+    :return (Tuple[np.ndarray, np.ndarray, np.ndarray])
+    """
+
+    x      = np.asarray(x, dtype=float)
+    y      = np.asarray(y, dtype=float)
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.asarray(stops, dtype=np.int64) - starts
+
+    if len(counts) == 0 or len(x) == 0:
+        empty = np.full(len(counts), np.nan)
+        return empty, empty.copy(), empty.copy()
+
+    # Gather the windows into rows padded with zeros
+    cols = np.arange(counts.max())
+    mask = cols[None, :] < counts[:, None]
+    idx  = np.minimum(starts[:, None] + cols[None, :], len(x) - 1)
+    xs   = np.where(mask, x[idx], 0.0)
+    ys   = np.where(mask, y[idx], 0.0)
+    n    = counts.astype(float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xmean = _row_sums(xs) / n
+        ymean = _row_sums(ys) / n
+
+        # Centre the points before the sums of squares to avoid cancellation
+        dx    = np.where(mask, xs - xmean[:, None], 0.0)
+        dy    = np.where(mask, ys - ymean[:, None], 0.0)
+        ssxm  = _row_sums(dx * dx) / n
+        ssym  = _row_sums(dy * dy) / n
+        ssxym = _row_sums(dx * dy) / n
+
+        slope     = ssxym / ssxm
+        intercept = ymean - slope * xmean
+        r         = np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0)
+
+    r = np.where((ssxm == 0.0) | (ssym == 0.0), 0.0, r)
+    r = np.where(counts == 0, np.nan, r)
+
+    return slope, intercept, r
+
+
+def linregress_points(x: np.ndarray, y: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Get the slope, intercept and r value of a single set of points. Same numbers as `linregress_windows`.
+
+    :params x is the array of the points x values
+    :type :np.ndarray
+
+    :params y is the array of the points y values
+    :type :np.ndarray
+
+    :return (Tuple[float, float, float])
+    """
+
+    slope, intercept, r = linregress_windows(x, y, [0], [len(x)])
+
+    return slope[0], intercept[0], r[0]
+
+
+def linregress_pivot_windows(index: PivotIndex, size: int, lookback: int, 
+                             offset: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fit the lines through the pivot lows and pivot highs in the window [candle - lookback, candle]
+    of every candlestick. Candlesticks without a full window, or without pivot points, get NaN.
+
+    :params index is the pivot index of the series
+    :type :PivotIndex
+
+    :params size is the number of candlesticks in the series
+    :type :int
+
+    :params lookback is the number of back candlesticks to use
+    :type :int
+
+    :params offset is the position of the first candlestick in the full series. The arrays returned then
+            cover the candlesticks [offset, offset + size) and `index` must use the positions of the full series
+    :type :int
+
+    :return (Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]) the slope, intercept
+             and r value of the pivot lows followed by the ones of the pivot highs
+    """
+
+    candles = np.arange(max(lookback, offset), offset + size)
+    fits    = []
+
+    for pivot, xx, prices in [(1, index.low_idx, index.low_prices), (2, index.high_idx, index.high_prices)]:
+        starts, stops = index.bounds(pivot, candles - lookback, candles + 1)
+
+        for values in linregress_windows(xx, prices, starts, stops):
+            fit = np.full(size, np.nan)
+            fit[candles - offset] = values
+            fits.append(fit)
+
+    return tuple(fits)
@@ -0,0 +1,527 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Find all the chart patterns with a single pass over the candlesticks
+"""
+
+import numpy as np
+import pandas as pd
+
+from chart_patterns.chart_patterns.charts_utils import find_points
+from chart_patterns.chart_patterns.doubles import _doubles_check
+from chart_patterns.chart_patterns.engines import resolve_engine
+from chart_patterns.chart_patterns.flag import _flag_check
+from chart_patterns.chart_patterns.head_and_shoulders import _hs_check
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import _ihs_check
+from chart_patterns.chart_patterns.loader import iter_ohlc_csv
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pennant import _pennant_check
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from chart_patterns.chart_patterns.pivot_points import PivotStrength
+from chart_patterns.chart_patterns.regression import linregress_pivot_windows
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.timing import stage
+from chart_patterns.chart_patterns.triangles import _triangle_check
+from chart_patterns.chart_patterns.utils import check_ohlc_names, read_high_low
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+
+# Default lookback of each `find_*` function
+LOOKBACKS = {"flag": 25, "pennant": 20, "triangle": 25, "double": 25, "hs": 60, "ihs": 60}
+
+# All the patterns with the default parameters. The triangles and doubles are scanned for every type.
+DEFAULT_PATTERNS = {"flag": {}, "pennant": {},
+                    "triangle": [{"triangle_type": "ascending"}, {"triangle_type": "descending"}, {"triangle_type": "symmetrical"}],
+                    "double": [{"double": "tops"}, {"double": "bottoms"}],
+                    "hs": {}, "ihs": {}}
+
+# Number of candlesticks whose trendlines are fitted at once in the read-only mode
+READONLY_BLOCK_SIZE = 4096
+
+_WINDOW_CHECKS = {"flag": _flag_check, "pennant": _pennant_check, "triangle": _triangle_check}
+_HS_CHECKS     = {"hs": (_hs_check, 2), "ihs": (_ihs_check, 1)}
+
+
+class _ScanJob(NamedTuple):
+    name: str
+    lookback: int
+    params: Dict[str, Any]
+    pivot_interval: int = 10
+    short_pivot_interval: int = 5
+
+
+def _scan_jobs(patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]]) -> List[_ScanJob]:
+    """
+    Get the list of pattern checks to run at each candlestick
+    """
+
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+
+    jobs = []
+    for name, params_list in patterns.items():
+        if name not in LOOKBACKS:
+            raise ValueError(f"Unknown pattern `{name}`. Options are {list(LOOKBACKS)}")
+
+        if isinstance(params_list, dict):
+            params_list = [params_list]
+
+        for params in params_list:
+            params   = dict(params)
+            params.pop("progress", None)
+            lookback = params.pop("lookback", LOOKBACKS[name])
+
+            if name in _HS_CHECKS:
+                pivot_interval       = params.pop("pivot_interval", 10)
+                short_pivot_interval = params.pop("short_pivot_interval", 5)
+
+                if short_pivot_interval <= 0 or pivot_interval <= 0:
+                    raise ValueError("Value cannot be less or equal to 0")
+
+                if short_pivot_interval >= pivot_interval:
+                    raise ValueError(f"short_pivot_interval must be less than pivot_interval")
+
+                jobs.append(_ScanJob(name, lookback, params, pivot_interval, short_pivot_interval))
+            else:
+                jobs.append(_ScanJob(name, lookback, params))
+
+    return jobs
+
+
+def scan_all_patterns(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]] = None,
+                      progress: bool = False, sparse: bool = False, readonly: bool = False, engine: Union[None, str] = None,
+                      strength: Union[None, PivotStrength] = None) -> Union[pd.DataFrame, PatternMatches]:
+    """
+    Find all the chart patterns with a single pass over the candlesticks. The pivot points are computed once
+    and every pattern is checked at each candlestick. The `ohlc` dataframe is not changed apart from the column names.
+
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container or a memory mapped `OHLCStore` whose columns
+            are read without a copy
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+    :params patterns maps the pattern names to the parameters of their `find_*` function, or a list of them to
+            run a pattern several times (e.g. for each triangle type). Options - ["flag", "pennant", "triangle",
+            "double", "hs", "ihs"]. All the patterns with the default parameters are scanned if not given
+    :type :Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]]
+
+    :params progress bar to be displayed or not
+    :type :bool
+
+    :params sparse is whether to return the compact `PatternMatches` table instead of the dataframe
+    :type :bool
+
+    :params readonly is whether to leave `ohlc` unchanged, including the column names. The trendlines are then fitted
+            `READONLY_BLOCK_SIZE` candlesticks at a time, so only the pivot points stage allocates arrays the size of `ohlc`
+    :type :bool
+
+    :params engine is the compute engine of the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :params strength is a pivot strength index built from the same `ohlc`. It is built here if not given
+    :type :Union[None, PivotStrength]
+
+    :return (Union[pd.DataFrame, PatternMatches]) with one row per pattern found. The `candle_idx` column has the candlestick
+            index and the other columns are the ones written by the `find_*` functions
+    """
+
+    jobs = _scan_jobs(patterns)
+
+    if strength is not None and len(strength) != len(ohlc):
+        raise ValueError(f"The pivot strength index has {len(strength)} bars but `ohlc` has {len(ohlc)}")
+
+    if isinstance(ohlc, OHLCStore):
+        ohlc = OHLCArrays.from_store(ohlc)
+
+    if isinstance(ohlc, OHLCArrays):
+        return _matches_frame(_scan_arrays(ohlc.high, ohlc.low, jobs, 0, 0, len(ohlc), progress,
+                                           READONLY_BLOCK_SIZE if readonly else None, engine, strength), sparse, ohlc.high, ohlc.low)
+
+    if readonly:
+        high, low = read_high_low(ohlc)
+        return _matches_frame(_scan_arrays(high, low, jobs, 0, 0, len(ohlc), progress, READONLY_BLOCK_SIZE, engine, strength),
+                              sparse, high, low)
+
+    check_ohlc_names(ohlc)
+    high = ohlc["high"].to_numpy(dtype=float)
+    low  = ohlc["low"].to_numpy(dtype=float)
+
+    return _matches_frame(_scan_arrays(high, low, jobs, 0, 0, len(ohlc), progress, None, engine, strength), sparse, high, low)
+
+
+def _matches_frame(matches: List[Dict[str, Any]], sparse: bool = False, high: Union[None, np.ndarray] = None,
+                   low: Union[None, np.ndarray] = None) -> Union[pd.DataFrame, PatternMatches]:
+    """
+    Get the dataframe, or the `PatternMatches` table if `sparse`, of the patterns found. The high and low prices
+    give the prices of the triangle points of the table
+    """
+
+    if sparse:
+        return PatternMatches.from_results(((match["candle_idx"], match) for match in matches), high, low)
+
+    if len(matches) == 0:
+        return pd.DataFrame(columns=["candle_idx", "chart_type"])
+
+    return pd.DataFrame(matches)
+
+
+def _scan_arrays(high: np.ndarray, low: np.ndarray, jobs: List[_ScanJob], offset: int, start: int, stop: int,
+                 progress: bool = False, block_size: Union[None, int] = None, engine: Union[None, str] = None,
+                 strength: Union[None, PivotStrength] = None) -> List[Dict[str, Any]]:
+    """
+    Check the patterns of the candlesticks [start, stop) of the series. `high` and `low` are the slice of the series
+    that begins at `offset`, it must hold all the bars used by the pivot points of these candlesticks.
+    The trendlines are fitted for `block_size` candlesticks at a time, or all of them at once if not given.
+    The pivot strength index is built with the `engine` kernels if not given, it must have the bars of `high`.
+    """
+
+    size = len(high)
+
+    # Find the pivot points once for all the patterns
+    with stage("scan", "pivots"):
+        if strength is None:
+            strength = PivotStrength(high, low, engine)
+        index     = PivotIndex(strength.pivot_codes(3, 3), high, low, offset)
+        hs_pivots = {}
+        for job in jobs:
+            if job.name in _HS_CHECKS and (job.pivot_interval, job.short_pivot_interval) not in hs_pivots:
+                short_pivot = strength.pivot_codes(job.short_pivot_interval, job.short_pivot_interval)
+                hs_pivots[(job.pivot_interval, job.short_pivot_interval)] = (strength.pivot_codes(job.pivot_interval, job.pivot_interval),
+                                                                             short_pivot, PivotIndex(short_pivot, high, low, offset))
+
+    # The pivot lows and highs lines of every window are fitted in one pass per lookback and block of candlesticks
+    lookbacks  = sorted({job.lookback for job in jobs if job.name in _WINDOW_CHECKS})
+    block_size = max(stop - start, 1) if block_size is None else block_size
+    fits_start = None
+    fits       = {}
+
+    if not progress:
+        candle_iter = range(start, stop)
+    else:
+        candle_iter = tqdm(range(start, stop), desc="Finding all chart patterns...")
+
+    # The trendlines fits are part of the check stage since they are computed block by block
+    matches = []
+    with stage("scan", "check"):
+        for candle_idx in candle_iter:
+
+            # The window points are shared by the patterns with the same lookback
+            windows = {}
+
+            if len(lookbacks) > 0 and (fits_start is None or candle_idx >= fits_start + block_size):
+                fits_start = candle_idx
+                fits       = {lookback: linregress_pivot_windows(index, min(block_size, stop - candle_idx), lookback, candle_idx)
+                              for lookback in lookbacks}
+
+            for job in jobs:
+                if candle_idx < job.lookback:
+                    continue
+
+                window_start = candle_idx - job.lookback
+
+                if job.name in _WINDOW_CHECKS:
+                    if job.lookback not in windows:
+                        windows[job.lookback] = (index.window(window_start, candle_idx + 1),
+                                                 tuple(values[candle_idx - fits_start] for values in fits[job.lookback]))
+
+                    points, fit = windows[job.lookback]
+                    result      = _WINDOW_CHECKS[job.name](candle_idx, *points, fit=fit, **job.params)
+
+                elif job.name == "double":
+                    pivot_indx, pivots = index.pivots(window_start, candle_idx + 1)
+                    if len(pivot_indx) != 5:
+                        continue
+
+                    result = _doubles_check(pivot_indx.tolist(), pivots.tolist(), **job.params)
+
+                else:
+                    check, code                          = _HS_CHECKS[job.name]
+                    long_pivot, short_pivot, short_index = hs_pivots[(job.pivot_interval, job.short_pivot_interval)]
+                    if long_pivot[candle_idx - offset] != code or short_pivot[candle_idx - offset] != code:
+                        continue
+
+                    result = check(*find_points(None, candle_idx, job.lookback, short_index), **job.params)
+
+                if result is not None:
+                    matches.append({"candle_idx": candle_idx, **result})
+
+    return matches
+
+
+def _halo(jobs: List[_ScanJob]) -> Tuple[int, int]:
+    """
+    Get the number of bars needed before and after a range of candlesticks to check them exactly: the lookback window
+    and the bars used to confirm its first pivot point before, and the bars used to confirm the last pivot point after.
+    """
+
+    pivot_counts = [job.pivot_interval if job.name in _HS_CHECKS else 3 for job in jobs]
+    before       = max([job.lookback + count for job, count in zip(jobs, pivot_counts)], default=0)
+    after        = max(pivot_counts, default=0)
+
+    return before, after
+
+
+def _scan_chunk(args: Tuple[Union[str, np.ndarray], Union[Tuple[int, int], np.ndarray], List[_ScanJob], int, int, int, str]
+                ) -> List[Dict[str, Any]]:
+    high, low, jobs, offset, start, stop, engine = args
+
+    # The path of an `OHLCStore` and the bars [first, end) of the chunk
+    if isinstance(high, str):
+        store      = OHLCStore(high)
+        first, end = low
+        high, low  = store.column("high")[first:end], store.column("low")[first:end]
+
+    return _scan_arrays(high, low, jobs, offset, start, stop, engine=engine)
+
+
+class ScanState(NamedTuple):
+    """
+    Result of a scan kept to rescan only the bars appended since, with `rescan_appended`. It can be pickled.
+    """
+
+    matches: PatternMatches
+    length: int
+    patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]] = None
+
+
+class ScanDiff(NamedTuple):
+    """
+    Change of the patterns found by `rescan_appended`. The removed patterns are the ones found on the last candlesticks
+    of the previous scan that are not confirmed by the new bars
+    """
+
+    added: PatternMatches
+    removed: PatternMatches
+
+
+def _series_high_low(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the high and low prices of a series without changing it or copying the memory mapped columns
+    """
+
+    if isinstance(ohlc, OHLCStore):
+        return ohlc.column("high"), ohlc.column("low")
+
+    if isinstance(ohlc, OHLCArrays):
+        return ohlc.high, ohlc.low
+
+    return read_high_low(ohlc)
+
+
+def scan_state(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore],
+               patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]] = None,
+               engine: Union[None, str] = None) -> ScanState:
+    """
+    Scan the whole series, like `scan_all_patterns` with `readonly=True`, and keep the state to rescan new bars
+
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container or an `OHLCStore`
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+    :params patterns is the same as in `scan_all_patterns`
+    :type :Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]]
+
+    :params engine is the compute engine of the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :return (ScanState)
+    """
+
+    return ScanState(scan_all_patterns(ohlc, patterns, sparse=True, readonly=True, engine=engine), len(ohlc), patterns)
+
+
+def rescan_appended(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], state: ScanState,
+                    engine: Union[None, str] = None) -> Tuple[ScanState, ScanDiff]:
+    """
+    Update a scan with the bars appended to the series since. Only the candlesticks whose pivot points were not all
+    confirmed at the previous scan and the new ones are checked again, reading the bars their windows need (the halo
+    of `scan_all_patterns_chunked`). The patterns are the same as a scan of the whole series.
+
+    :params ohlc is the whole series with the new bars, as a dataframe, an `OHLCArrays` container or an `OHLCStore`.
+            Only its last bars are read
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+    :params state is the state of the previous scan, from `scan_state` or `rescan_appended`
+    :type :ScanState
+
+    :params engine is the compute engine of the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :return (Tuple[ScanState, ScanDiff]) the state with all the patterns of the series, and the patterns added and removed
+    """
+
+    if len(ohlc) < state.length:
+        raise ValueError(f"The series has {len(ohlc)} bars, less than the {state.length} bars of the previous scan")
+
+    jobs          = _scan_jobs(state.patterns)
+    before, after = _halo(jobs)
+    high, low     = _series_high_low(ohlc)
+
+    # The candlesticks from `start` could see the pivot points of their last bars change with the new bars
+    start  = max(state.length - after, 0)
+    offset = max(start - before, 0)
+    tail   = _scan_arrays(high[offset:], low[offset:], jobs, offset, start, len(ohlc), engine=engine)
+    tail   = PatternMatches.from_results(((match.pop("candle_idx"), match) for match in tail), high, low)
+
+    previous = state.matches
+    kept     = previous.take(np.flatnonzero(previous.records["candle_idx"] < start))
+    old_tail = previous.take(np.flatnonzero(previous.records["candle_idx"] >= start))
+
+    old_keys = set(old_tail.keys())
+    new_keys = set(tail.keys())
+    added    = tail.take([k for k, key in enumerate(tail.keys()) if key not in old_keys])
+    removed  = old_tail.take([k for k, key in enumerate(old_tail.keys()) if key not in new_keys])
+
+    return ScanState(PatternMatches.concat([kept, tail]), len(ohlc), state.patterns), ScanDiff(added, removed)
+
+
+def scan_all_patterns_chunked(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]] = None,
+                              chunk_size: int = 100_000, workers: Union[None, int] = None,
+                              sparse: bool = False, engine: Union[None, str] = None) -> Union[pd.DataFrame, PatternMatches]:
+    """
+    Same as `scan_all_patterns` but the candlesticks are split into chunks scanned in parallel on a process pool.
+    Each chunk is sent with the bars before and after it that its pivot points and windows need (the halo),
+    so the result is identical to `scan_all_patterns`.
+
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container, or an `OHLCStore` that each worker maps instead
+            of receiving a copy of the prices
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
+
+    :params patterns is the same as in `scan_all_patterns`
+    :type :Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]]
+
+    :params chunk_size is the number of candlesticks of each chunk, not counting the halo
+    :type :int
+
+    :params workers is the number of processes. Defaults to the number of CPUs. The chunks are run in this process if 1
+    :type :Union[None, int]
+
+    :params sparse is whether to return the compact `PatternMatches` table instead of the dataframe
+    :type :bool
+
+    :params engine is the compute engine of the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given, the workers use the same one
+    :type :Union[None, str]
+
+    :return (Union[pd.DataFrame, PatternMatches])
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be greater than 0")
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    jobs   = _scan_jobs(patterns)
+    engine = resolve_engine(engine)
+
+    if isinstance(ohlc, OHLCArrays):
+        high, low = ohlc.high, ohlc.low
+    elif isinstance(ohlc, OHLCStore):
+        high, low = ohlc.column("high"), ohlc.column("low")
+    else:
+        check_ohlc_names(ohlc)
+        high = ohlc["high"].to_numpy(dtype=float)
+        low  = ohlc["low"].to_numpy(dtype=float)
+
+    before, after = _halo(jobs)
+    chunks        = []
+    for start in range(0, len(ohlc), chunk_size):
+        stop   = min(start + chunk_size, len(ohlc))
+        offset = max(start - before, 0)
+        end    = min(stop + after, len(ohlc))
+        if isinstance(ohlc, OHLCStore):
+            # The workers map the store themselves, only its path is sent to them
+            chunks.append((ohlc.path, (offset, end), jobs, offset, start, stop, engine))
+        else:
+            chunks.append((high[offset:end], low[offset:end], jobs, offset, start, stop, engine))
+
+    if workers == 1 or len(chunks) <= 1:
+        results = map(_scan_chunk, chunks)
+        return _matches_frame([match for matches in results for match in matches], sparse, high, low)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_scan_chunk, chunks)
+        return _matches_frame([match for matches in results for match in matches], sparse, high, low)
+
+
+def _chunk_high_low(chunk: Union[pd.DataFrame, OHLCArrays]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the high and low prices of a chunk of bars without changing it
+    """
+
+    if isinstance(chunk, OHLCArrays):
+        return chunk.high, chunk.low
+
+    return read_high_low(chunk)
+
+
+def scan_all_patterns_stream(source: Union[str, Iterable[Union[pd.DataFrame, OHLCArrays]]],
+                             patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]] = None,
+                             chunksize: int = 1_000_000, engine: Union[None, str] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Same as `scan_all_patterns` for histories that do not fit in memory. The bars are read one chunk at a time and
+    only the high and low prices of the chunk and of the bars the next candlesticks still need (the halo of
+    `scan_all_patterns_chunked`) are kept, so the memory used depends on the chunk size and not on the length of the
+    history. The patterns are yielded as soon as the bars confirming their pivot points are read, in the same order
+    and with the same values as `scan_all_patterns`.
+
+    :params source is the path of an OHLC CSV file read with `iter_ohlc_csv`, or an iterable of consecutive chunks of
+            bars as dataframes or `OHLCArrays` containers
+    :type :Union[str, Iterable[Union[pd.DataFrame, OHLCArrays]]]
+
+    :params patterns is the same as in `scan_all_patterns`
+    :type :Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]]
+
+    :params chunksize is the number of rows read at a time from the CSV file
+    :type :int
+
+    :params engine is the compute engine of the pivot points. Options - [None, "python", "numpy", "numba"].
+            The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :return (Iterator[Tuple[int, Dict[str, Any]]]) the candlestick index in the whole history and the columns of each
+            pattern found. `PatternMatches.from_results` collects them in a compact table
+    """
+
+    jobs          = _scan_jobs(patterns)
+    before, after = _halo(jobs)
+
+    if isinstance(source, str):
+        source = iter_ohlc_csv(source, chunksize)
+
+    # The bars kept in memory begin at `offset`, the candlesticks before `scanned` are done
+    high    = np.zeros(0)
+    low     = np.zeros(0)
+    offset  = 0
+    scanned = 0
+
+    for chunk in source:
+        chunk_high, chunk_low = _chunk_high_low(chunk)
+        high = np.concatenate([high, chunk_high])
+        low  = np.concatenate([low, chunk_low])
+
+        # The last bars are scanned once the bars confirming their pivot points are read
+        stop = offset + len(high) - after
+        if stop <= scanned:
+            continue
+
+        for match in _scan_arrays(high, low, jobs, offset, scanned, stop, engine=engine):
+            yield match.pop("candle_idx"), match
+
+        scanned = stop
+
+        # Only keep the bars needed by the windows of the next candlesticks
+        keep   = max(scanned - before, offset)
+        high   = high[keep - offset:]
+        low    = low[keep - offset:]
+        offset = keep
+
+    # The last candlesticks of the history, as in the full scan
+    if scanned < offset + len(high):
+        for match in _scan_arrays(high, low, jobs, offset, scanned, offset + len(high), engine=engine):
+            yield match.pop("candle_idx"), match
@@ -0,0 +1,346 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Stateful scanners that detect the chart patterns bar by bar on a live stream of candles
+"""
+
+import numpy as np
+
+from chart_patterns.chart_patterns.doubles import _doubles_check
+from chart_patterns.chart_patterns.flag import _flag_check
+from chart_patterns.chart_patterns.head_and_shoulders import _hs_check
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import _ihs_check
+from chart_patterns.chart_patterns.pennant import _pennant_check
+from chart_patterns.chart_patterns.streaming import PivotEvent, StreamingPivotDetector
+from chart_patterns.chart_patterns.triangles import _triangle_check
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, List, Tuple, Union
+
+
+# A pattern found at a candlestick: (candle_idx, columns written by the `find_*` function)
+Match = Tuple[int, Dict[str, Any]]
+
+
+class _WindowScanner(ABC):
+    """
+    Base scanner for the patterns that use the pivot points in the window [candle - lookback, candle].
+    A candlestick is checked once its last pivot point is confirmed, i.e. `right_count` bars late.
+    """
+
+    def __init__(self, lookback: int, left_count: int = 3, right_count: int = 3):
+        self.lookback = lookback
+        self.pivots   = StreamingPivotDetector(left_count, right_count)
+        self.window   = deque()
+
+    def update(self, high: float, low: float) -> List[Match]:
+        """
+        Add a closed bar and get the patterns completed at that bar
+
+        :params high is the high price of the new bar
+        :type :float
+
+        :params low is the low price of the new bar
+        :type :float
+
+        :return (List[Match])
+        """
+
+        event = self.pivots.update(high, low)
+        if event is not None:
+            self.window.append(event)
+
+        if self.pivots.confirmed < 0:
+            return []
+
+        return self._evaluate(self.pivots.confirmed)
+
+    def flush(self) -> List[Match]:
+        """
+        End the stream and check the last candlesticks, whose pivot points can no longer be confirmed.
+        This gives the same result as running the `find_*` function on the full history.
+
+        :return (List[Match])
+        """
+
+        matches = []
+        for candle_idx in range(self.pivots.confirmed + 1, self.pivots.count):
+            matches += self._evaluate(candle_idx)
+
+        return matches
+
+    def _evaluate(self, candle_idx: int) -> List[Match]:
+
+        # Drop the pivot points that no later window can use
+        while self.window and self.window[0].index < candle_idx - self.lookback:
+            self.window.popleft()
+
+        if candle_idx < self.lookback:
+            return []
+
+        result = self._check(candle_idx, [event for event in self.window if event.index <= candle_idx])
+
+        return [] if result is None else [(candle_idx, result)]
+
+    @abstractmethod
+    def _check(self, candle_idx: int, events: List[PivotEvent]) -> Union[None, Dict[str, Any]]:
+        """
+        Check the pattern at the candlestick with the confirmed pivot points of its window
+        """
+
+
+def _window_points(events: List[PivotEvent]) -> Tuple[np.array, np.array, np.array, np.array]:
+    """
+    Get the pivot highs, pivot lows and their indexes in the same form as the `find_*` functions
+    """
+
+    maxim = np.array([event.high for event in events if event.pivot == 2], dtype=float)
+    minim = np.array([event.low for event in events if event.pivot == 1], dtype=float)
+    xxmax = np.array([event.index for event in events if event.pivot == 2], dtype=float)
+    xxmin = np.array([event.index for event in events if event.pivot == 1], dtype=float)
+
+    return maxim, minim, xxmax, xxmin
+
+
+class FlagScanner(_WindowScanner):
+    """
+    Live version of `find_flag_pattern`. Takes the same parameters except `progress`.
+    """
+
+    def __init__(self, lookback: int = 25, **params):
+        super().__init__(lookback)
+        self.params = params
+
+    def _check(self, candle_idx: int, events: List[PivotEvent]) -> Union[None, Dict[str, Any]]:
+        maxim, minim, xxmax, xxmin = _window_points(events)
+        return _flag_check(candle_idx, maxim, minim, xxmax, xxmin, **self.params)
+
+
+class PennantScanner(_WindowScanner):
+    """
+    Live version of `find_pennant`. Takes the same parameters except `progress`.
+    """
+
+    def __init__(self, lookback: int = 20, **params):
+        super().__init__(lookback)
+        self.params = params
+
+    def _check(self, candle_idx: int, events: List[PivotEvent]) -> Union[None, Dict[str, Any]]:
+        maxim, minim, xxmax, xxmin = _window_points(events)
+        return _pennant_check(candle_idx, maxim, minim, xxmax, xxmin, **self.params)
+
+
+class TriangleScanner(_WindowScanner):
+    """
+    Live version of `find_triangle_pattern`. Takes the same parameters except `progress`.
+    """
+
+    def __init__(self, lookback: int = 25, **params):
+        super().__init__(lookback)
+        self.params = params
+
+    def _check(self, candle_idx: int, events: List[PivotEvent]) -> Union[None, Dict[str, Any]]:
+        maxim, minim, xxmax, xxmin = _window_points(events)
+        return _triangle_check(candle_idx, maxim, minim, xxmax, xxmin, **self.params)
+
+
+class DoublesScanner(_WindowScanner):
+    """
+    Live version of `find_doubles_pattern`. Takes the same parameters except `progress`.
+    """
+
+    def __init__(self, lookback: int = 25, **params):
+        super().__init__(lookback)
+        self.params = params
+
+    def _check(self, candle_idx: int, events: List[PivotEvent]) -> Union[None, Dict[str, Any]]:
+
+        # Must have only 5 pivots
+        if len(events) != 5:
+            return None
+
+        pivot_indx = [event.index for event in events]
+        pivots     = [event.low - 1e-3 if event.pivot == 1 else event.high + 1e-3 if event.pivot == 2 else np.nan
+                      for event in events]
+
+        return _doubles_check(pivot_indx, pivots, **self.params)
+
+
+class _HeadShouldersScanner(ABC):
+    """
+    Base scanner for the head and shoulders patterns. A candlestick is checked once its
+    `pivot_interval` pivot point is confirmed, by then all the short pivot points before it are too.
+    """
+
+    def __init__(self, lookback: int = 60, pivot_interval: int = 10, short_pivot_interval: int = 5, **params):
+
+        if short_pivot_interval <= 0 or pivot_interval <= 0:
+            raise ValueError("Value cannot be less or equal to 0")
+
+        if short_pivot_interval >= pivot_interval:
+            raise ValueError(f"short_pivot_interval must be less than pivot_interval")
+
+        self.lookback      = lookback
+        self.half_lookback = int(lookback/2)
+        self.params        = params
+        self.pivots        = StreamingPivotDetector(pivot_interval, pivot_interval)
+        self.short_pivots  = StreamingPivotDetector(short_pivot_interval, short_pivot_interval)
+        self.short_window  = deque()
+
+    def update(self, high: float, low: float) -> List[Match]:
+        """
+        Add a closed bar and get the patterns completed at that bar
+
+        :params high is the high price of the new bar
+        :type :float
+
+        :params low is the low price of the new bar
+        :type :float
+
+        :return (List[Match])
+        """
+
+        event       = self.pivots.update(high, low)
+        short_event = self.short_pivots.update(high, low)
+
+        if short_event is not None:
+            self.short_window.append(short_event)
+
+        if self.pivots.confirmed < 0:
+            return []
+
+        return self._evaluate(self.pivots.confirmed, 0 if event is None else event.pivot)
+
+    def flush(self) -> List[Match]:
+        """
+        End the stream. The last candlesticks cannot be pivot points, so no pattern is found.
+
+        :return (List[Match])
+        """
+
+        matches = []
+        for candle_idx in range(self.pivots.confirmed + 1, self.pivots.count):
+            matches += self._evaluate(candle_idx, 0)
+
+        return matches
+
+    def _evaluate(self, candle_idx: int, pivot: int) -> List[Match]:
+
+        # Drop the short pivot points that no later window can use
+        while self.short_window and self.short_window[0].index < candle_idx - 2*self.half_lookback:
+            self.short_window.popleft()
+
+        if candle_idx < self.lookback or pivot != self.pivot_code:
+            return []
+
+        short_pivot = [event.pivot for event in self.short_window if event.index == candle_idx]
+        if short_pivot != [self.pivot_code]:
+            return []
+
+        # Same points as `find_points` for the window [candle - 2*half_lookback, candle)
+        idx    = candle_idx - self.half_lookback
+        events = [event for event in self.short_window if event.index < candle_idx]
+        highs  = [event for event in events if event.pivot == 2]
+        lows   = [event for event in events if event.pivot == 1]
+
+        maxim = np.array([event.high for event in highs], dtype=float)
+        minim = np.array([event.low for event in lows], dtype=float)
+        xxmax = np.array([event.index for event in highs], dtype=float)
+        xxmin = np.array([event.index for event in lows], dtype=float)
+
+        maxacount = sum(event.index > idx for event in highs)
+        minacount = sum(event.index > idx for event in lows)
+        maxbcount = sum(event.index < idx for event in highs)
+        minbcount = sum(event.index < idx for event in lows)
+
+        result = self._check(maxim, minim, xxmax, xxmin, maxacount, minacount, maxbcount, minbcount)
+
+        return [] if result is None else [(candle_idx, result)]
+
+    @abstractmethod
+    def _check(self, *points) -> Union[None, Dict[str, Any]]:
+        """
+        Check the pattern with the points of its window, in the order of `find_points`
+        """
+
+
+class HeadAndShouldersScanner(_HeadShouldersScanner):
+    """
+    Live version of `find_head_and_shoulders`. Takes the same parameters except `progress` and `strength`.
+    """
+
+    pivot_code = 2
+
+    def _check(self, *points) -> Union[None, Dict[str, Any]]:
+        return _hs_check(*points, **self.params)
+
+
+class InverseHeadAndShouldersScanner(_HeadShouldersScanner):
+    """
+    Live version of `find_inverse_head_and_shoulders`. Takes the same parameters except `progress` and `strength`.
+    """
+
+    pivot_code = 1
+
+    def _check(self, *points) -> Union[None, Dict[str, Any]]:
+        return _ihs_check(*points, **self.params)
+
+
+SCANNERS = {"flag": FlagScanner, "pennant": PennantScanner, "triangle": TriangleScanner, "double": DoublesScanner,
+            "hs": HeadAndShouldersScanner, "ihs": InverseHeadAndShouldersScanner}
+
+
+class PatternScanner:
+    """
+    Run several chart pattern scanners on the same live stream of candles
+    """
+
+    def __init__(self, patterns: Union[None, Dict[str, Dict[str, Any]]] = None):
+        """
+        :params patterns maps the pattern names to the parameters of their `find_*` function.
+                Options - ["flag", "pennant", "triangle", "double", "hs", "ihs"]. All the patterns
+                with the default parameters are scanned if not given
+        :type :Union[None, Dict[str, Dict[str, Any]]]
+        """
+
+        if patterns is None:
+            patterns = {name: {} for name in SCANNERS}
+
+        for name in patterns:
+            if name not in SCANNERS:
+                raise ValueError(f"Unknown pattern `{name}`. Options are {list(SCANNERS)}")
+
+        self.scanners = {name: SCANNERS[name](**params) for name, params in patterns.items()}
+
+    def update(self, high: float, low: float) -> List[Match]:
+        """
+        Add a closed bar and get the patterns completed at that bar
+
+        :params high is the high price of the new bar
+        :type :float
+
+        :params low is the low price of the new bar
+        :type :float
+
+        :return (List[Match])
+        """
+
+        matches = []
+        for scanner in self.scanners.values():
+            matches += scanner.update(high, low)
+
+        # The scanners confirm their candlesticks with different delays, order them like `scan_all_patterns`
+        return sorted(matches, key=lambda match: match[0])
+
+    def flush(self) -> List[Match]:
+        """
+        End the stream and get the patterns found at the last candlesticks
+
+        :return (List[Match])
+        """
+
+        matches = []
+        for scanner in self.scanners.values():
+            matches += scanner.flush()
+
+        return sorted(matches, key=lambda match: match[0])
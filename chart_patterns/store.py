@@ -0,0 +1,315 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+On-disk columnar OHLC store read with memory mapping, so many processes share one copy of the history
+"""
+
+import json
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+
+from chart_patterns.chart_patterns.loader import parse_dates
+from chart_patterns.chart_patterns.utils import find_ohlc_column
+from typing import Any, Dict, Union
+
+
+# Version of the store layout written in the metadata header. The column files of the version 1 stores are in the
+# store directory, the ones of the version 2 stores in the data directory named in the header
+STORE_VERSION = 2
+
+# The columns of the store and their dtype on disk. The timestamps are milliseconds since the epoch
+STORE_COLUMNS = {"timestamp": "<i8", "open": "<f8", "high": "<f8", "low": "<f8", "close": "<f8", "volume": "<f4"}
+
+_META_FILE = "meta.json"
+
+
+def _date_column(ohlc: pd.DataFrame) -> Union[None, str]:
+    """
+    Get the name of the `date` column of an OHLC dataframe, found without case, or None if there is none
+    """
+
+    lower = {column.lower(): column for column in ohlc.columns if isinstance(column, str)}
+
+    return lower.get("date")
+
+
+def _store_columns(ohlc: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Get the arrays of the store columns from an OHLC dataframe. The timestamps are read from the `date` column if
+    there is one (strings in the format of `data/eurusd-4h.csv` or datetimes), else they are 0. The volume is 0 if missing.
+    """
+
+    columns = {name: ohlc[find_ohlc_column(ohlc, name)].to_numpy(dtype=STORE_COLUMNS[name])
+               for name in ["open", "high", "low", "close"]}
+
+    lower       = {column.lower(): column for column in ohlc.columns if isinstance(column, str)}
+    date_column = _date_column(ohlc)
+
+    if date_column is not None:
+        dates = ohlc[date_column]
+        dates = dates.to_numpy() if pd.api.types.is_datetime64_any_dtype(dates) else parse_dates(dates.to_numpy())
+        columns["timestamp"] = dates.astype("datetime64[ms]").astype(STORE_COLUMNS["timestamp"])
+    else:
+        columns["timestamp"] = np.zeros(len(ohlc), dtype=STORE_COLUMNS["timestamp"])
+
+    if "volume" in lower:
+        columns["volume"] = ohlc[lower["volume"]].to_numpy(dtype=STORE_COLUMNS["volume"])
+    else:
+        columns["volume"] = np.zeros(len(ohlc), dtype=STORE_COLUMNS["volume"])
+
+    return columns
+
+
+class OHLCStore:
+    """
+    Directory with a `meta.json` header and a data directory with one raw binary file per column (`<column>.bin`).
+    The header has the number of bars and the name of the data directory. The columns are opened read-only with
+    `np.memmap`, so reading them copies nothing and the pages are shared by all the processes reading the same store.
+    New bars are appended to the column files before the header is updated, so a reader never sees a bar that is not
+    fully written, and an overwritten store is a new data directory switched to by the header.
+
+    The store can be given to `scan_all_patterns`, `scan_all_patterns_chunked` and the `find_*` functions instead of
+    the dataframe, or turned into an `OHLCArrays` container with `OHLCArrays.from_store`.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an existing store
+
+        :params path is the directory of the store
+        :type :str
+        """
+
+        self.path = path
+        self.refresh()
+
+    def __len__(self) -> int:
+        return self.meta["length"]
+
+    def __repr__(self) -> str:
+        return f"OHLCStore({self.path!r}, {len(self)} bars)"
+
+    @classmethod
+    def create(cls, path: str, ohlc: pd.DataFrame, overwrite: bool = False) -> "OHLCStore":
+        """
+        Create a store from an OHLC dataframe, such as the one of `read_ohlc_csv`
+
+        :params path is the directory of the store, created if it does not exist
+        :type :str
+
+        :params ohlc is the OHLC dataframe
+        :type :pd.DataFrame
+
+        :params overwrite is whether to replace an existing store in the directory. The new columns are written to a
+                new data directory and the header is switched to it in one `os.replace`, so a reader sees either the
+                old store or the new one. The old data directory is then removed: the processes that mapped its
+                columns keep reading them, and see the new store after a `refresh`
+        :type :bool
+
+        :return (OHLCStore)
+        """
+
+        meta_path = os.path.join(path, _META_FILE)
+        if os.path.exists(meta_path) and not overwrite:
+            raise ValueError(f"There is already a store in `{path}`")
+
+        columns = _store_columns(ohlc)
+        _check_order(ohlc, columns["timestamp"], None)
+
+        os.makedirs(path, exist_ok=True)
+        previous = _read_meta(path) if os.path.exists(meta_path) else None
+
+        data_path = tempfile.mkdtemp(prefix="data-", dir=path)
+        try:
+            _write_columns(data_path, STORE_COLUMNS, columns, 0)
+            _write_meta(path, {"version": STORE_VERSION, "length": len(ohlc), "columns": STORE_COLUMNS,
+                               "data": os.path.basename(data_path)})
+        except BaseException:
+            shutil.rmtree(data_path, ignore_errors=True)
+            raise
+
+        if previous is not None:
+            _remove_data(path, previous)
+
+        return cls(path)
+
+    def refresh(self) -> None:
+        """
+        Read the header again and map the columns, to see the bars appended by another process
+
+        :return (None)
+        """
+
+        while True:
+            meta = _read_meta(self.path)
+            try:
+                columns = _map_columns(_data_path(self.path, meta), meta)
+            except FileNotFoundError:
+                # The store was overwritten between the read of the header and the mapping of its columns
+                if _read_meta(self.path) == meta:
+                    raise
+                continue
+            break
+
+        self.meta     = meta
+        self._columns = columns
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get the read-only memory mapped array of a column
+
+        :params name is the name of the column. Options - ["timestamp", "open", "high", "low", "close", "volume"]
+        :type :str
+
+        :return (np.ndarray)
+        """
+
+        if name not in self._columns:
+            raise ValueError(f"Unknown column `{name}`. Options are {list(self._columns)}")
+
+        return self._columns[name]
+
+    def dates(self) -> np.ndarray:
+        """
+        Get the timestamps as `datetime64[ms]`, a view of the mapped column
+
+        :return (np.ndarray)
+        """
+
+        return self.column("timestamp").view("datetime64[ms]")
+
+    def append(self, ohlc: pd.DataFrame) -> None:
+        """
+        Append the newly closed bars. Their timestamps must come after the last one of the store, unless the bars have
+        no `date` column: their timestamps are then 0 and their order is not checked.
+
+        :params ohlc is the OHLC dataframe of the new bars
+        :type :pd.DataFrame
+
+        :return (None)
+        """
+
+        if len(ohlc) == 0:
+            return
+
+        columns = _store_columns(ohlc)
+        length  = len(self)
+
+        _check_order(ohlc, columns["timestamp"], self.column("timestamp")[-1] if length > 0 else None)
+        _write_columns(_data_path(self.path, self.meta), self.meta["columns"], columns, length)
+
+        _write_meta(self.path, {**self.meta, "length": length + len(ohlc)})
+        self.refresh()
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the bars as a dataframe with the `date`, `open`, `high`, `low`, `close` and `volume` columns. The data is copied.
+
+        :return (pd.DataFrame)
+        """
+
+        return pd.DataFrame({"date": self.dates(), **{name: np.array(self.column(name))
+                                                       for name in ["open", "high", "low", "close", "volume"]}})
+
+
+def _check_order(ohlc: pd.DataFrame, timestamps: np.ndarray, last: Union[None, int]) -> None:
+    """
+    Check the new bars are in time order and come after the last timestamp of the store. Bars without a `date`
+    column are not checked
+    """
+
+    if _date_column(ohlc) is None:
+        return
+
+    if (np.diff(timestamps) < 0).any() or (last is not None and len(timestamps) > 0 and timestamps[0] < last):
+        raise ValueError("The bars must be in time order and come after the bars of the store")
+
+
+def _write_columns(data_path: str, dtypes: Dict[str, str], columns: Dict[str, np.ndarray], length: int) -> None:
+    """
+    Write the new bars after the first `length` bars of the column files
+    """
+
+    for name, dtype in dtypes.items():
+        column_path = os.path.join(data_path, f"{name}.bin")
+        open(column_path, "ab").close()
+
+        with open(column_path, "r+b") as file:
+            # Drop the bytes of an append that was interrupted before the header was written
+            file.truncate(length * np.dtype(dtype).itemsize)
+            file.seek(0, os.SEEK_END)
+            file.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def _map_columns(data_path: str, meta: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Map the columns of the store read-only
+    """
+
+    columns = {}
+    for name, dtype in meta["columns"].items():
+        if meta["length"] == 0:
+            values = np.zeros(0, dtype=dtype)
+            values.flags.writeable = False
+        else:
+            values = np.memmap(os.path.join(data_path, f"{name}.bin"), dtype=dtype, mode="r", shape=(meta["length"],))
+        columns[name] = values
+
+    return columns
+
+
+def _data_path(path: str, meta: Dict[str, Any]) -> str:
+    """
+    Get the directory of the column files. The version 1 stores have no data directory
+    """
+
+    return os.path.join(path, meta.get("data", ""))
+
+
+def _remove_data(path: str, meta: Dict[str, Any]) -> None:
+    """
+    Remove the column files of a replaced store
+    """
+
+    if "data" in meta:
+        shutil.rmtree(_data_path(path, meta), ignore_errors=True)
+        return
+
+    for name in meta["columns"]:
+        try:
+            os.remove(os.path.join(path, f"{name}.bin"))
+        except FileNotFoundError:
+            pass
+
+
+def _read_meta(path: str) -> Dict[str, Any]:
+    """
+    Read the header of the store
+    """
+
+    with open(os.path.join(path, _META_FILE)) as file:
+        meta = json.load(file)
+
+    if meta.get("version") not in [1, STORE_VERSION]:
+        raise ValueError(f"The store version {meta.get('version')} is not {STORE_VERSION}")
+
+    return meta
+
+
+def _write_meta(path: str, meta: Dict[str, Any]) -> None:
+    """
+    Write the header of the store atomically
+    """
+
+    tmp_path = os.path.join(path, f"{_META_FILE}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(meta, file)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp_path, os.path.join(path, _META_FILE))
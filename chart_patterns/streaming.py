@@ -0,0 +1,86 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Detect pivot points bar by bar on a live stream of candles
+"""
+
+from collections import deque
+from typing import NamedTuple, Union
+
+
+class PivotEvent(NamedTuple):
+    """
+    A confirmed pivot point. `pivot` has the same codes as `find_pivot_point`
+    """
+
+    index: int
+    pivot: int
+    high: float
+    low: float
+
+
+class StreamingPivotDetector:
+    """
+    Incremental version of `find_pivot_point`. It keeps a ring buffer of the last
+    `left_count + right_count + 1` bars and confirms each pivot `right_count` bars late.
+    """
+
+    def __init__(self, left_count: int = 3, right_count: int = 3):
+        """
+        :params left_count is the number of candles to the left to consider
+        :type :int
+
+        :params right_count is the number of candles to right to consider
+        :type :int
+        """
+
+        self.left_count  = left_count
+        self.right_count = right_count
+        self.count       = 0
+        self._highs      = deque(maxlen=left_count + right_count + 1)
+        self._lows       = deque(maxlen=left_count + right_count + 1)
+
+    @property
+    def confirmed(self) -> int:
+        """
+        Index of the last bar whose pivot code is final, -1 if none yet
+        """
+
+        return self.count - self.right_count - 1
+
+    def update(self, high: float, low: float) -> Union[None, PivotEvent]:
+        """
+        Add a closed bar and check the bar `right_count` bars back for a pivot point
+
+        :params high is the high price of the new bar
+        :type :float
+
+        :params low is the low price of the new bar
+        :type :float
+
+        :return (Union[None, PivotEvent])
+        """
+
+        self._highs.append(float(high))
+        self._lows.append(float(low))
+        self.count += 1
+
+        # Not enough bars to the left of the bar to confirm
+        if len(self._highs) < self._highs.maxlen:
+            return None
+
+        pivot_high = self._highs[self.left_count]
+        pivot_low  = self._lows[self.left_count]
+        is_high    = not any(pivot_high < value for value in self._highs)
+        is_low     = not any(pivot_low > value for value in self._lows)
+
+        if is_low and is_high:
+            pivot = 3
+        elif is_low:
+            pivot = 1
+        elif is_high:
+            pivot = 2
+        else:
+            return None
+
+        return PivotEvent(self.confirmed, pivot, pivot_high, pivot_low)
@@ -0,0 +1,175 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Per-stage timing of the chart pattern detectors. Nothing is recorded, and the hooks do nothing, outside of `collect_stats`
+"""
+
+import threading
+import time
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Union
+
+
+# The stages of the detectors, in the order they run
+STAGES = ["setup", "pivots", "index", "regression", "candidates", "check", "writeback"]
+
+# The stats being collected in the current context, None when disabled
+_STATS = ContextVar("chart_patterns_stats", default=None)
+
+# Returned by `stage` when disabled, it is reusable
+_NO_STAGE = nullcontext()
+
+
+class StageStats:
+    """
+    Wall time and number of calls of each stage of each detector, and the number of windows (candlesticks)
+    evaluated by the pattern check or skipped before it
+    """
+
+    def __init__(self, callback: Union[None, Callable[[str, str, float], None]] = None):
+        """
+        :params callback is called with the detector, the stage and the seconds at the end of each stage
+        :type :Union[None, Callable[[str, str, float], None]]
+        """
+
+        self.callback  = callback
+        self.detectors = {}
+        self._lock     = threading.Lock()
+
+    def _detector(self, detector: str) -> Dict[str, Any]:
+        return self.detectors.setdefault(detector, {"stages": {}, "windows_evaluated": 0, "windows_skipped": 0})
+
+    def add_time(self, detector: str, name: str, seconds: float) -> None:
+        """
+        Add the time of one call of a stage
+
+        :params detector is the name of the detector
+        :type :str
+
+        :params name is the name of the stage
+        :type :str
+
+        :params seconds is the wall time of the call
+        :type :float
+
+        :return (None)
+        """
+
+        with self._lock:
+            stages = self._detector(detector)["stages"]
+            stats  = stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stats["seconds"] += seconds
+            stats["calls"]   += 1
+
+        if self.callback is not None:
+            self.callback(detector, name, seconds)
+
+    def add_windows(self, detector: str, evaluated: int, skipped: int) -> None:
+        """
+        Add the number of windows evaluated by the pattern check and skipped before it
+
+        :params detector is the name of the detector
+        :type :str
+
+        :params evaluated is the number of windows checked
+        :type :int
+
+        :params skipped is the number of windows that could not pass the check and were not checked
+        :type :int
+
+        :return (None)
+        """
+
+        with self._lock:
+            stats = self._detector(detector)
+            stats["windows_evaluated"] += int(evaluated)
+            stats["windows_skipped"]   += int(skipped)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the stats of each detector, with the stages in the order they run and their total time
+
+        :return (Dict[str, Dict[str, Any]])
+        """
+
+        with self._lock:
+            result = {}
+            for detector, stats in self.detectors.items():
+                order  = sorted(stats["stages"], key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+                stages = {name: dict(stats["stages"][name]) for name in order}
+
+                result[detector] = {"seconds": sum(stage["seconds"] for stage in stages.values()), "stages": stages,
+                                    "windows_evaluated": stats["windows_evaluated"], "windows_skipped": stats["windows_skipped"]}
+
+        return result
+
+
+@contextmanager
+def collect_stats(callback: Union[None, Callable[[str, str, float], None]] = None) -> Iterator[StageStats]:
+    """
+    Collect the stage stats of the detectors run inside the context. The stats are only collected in the current
+    thread or asyncio task, and the tasks it starts, so concurrent collections do not mix. They are not collected
+    in the worker processes of the parallel scans.
+
+    :params callback is called with the detector, the stage and the seconds at the end of each stage
+    :type :Union[None, Callable[[str, str, float], None]]
+
+    :return (Iterator[StageStats])
+    """
+
+    stats = StageStats(callback)
+    token = _STATS.set(stats)
+    try:
+        yield stats
+    finally:
+        _STATS.reset(token)
+
+
+@contextmanager
+def _timed_stage(stats: StageStats, detector: str, name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_time(detector, name, time.perf_counter() - start)
+
+
+def stage(detector: str, name: str):
+    """
+    Context manager timing a stage of a detector. Does nothing outside of `collect_stats`
+
+    :params detector is the name of the detector
+    :type :str
+
+    :params name is the name of the stage. Options - see `STAGES`
+    :type :str
+    """
+
+    stats = _STATS.get()
+    if stats is None:
+        return _NO_STAGE
+
+    return _timed_stage(stats, detector, name)
+
+
+def count_windows(detector: str, evaluated: int, skipped: int) -> None:
+    """
+    Count the windows evaluated by the pattern check and skipped before it. Does nothing outside of `collect_stats`
+
+    :params detector is the name of the detector
+    :type :str
+
+    :params evaluated is the number of windows checked
+    :type :int
+
+    :params skipped is the number of windows that could not pass the check and were not checked
+    :type :int
+
+    :return (None)
+    """
+
+    stats = _STATS.get()
+    if stats is not None:
+        stats.add_windows(detector, evaluated, skipped)
@@ -9,18 +9,30 @@ import pandas as pd
 import plotly.graph_objects as go
 
 
+from chart_patterns.chart_patterns.charts_utils import all_candles, assign_pattern, enough_points, window_counts
+from chart_patterns.chart_patterns.engines import get_kernel, register_kernel
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
 from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
-from scipy.stats import linregress
+from chart_patterns.chart_patterns.regression import linregress_pivot_windows, linregress_points
+from chart_patterns.chart_patterns.store import OHLCStore
+from chart_patterns.chart_patterns.timing import count_windows, stage
 from tqdm import tqdm
+from typing import Any, Dict, Tuple, Union
 
-def find_triangle_pattern(ohlc: pd.DataFrame, lookback: int = 25, min_points: int = 3, rlimit: int = 0.9, 
+register_kernel("triangle_candidates", "python")(all_candles)
+
+
+def find_triangle_pattern(ohlc: Union[pd.DataFrame, OHLCArrays, OHLCStore], lookback: int = 25, min_points: int = 3, rlimit: int = 0.9, 
                           slmax_limit: float = 0.00001, slmin_limit: float = 0.00001,
-                          triangle_type: str = "ascending", progress: bool = False ) -> pd.DataFrame:
+                          triangle_type: str = "ascending", progress: bool = False, engine: Union[None, str] = None,
+                          readonly: bool = False) -> Union[pd.DataFrame, PatternMatches]:
     """
     Find the specified triangle pattern 
     
-    :params ohlc is the OHLC dataframe 
-    :type :pd.DataFrame
+    :params ohlc is the OHLC dataframe, or an `OHLCArrays` container (or `OHLCStore`) that is always read in read-only mode
+    :type :Union[pd.DataFrame, OHLCArrays, OHLCStore]
     
     :params lookback is the number of periods to use for back candles
     :type :int 
@@ -43,88 +55,154 @@ def find_triangle_pattern(ohlc: pd.DataFrame, lookback: int = 25, min_points: in
     :params progress bar to be displayed or not
     :type :bool
     
-    :return (pd.DataFrame)
+    :params engine is the implementation to use. Options - [None, "python", "numpy", "numba"]. The "numpy" engine checks the
+            conditions of all the candlesticks at once. The global engine of `engines.set_engine` is used if not given
+    :type :Union[None, str]
+
+    :params readonly is whether to leave `ohlc` unchanged and only return the patterns found, as a `PatternMatches` table.
+            No column is added to `ohlc` and its columns are not renamed
+    :type :bool
+
+    :return (Union[pd.DataFrame, PatternMatches])
     """
-    
-    
-    ohlc["chart_type"]            = ""
-    ohlc["triangle_type"]         = ""
-    ohlc["triangle_slmax"]        = np.nan
-    ohlc["triangle_slmin"]        = np.nan
-    ohlc["triangle_intercmin"]    = np.nan
-    ohlc["triangle_intercmax"]    = np.nan
-    ohlc["triangle_high_idx"]     = [np.array([]) for _ in range(len(ohlc)) ]
-    ohlc["triangle_low_idx"]      = [np.array([]) for _ in range(len(ohlc)) ]
-    
-    
+
+    if readonly or not isinstance(ohlc, pd.DataFrame):
+        # Imported here since the `scan` module imports this one
+        from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+        params = {"lookback": lookback, "min_points": min_points, "rlimit": rlimit, "slmax_limit": slmax_limit,
+                  "slmin_limit": slmin_limit, "triangle_type": triangle_type}
+
+        return scan_all_patterns(ohlc, {"triangle": params}, progress=progress, sparse=True, readonly=True, engine=engine)
+
+    with stage("triangle", "setup"):
+        ohlc["chart_type"]            = ""
+        ohlc["triangle_type"]         = ""
+        ohlc["triangle_slmax"]        = np.nan
+        ohlc["triangle_slmin"]        = np.nan
+        ohlc["triangle_intercmin"]    = np.nan
+        ohlc["triangle_intercmax"]    = np.nan
+        ohlc["triangle_high_idx"]     = [np.array([]) for _ in range(len(ohlc)) ]
+        ohlc["triangle_low_idx"]      = [np.array([]) for _ in range(len(ohlc)) ]
+
     # Find the pivot points
-    ohlc = find_all_pivot_points(ohlc)   
+    with stage("triangle", "pivots"):
+        ohlc = find_all_pivot_points(ohlc, engine=engine)
     
+    # Index the pivot points and fit the pivot lows and highs lines of every window in one pass
+    with stage("triangle", "index"):
+        index = PivotIndex.from_ohlc(ohlc)
+    with stage("triangle", "regression"):
+        fits = linregress_pivot_windows(index, len(ohlc), lookback)
+
+    # Only the candlesticks that can pass the check are visited
+    with stage("triangle", "candidates"):
+        candles = get_kernel("triangle_candidates", engine)(index, fits, len(ohlc), lookback, min_points, rlimit, slmax_limit, slmin_limit, triangle_type)
+    count_windows("triangle", len(candles), max(len(ohlc) - lookback, 0) - len(candles))
+
     if not progress:
-        candle_iter = range(lookback, len(ohlc))
+        candle_iter = candles.tolist()
     else:
-        candle_iter = tqdm(range(lookback, len(ohlc)), desc="Finding triangle patterns")
+        candle_iter = tqdm(candles.tolist(), desc="Finding triangle patterns")
     
-    for candle_idx in candle_iter:
+    found = []
+    with stage("triangle", "check"):
+        for candle_idx in candle_iter:
         
-        maxim = np.array([])
-        minim = np.array([])
-        xxmin = np.array([])
-        xxmax = np.array([])
-
-        for i in range(candle_idx - lookback, candle_idx+1):
-            if ohlc.loc[i,"pivot"] == 1:
-                minim = np.append(minim, ohlc.loc[i, "low"])
-                xxmin = np.append(xxmin, i) 
-            if ohlc.loc[i,"pivot"] == 2:
-                maxim = np.append(maxim, ohlc.loc[i,"high"])
-                xxmax = np.append(xxmax, i)
-
-       
-        if (xxmax.size < min_points and xxmin.size < min_points) or xxmax.size==0 or xxmin.size==0:
-               continue
-
-        slmin, intercmin, rmin, _, _ = linregress(xxmin, minim)
-        slmax, intercmax, rmax, _, _ = linregress(xxmax, maxim)
-
-        if triangle_type == "symmetrical":
-            if abs(rmax)>=rlimit and abs(rmin)>=rlimit and slmin>=slmin_limit and slmax<=-1*slmax_limit:
-                    ohlc.loc[candle_idx, "chart_type"]            = "triangle"
-                    ohlc.loc[candle_idx, "triangle_type"]         = "symmetrical"
-                    ohlc.loc[candle_idx, "triangle_slmax"]        = slmax
-                    ohlc.loc[candle_idx, "triangle_slmin"]        = slmin
-                    ohlc.loc[candle_idx, "triangle_intercmin"]    = intercmin
-                    ohlc.loc[candle_idx, "triangle_intercmax"]    = intercmax
-                    ohlc.at[candle_idx,  "triangle_high_idx"]     = xxmax
-                    ohlc.at[candle_idx,  "triangle_low_idx"]      = xxmin
-                    ohlc.loc[candle_idx, "triangle_point"]        = candle_idx
-                    
-
-        elif triangle_type == "ascending":
-            if abs(rmax)>=rlimit and abs(rmin)>=rlimit and slmin>=slmin_limit and (slmax>=-1*slmax_limit and slmax <= slmax_limit):
-                    ohlc.loc[candle_idx, "chart_type"]            = "triangle"
-                    ohlc.loc[candle_idx, "triangle_type"]         = "ascending"
-                    ohlc.loc[candle_idx, "triangle_slmax"]        = slmax
-                    ohlc.loc[candle_idx, "triangle_slmin"]        = slmin
-                    ohlc.loc[candle_idx, "triangle_intercmin"]    = intercmin
-                    ohlc.loc[candle_idx, "triangle_intercmax"]    = intercmax
-                    ohlc.at[candle_idx,  "triangle_high_idx"]     = xxmax
-                    ohlc.at[candle_idx,  "triangle_low_idx"]      = xxmin
-                    ohlc.loc[candle_idx, "triangle_point"]        = candle_idx
-                    
-    
-        elif triangle_type == "descending":
-            if abs(rmax)>=rlimit and abs(rmin)>=rlimit and slmax<=-1*slmax_limit and (slmin>=-1*slmin_limit and slmin <= slmin_limit):
-                    ohlc.loc[candle_idx, "chart_type"]            = "triangle"
-                    ohlc.loc[candle_idx, "triangle_type"]         = "descending"
-                    ohlc.loc[candle_idx, "triangle_slmax"]        = slmax
-                    ohlc.loc[candle_idx, "triangle_slmin"]        = slmin
-                    ohlc.loc[candle_idx, "triangle_intercmin"]    = intercmin
-                    ohlc.loc[candle_idx, "triangle_intercmax"]    = intercmax
-                    ohlc.at[candle_idx,  "triangle_high_idx"]     = xxmax
-                    ohlc.at[candle_idx,  "triangle_low_idx"]      = xxmin
-                    ohlc.loc[candle_idx, "triangle_point"]        = candle_idx   
+            maxim, minim, xxmax, xxmin = index.window(candle_idx - lookback, candle_idx + 1)
+
+            result = _triangle_check(candle_idx, maxim, minim, xxmax, xxmin, min_points, rlimit, slmax_limit, slmin_limit,
+                                     triangle_type, fit=tuple(values[candle_idx] for values in fits))
+            if result is not None:
+                found.append((candle_idx, result))
+                if triangle_type == "descending":
                     print(f"Found pattern at index: {candle_idx}")
+
+    with stage("triangle", "writeback"):
+        for candle_idx, result in found:
+            assign_pattern(ohlc, candle_idx, result)
+
     return ohlc
 
 
+@register_kernel("triangle_candidates", "numpy")
+def _triangle_candidates(index: PivotIndex, fits: Tuple[np.ndarray, ...], size: int, lookback: int, min_points: int = 3,
+                         rlimit: int = 0.9, slmax_limit: float = 0.00001, slmin_limit: float = 0.00001,
+                         triangle_type: str = "ascending") -> np.ndarray:
+    """
+    Get the candlesticks that pass the conditions of `_triangle_check`, checked for all the candlesticks at once
+
+    :params index is the pivot index of the series
+    :type :PivotIndex
+
+    :params fits is the output of `linregress_pivot_windows`
+    :type :Tuple[np.ndarray, ...]
+
+    The other parameters are the same as in `find_triangle_pattern`
+
+    :return (np.ndarray)
+    """
+
+    candles, high_first, high_last, low_first, low_last = window_counts(index, size, lookback)
+    slmin, _, rmin, slmax, _, rmax = (values[candles] for values in fits)
+
+    found = enough_points(high_last - high_first, low_last - low_first, min_points) & \
+            (np.abs(rmax)>=rlimit) & (np.abs(rmin)>=rlimit)
+
+    if triangle_type == "symmetrical":
+        found &= (slmin>=slmin_limit) & (slmax<=-1*slmax_limit)
+    elif triangle_type == "ascending":
+        found &= (slmin>=slmin_limit) & (slmax>=-1*slmax_limit) & (slmax <= slmax_limit)
+    elif triangle_type == "descending":
+        found &= (slmax<=-1*slmax_limit) & (slmin>=-1*slmin_limit) & (slmin <= slmin_limit)
+    else:
+        found &= False
+
+    return candles[found]
+
+
+def _triangle_check(candle_idx: int, maxim: np.array, minim: np.array, xxmax: np.array, xxmin: np.array, min_points: int = 3,
+                    rlimit: int = 0.9, slmax_limit: float = 0.00001, slmin_limit: float = 0.00001,
+                    triangle_type: str = "ascending",
+                    fit: Union[None, Tuple[float, float, float, float, float, float]] = None) -> Union[None, Dict[str, Any]]:
+    """
+    Check if the pivot points in the lookback window of the candlestick form the triangle pattern 
+
+    :params candle_idx is the candlestick index of interest
+    :type :int
+
+    :params maxim, minim are the pivot highs and lows in the window and xxmax, xxmin their indexes
+    :type :np.array
+
+    :params fit is the (slmin, intercmin, rmin, slmax, intercmax, rmax) of the window if already computed
+    :type :Union[None, Tuple[float, float, float, float, float, float]]
+
+    The other parameters are the same as in `find_triangle_pattern`
+
+    :return (Union[None, Dict[str, Any]])
+    """
+
+    if (xxmax.size < min_points and xxmin.size < min_points) or xxmax.size==0 or xxmin.size==0:
+        return None
+
+    if fit is None:
+        slmin, intercmin, rmin = linregress_points(xxmin, minim)
+        slmax, intercmax, rmax = linregress_points(xxmax, maxim)
+    else:
+        slmin, intercmin, rmin, slmax, intercmax, rmax = fit
+
+    if triangle_type == "symmetrical":
+        found = abs(rmax)>=rlimit and abs(rmin)>=rlimit and slmin>=slmin_limit and slmax<=-1*slmax_limit
+    elif triangle_type == "ascending":
+        found = abs(rmax)>=rlimit and abs(rmin)>=rlimit and slmin>=slmin_limit and (slmax>=-1*slmax_limit and slmax <= slmax_limit)
+    elif triangle_type == "descending":
+        found = abs(rmax)>=rlimit and abs(rmin)>=rlimit and slmax<=-1*slmax_limit and (slmin>=-1*slmin_limit and slmin <= slmin_limit)
+    else:
+        found = False
+
+    if found:
+        return {"chart_type": "triangle", "triangle_type": triangle_type, "triangle_slmax": slmax, "triangle_slmin": slmin,
+                "triangle_intercmin": intercmin, "triangle_intercmax": intercmax, "triangle_high_idx": xxmax,
+                "triangle_low_idx": xxmin, "triangle_point": candle_idx}
+
+    return None
@@ -0,0 +1,188 @@
+"""
+Date  : 2026-10-17
+Author: Zetra Team
+Scan the chart patterns of many symbols in parallel with a process pool
+"""
+
+import os
+import pandas as pd
+
+from chart_patterns.chart_patterns.loader import read_ohlc_csv
+from chart_patterns.chart_patterns.scan import DEFAULT_PATTERNS, LOOKBACKS, scan_all_patterns
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from tqdm import tqdm
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Tuple, Union
+
+
+class SymbolResult(NamedTuple):
+    """
+    Patterns found for one symbol. `matches` has the same columns as `scan_all_patterns` and
+    `errors` maps the pattern names that failed to the error message.
+    """
+    symbol: str
+    matches: pd.DataFrame
+    errors: Dict[str, str]
+
+
+def _load_universe(universe: Union[str, Mapping[str, pd.DataFrame]]) -> Dict[str, Tuple[Union[str, pd.DataFrame], int]]:
+    """
+    Get the source of each symbol (a dataframe or the path of a CSV file) and its size used for the scheduling
+    """
+
+    if isinstance(universe, str):
+        if not os.path.isdir(universe):
+            raise ValueError(f"`{universe}` is not a directory")
+
+        paths = sorted(name for name in os.listdir(universe) if name.lower().endswith(".csv"))
+
+        return {os.path.splitext(name)[0]: (os.path.join(universe, name), os.path.getsize(os.path.join(universe, name)))
+                for name in paths}
+
+    return {symbol: (ohlc, len(ohlc)) for symbol, ohlc in universe.items()}
+
+
+def _error_message(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def _scan_job(symbol: str, source: Union[str, pd.DataFrame],
+              patterns: Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]) -> Tuple[str, Dict[str, pd.DataFrame], Dict[str, str]]:
+    """
+    Scan all the patterns of one symbol with a single `scan_all_patterns` pass, so the pivot points are found once for
+    all of them, and split the patterns found by name. Any error is returned instead of raised so the other jobs keep
+    running.
+    """
+
+    try:
+        ohlc    = read_ohlc_csv(source) if isinstance(source, str) else source
+        matches = scan_all_patterns(ohlc, patterns, sparse=True, readonly=True)
+
+    # `check_ohlc_names` exits when a price column is missing
+    except (Exception, SystemExit) as error:
+        return symbol, {}, {name: _error_message(error) for name in patterns}
+
+    found = {}
+    for name in patterns:
+        selected = matches.select(name)
+        if len(selected) > 0:
+            found[name] = selected.to_frame()
+
+    return symbol, found, {}
+
+
+def _scan_pool(jobs: List[Tuple[str, Union[str, pd.DataFrame], Dict[str, Any]]], workers: int,
+               collect: Callable[[str, Dict[str, pd.DataFrame], Dict[str, str]], None]) -> None:
+    """
+    Run the jobs on a process pool with at most `workers` jobs submitted at once. When a worker process dies
+    (e.g. out of memory) the pool is broken and every submitted job fails, so the jobs that were submitted are run
+    again one at a time on their own pool: only the job that kills its worker again is recorded as failed, then
+    the other jobs go on with a new pool.
+    """
+
+    queue    = deque(jobs)
+    suspects = []
+
+    while queue or suspects:
+        for symbol, source, patterns in suspects:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                try:
+                    collect(*executor.submit(_scan_job, symbol, source, patterns).result())
+                except Exception as error:
+                    collect(symbol, {}, {name: _error_message(error) for name in patterns})
+
+        suspects = []
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            running = {}
+            while queue or running:
+                while queue and len(running) < workers:
+                    job = queue.popleft()
+                    running[executor.submit(_scan_job, *job)] = job
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        collect(*future.result())
+                    except BrokenProcessPool:
+                        suspects.append(job)
+                    except Exception as error:
+                        collect(job[0], {}, {name: _error_message(error) for name in job[2]})
+
+                if len(suspects) > 0:
+                    suspects.extend(running.values())
+                    break
+
+
+def scan_universe(universe: Union[str, Mapping[str, pd.DataFrame]],
+                  patterns: Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]] = None,
+                  workers: Union[None, int] = None, progress: bool = False) -> Dict[str, SymbolResult]:
+    """
+    Find the chart patterns of many symbols. Each symbol is a job run on a process pool that reads its prices once and
+    scans all the patterns in a single pass, the symbols with the longest histories are started first. A symbol whose worker process
+    dies is recorded as failed and the other symbols are scanned on a new pool.
+
+    :params universe maps the symbols to their OHLC dataframes, or is a directory of CSV files in the same format
+            as `data/eurusd-4h.csv`. The symbol of a CSV file is its name without the extension
+    :type :Union[str, Mapping[str, pd.DataFrame]]
+
+    :params patterns is the same as in `scan_all_patterns`
+    :type :Union[None, Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]]
+
+    :params workers is the number of processes. Defaults to the number of CPUs. The jobs are run in this process if 1
+    :type :Union[None, int]
+
+    :params progress bar to be displayed or not
+    :type :bool
+
+    :return (Dict[str, SymbolResult]) the patterns found and the errors of each symbol
+    """
+
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+
+    for name in patterns:
+        if name not in LOOKBACKS:
+            raise ValueError(f"Unknown pattern `{name}`. Options are {list(LOOKBACKS)}")
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    sources = _load_universe(universe)
+
+    # Longest histories first so they do not end up alone at the end of the batch
+    jobs = [(symbol, source, patterns) for symbol, (source, _) in sorted(sources.items(), key=lambda item: -item[1][1])]
+
+    found  = {symbol: {} for symbol in sources}
+    errors = {symbol: {} for symbol in sources}
+    bar    = tqdm(total=len(jobs), desc="Scanning the universe...") if progress else None
+
+    def collect(symbol: str, symbol_found: Dict[str, pd.DataFrame], symbol_errors: Dict[str, str]) -> None:
+        found[symbol].update(symbol_found)
+        errors[symbol].update(symbol_errors)
+        if bar is not None:
+            bar.update(1)
+
+    if workers == 1:
+        for job in jobs:
+            collect(*_scan_job(*job))
+    else:
+        _scan_pool(jobs, workers or os.cpu_count() or 1, collect)
+
+    if bar is not None:
+        bar.close()
+
+    results = {}
+    for symbol in sources:
+        if len(found[symbol]) == 0:
+            matches = pd.DataFrame(columns=["candle_idx", "chart_type"])
+        else:
+            # Same order whatever the order the jobs finished in
+            matches = pd.concat([found[symbol][name] for name in patterns if name in found[symbol]], ignore_index=True)
+            matches = matches.sort_values("candle_idx", kind="stable").reset_index(drop=True)
+
+        results[symbol] = SymbolResult(symbol, matches, errors[symbol])
+
+    return results
@@ -9,7 +9,7 @@ import numpy as np
 import pandas as pd
 import sys
 
-from typing import Union
+from typing import Tuple, Union
 
 def columns_message(msg: str) -> None:
         print(f"No `{msg.title()}` or `{msg}` price column ")
@@ -36,4 +36,46 @@ def check_ohlc_names(ohlc: pd.DataFrame) -> Union[pd.DataFrame, None]:
             ohlc.rename(columns = {column: name }, inplace=True)
 
             
-    return ohlc
\ No newline at end of file
+    return ohlc
+
+def find_ohlc_column(ohlc: pd.DataFrame, name: str) -> str:
+    """
+    Find the column of the given price, with the same rule as `check_ohlc_names` but without renaming it
+
+    :params ohlc is a dataframe with Open, High, Low, Close data
+    :type :pd.DataFrame
+
+    :params name is the name of the price. Options - ["open", "high", "low", "close"]
+    :type :str
+
+    :return (str) the name of the column in the dataframe
+    """
+
+    result = ohlc.columns.str.lower().str.contains(name)
+    if result.sum() == 0:
+        columns_message(name)
+
+    return ohlc.columns[np.where(result)[0][0]]
+
+
+def read_high_low(ohlc: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the high and low prices without changing the dataframe. The arrays are read-only views of the
+    columns when they are already float, so nothing the size of the data is copied.
+
+    :params ohlc is a dataframe with Open, High, Low, Close data
+    :type :pd.DataFrame
+
+    :return (Tuple[np.ndarray, np.ndarray])
+    """
+
+    for name in ["open", "close"]:
+        find_ohlc_column(ohlc, name)
+
+    prices = []
+    for name in ["high", "low"]:
+        values = ohlc[find_ohlc_column(ohlc, name)].to_numpy(dtype=float).view()
+        values.flags.writeable = False
+        prices.append(values)
+
+    return prices[0], prices[1]
@@ -0,0 +1,62 @@
+import copy
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.benchmark import compare_results, load_results, run_benchmarks, save_results, synthetic_ohlc
+from chart_patterns.chart_patterns.utils import check_ohlc_names
+
+
+
+def test_run_benchmarks(tmp_path):
+    """
+    Test the benchmarks are run on every series and saved to a results file
+    """
+
+    done    = {}
+    results = run_benchmarks(sizes=[300], synthetic_sizes=[500], detectors=["pivots", "flag"], repeat=1, plots=False,
+                             callback=done.__setitem__)
+
+    assert sorted(results["results"]) == ["flag/eurusd-300", "flag/synthetic-500", "pivots/eurusd-300", "pivots/synthetic-500"]
+    assert done == results["results"]
+    for result in results["results"].values():
+        assert result["seconds"] > 0 and result["peak_memory"] > 0
+    assert results["results"]["pivots/eurusd-300"]["matches"] > 0
+
+    save_results(results, tmp_path / "results.json")
+    assert load_results(tmp_path / "results.json") == results
+
+
+def test_compare_results():
+    """
+    Test the regressions against the baseline are found with the thresholds
+    """
+
+    baseline = {"version": 1, "results": {"flag/eurusd-300": {"rows": 300, "seconds": 0.1, "peak_memory": 1000, "matches": 2},
+                                          "plot_flag/eurusd-300": {"rows": 300, "error": "no kaleido"}}}
+    results  = copy.deepcopy(baseline)
+    assert compare_results(results, baseline) == []
+
+    results["results"]["flag/eurusd-300"]["seconds"] = 0.2
+    assert len(compare_results(results, baseline)) == 1
+    assert compare_results(results, baseline, time_threshold=2.5) == []
+
+    results["results"]["flag/eurusd-300"]["matches"] = 3
+    results["results"]["flag/eurusd-300"]["peak_memory"] = 2000
+    assert len(compare_results(results, baseline)) == 3
+
+    with pytest.raises(ValueError):
+        compare_results({"version": 2, "results": {}}, baseline)
+
+
+def test_synthetic_ohlc():
+    """
+    Test the synthetic series has valid OHLC columns
+    """
+
+    ohlc = synthetic_ohlc(1000)
+    check_ohlc_names(ohlc)
+
+    assert len(ohlc) == 1000
+    assert (ohlc["high"] >= ohlc[["open", "close"]].max(axis=1)).all()
+    assert (ohlc["low"] <= ohlc[["open", "close"]].min(axis=1)).all()
@@ -0,0 +1,97 @@
+import numpy as np
+import os
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.cache import ResultCache
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.pivot_points import find_pivot_strength
+from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+
+
+def test_result_cache(tmp_path):
+    """
+    Test a cached result is the same as running the detector, and is only read back for the same data and parameters
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:3000,:].reset_index()
+    cache = ResultCache(str(tmp_path))
+
+    flags = cache.run(ohlc, "flag")
+    pd.testing.assert_frame_equal(flags.to_frame(), find_flag_pattern(ohlc.copy(), readonly=True).to_frame())
+    assert len(os.listdir(tmp_path)) == 1
+
+    pd.testing.assert_frame_equal(cache.run(ohlc, "flag").to_frame(), flags.to_frame())
+    assert len(os.listdir(tmp_path)) == 1
+
+    # The defaults are part of the key, a different parameter or different prices are another entry
+    assert cache.key(ohlc, "flag", {}) == cache.key(ohlc, "flag", {"lookback": 25, "progress": True})
+    assert cache.key(ohlc, "flag", {}) != cache.key(ohlc, "flag", {"lookback": 30})
+    assert cache.key(ohlc, "flag", {}) != cache.key(ohlc, "pennant", {})
+
+    changed = ohlc.copy()
+    changed.loc[10, "High"] += 1e-5
+    assert cache.key(ohlc, "flag", {}) != cache.key(changed, "flag", {})
+
+    matches = cache.run(ohlc, "scan", patterns={"double": {"double": "both"}})
+    pd.testing.assert_frame_equal(matches.to_frame(),
+                                  scan_all_patterns(ohlc.copy(), {"double": {"double": "both"}}, sparse=True).to_frame())
+
+    with pytest.raises(ValueError):
+        cache.run(ohlc, "flag", rlimit=0.9)
+
+
+def test_result_cache_eviction(tmp_path):
+    """
+    Test the least recently used entries are removed when the cache is too large, and a broken entry is a miss
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:3000,:].reset_index()
+    cache = ResultCache(str(tmp_path))
+
+    keys = []
+    for lookback in [20, 25, 30]:
+        cache.run(ohlc, "double", lookback=lookback, double="both")
+        keys.append(cache.key(ohlc, "double", {"lookback": lookback, "double": "both"}))
+        os.utime(cache._entry(keys[-1]), ns=(lookback * 10**9, lookback * 10**9))
+
+    sizes           = [os.path.getsize(cache._entry(key)) for key in keys]
+    cache.max_bytes = sizes[1] + sizes[2]
+    cache.evict()
+
+    assert [cache.get(key) is not None for key in keys] == [False, True, True]
+    assert cache.nbytes <= cache.max_bytes
+
+    with open(cache._entry(keys[1]), "wb") as file:
+        file.write(b"PK broken")
+
+    assert cache.get(keys[1]) is None and not os.path.exists(cache._entry(keys[1]))
+    assert len(cache.run(ohlc, "double", lookback=25, double="both")) > 0
+
+    cache.clear()
+    assert cache.nbytes == 0
+
+
+def test_result_cache_strength(tmp_path):
+    """
+    Test the pivot strength index and the engine are not part of the key, and numpy scalars are
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:3000,:].reset_index()
+    cache = ResultCache(str(tmp_path))
+
+    strength = find_pivot_strength(ohlc)
+    matches  = cache.run(ohlc, "hs", strength=strength)
+    pd.testing.assert_frame_equal(matches.to_frame(), find_head_and_shoulders(ohlc.copy(), readonly=True).to_frame())
+
+    assert cache.key(ohlc, "hs", {"strength": strength}) == cache.key(ohlc, "hs", {})
+    assert cache.key(ohlc, "flag", {"engine": "python"}) == cache.key(ohlc, "flag", {})
+    assert cache.key(ohlc, "flag", {"lookback": np.int64(25), "r_max": np.float32(0.5)}) == \
+           cache.key(ohlc, "flag", {"lookback": 25, "r_max": 0.5})
+    assert len(cache.run(ohlc, "flag", lookback=np.int64(25))) == len(cache.run(ohlc, "flag"))
+
+    with pytest.raises(ValueError):
+        cache.key(ohlc, "hs", {"head_ratio_before": object()})
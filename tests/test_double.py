@@ -33,3 +33,32 @@ def test_find_doubles_top_pattern():
     assert df.shape[0] == 2
     
     
+def test_find_doubles_engines():
+    """
+    Test the numpy engine finds the same doubles patterns as the python engine
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:2000,:].reset_index()
+
+    for double in ["tops", "bottoms", "both"]:
+        fast = find_doubles_pattern(ohlc.copy(), double=double, engine="numpy")
+        slow = find_doubles_pattern(ohlc.copy(), double=double, engine="python")
+
+        assert fast["double_type"].tolist() == slow["double_type"].tolist()
+        assert fast["double_idx"].apply(list).tolist() == slow["double_idx"].apply(list).tolist()
+        assert fast["double_point"].apply(list).tolist() == slow["double_point"].apply(list).tolist()
+
+
+def test_find_doubles_both_pattern():
+    """
+    Test finding both doubles patterns gives the tops and the bottoms
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:2000,:].reset_index()
+    tops    = find_doubles_pattern(ohlc.copy(), double="tops")
+    bottoms = find_doubles_pattern(ohlc.copy(), double="bottoms")
+    both    = find_doubles_pattern(ohlc.copy(), double="both")
+
+    assert (both["double_type"] == "tops").sum() == (tops["double_type"] == "tops").sum()
+    assert (both["double_type"] == "bottoms").sum() == (bottoms["double_type"] == "bottoms").sum()
+    assert (both["double_type"] == "bottoms").sum() > 0
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.doubles import find_doubles_pattern
+from chart_patterns.chart_patterns.engines import get_engine, get_kernel, numba_available, resolve_engine, set_engine
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders_all import find_all_head_and_shoulders
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.pennant import find_pennant
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points, find_pivot_codes
+from chart_patterns.chart_patterns.regression import linregress_pivot_windows
+from chart_patterns.chart_patterns.scan import (rescan_appended, scan_all_patterns, scan_all_patterns_chunked,
+                                                scan_all_patterns_stream, scan_state)
+from chart_patterns.chart_patterns.triangles import find_triangle_pattern
+
+
+
+def found_patterns(ohlc: pd.DataFrame, columns: list) -> list:
+    """
+    Get the candlestick index and the values of the columns of the patterns found
+    """
+
+    found = ohlc[ohlc[columns[0]].str.len() > 0]
+
+    return [(idx, [np.asarray(row[column], dtype=float).tolist() for column in columns]) for idx, row in found.iterrows()]
+
+
+def test_engines_same_patterns():
+    """
+    Test every engine finds the same patterns
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:1500,:].reset_index()
+
+    detectors = [(find_flag_pattern, {}, ["flag_highs_idx", "flag_lows", "flag_slmax"]),
+                 (find_pennant, {}, ["pennant_highs_idx", "pennant_lows", "pennant_slmin"]),
+                 (find_triangle_pattern, {"triangle_type": "symmetrical"}, ["triangle_high_idx", "triangle_low_idx"]),
+                 (find_doubles_pattern, {"double": "both"}, ["double_idx", "double_point"])]
+
+    for find, params, columns in detectors:
+        expected = found_patterns(find(ohlc.copy(), engine="python", **params), columns)
+        for engine in ["numpy", "numba"]:
+            assert found_patterns(find(ohlc.copy(), engine=engine, **params), columns) == expected
+
+
+def test_set_engine():
+    """
+    Test the global engine is used when no engine is given
+    """
+
+    previous = set_engine("python")
+    try:
+        assert get_engine() == "python"
+        assert resolve_engine() == "python"
+        assert resolve_engine("numpy") == "numpy"
+        assert get_kernel("doubles") is get_kernel("doubles", "python")
+    finally:
+        set_engine(previous)
+
+    with pytest.raises(ValueError):
+        set_engine("cuda")
+
+
+def test_numba_pivot_codes():
+    """
+    Test the numba pivot codes are the same as the numpy ones, or that the numpy engine is used without numba
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:3000,:]
+    high = ohlc["High"].to_numpy(dtype=float)
+    low  = ohlc["Low"].to_numpy(dtype=float)
+    high[10] = np.nan
+
+    if not numba_available():
+        with pytest.warns(UserWarning):
+            assert resolve_engine("numba") == "numpy"
+        return
+
+    codes = get_kernel("pivot_codes", "numba")(high, low, 5, 5)
+    np.testing.assert_array_equal(codes, find_pivot_codes(high, low, 5, 5))
+
+
+def test_numba_kernels():
+    """
+    Test the numba candidates, doubles and strength kernels give the same results as the numpy ones
+    """
+
+    if not numba_available():
+        return
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:5000,:].reset_index()
+    ohlc  = find_all_pivot_points(ohlc)
+    index = PivotIndex.from_ohlc(ohlc)
+    fits  = linregress_pivot_windows(index, len(ohlc), 25)
+
+    kernels = [("flag_candidates", {}), ("flag_candidates", {"slope_max": -1, "slope_min": -1}),
+               ("pennant_candidates", {"r_max": 0.5, "r_min": 0.5}),
+               ("triangle_candidates", {"triangle_type": "symmetrical", "rlimit": 0.5}),
+               ("triangle_candidates", {"triangle_type": "ascending", "rlimit": 0.5}),
+               ("triangle_candidates", {"triangle_type": "descending", "rlimit": 0.5}),
+               ("triangle_candidates", {"triangle_type": "wedge"})]
+
+    for name, params in kernels:
+        np.testing.assert_array_equal(get_kernel(name, "numba")(index, fits, len(ohlc), 25, **params),
+                                      get_kernel(name, "numpy")(index, fits, len(ohlc), 25, **params))
+
+    for double in ["tops", "bottoms", "both"]:
+        expected = get_kernel("doubles", "numpy")(index, len(ohlc), 25, double)
+        assert len(expected) > 0
+        assert get_kernel("doubles", "numba")(index, len(ohlc), 25, double) == expected
+
+    high = ohlc["high"].to_numpy(dtype=float)
+    high[10:20] = np.nan
+    np.testing.assert_array_equal(get_kernel("extreme_reach", "numba")(high), get_kernel("extreme_reach", "python")(high))
+
+
+def test_scan_engines():
+    """
+    Test the scans take an engine and find the same patterns with every engine
+    """
+
+    ohlc     = pd.read_csv("./data/eurusd-4h.csv").iloc[:2000,:].reset_index()
+    patterns = {"double": {"double": "both"}, "hs": {}}
+    expected = scan_all_patterns(ohlc, patterns, sparse=True, readonly=True).to_frame()
+
+    for engine in ["python", "numba"]:
+        found = scan_all_patterns_chunked(ohlc, patterns, chunk_size=700, workers=1, sparse=True, engine=engine)
+        pd.testing.assert_frame_equal(found.to_frame(), expected)
+
+        found = PatternMatches.from_results(scan_all_patterns_stream([ohlc.iloc[:1000], ohlc.iloc[1000:]], patterns, engine=engine))
+        pd.testing.assert_frame_equal(found.to_frame(), expected)
+
+        state, _ = rescan_appended(ohlc, scan_state(ohlc.iloc[:1500], patterns, engine=engine), engine=engine)
+        pd.testing.assert_frame_equal(state.matches.to_frame(), expected)
+
+        pd.testing.assert_frame_equal(find_all_head_and_shoulders(ohlc, readonly=True, engine=engine).to_frame(),
+                                      find_all_head_and_shoulders(ohlc, readonly=True).to_frame())
+
+    with pytest.raises(ValueError):
+        scan_all_patterns_chunked(ohlc, patterns, engine="cuda")
+    with pytest.raises(ValueError):
+        list(scan_all_patterns_stream([ohlc], patterns, engine="cuda"))
+    with pytest.raises(ValueError):
+        find_all_head_and_shoulders(ohlc.copy(), engine="cuda")
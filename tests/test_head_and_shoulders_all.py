@@ -0,0 +1,42 @@
+import pandas as pd 
+import pytest
+import os 
+
+
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.head_and_shoulders_all import find_all_head_and_shoulders
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import find_inverse_head_and_shoulders
+
+
+def test_find_all_head_and_shoulders():
+    """
+    Test finding both head and shoulders patterns together gives the same patterns as finding them one by one
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc = ohlc.iloc[:8000,:].reset_index()
+
+    both = find_all_head_and_shoulders(ohlc.copy())
+    hs   = find_head_and_shoulders(ohlc.copy())
+    ihs  = find_inverse_head_and_shoulders(ohlc.copy())
+
+    for name, ohlc_single in [("hs", hs), ("ihs", ihs)]:
+        expected = ohlc_single[ohlc_single[f"{name}_idx"].str.len()>0]
+        found    = both[both[f"{name}_idx"].str.len()>0]
+
+        assert found.shape[0] > 0
+        assert found.index.tolist() == expected.index.tolist()
+        assert found[f"{name}_idx"].apply(list).tolist() == expected[f"{name}_idx"].apply(list).tolist()
+        assert found[f"{name}_point"].apply(list).tolist() == expected[f"{name}_point"].apply(list).tolist()
+        assert (found["chart_type"] == name).all()
+
+
+def test_find_all_head_and_shoulders_intervals():
+    """
+    Test the pivot intervals are checked
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:200,:].reset_index()
+
+    with pytest.raises(ValueError):
+        find_all_head_and_shoulders(ohlc, pivot_interval=5, short_pivot_interval=5)
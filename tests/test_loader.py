@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.loader import DATE_FORMAT, iter_ohlc_csv, parse_dates, read_ohlc_csv
+from chart_patterns.chart_patterns.utils import check_ohlc_names
+
+
+
+def test_read_ohlc_csv():
+    """
+    Test loading the data file gives the parsed dates, the prices and the OHLC column names
+    """
+
+    ohlc     = read_ohlc_csv("./data/eurusd-4h.csv")
+    expected = pd.read_csv("./data/eurusd-4h.csv")
+
+    assert list(ohlc.columns) == ["date", "open", "high", "low", "close", "volume"]
+    assert list(check_ohlc_names(ohlc.copy()).columns) == list(ohlc.columns)
+    assert ohlc["volume"].dtype == np.float32
+
+    np.testing.assert_array_equal(ohlc["date"].to_numpy(), pd.to_datetime(expected["Date"], format=DATE_FORMAT).to_numpy())
+    np.testing.assert_array_equal(ohlc["high"].to_numpy(), expected["High"].to_numpy())
+
+    flags    = find_flag_pattern(ohlc.iloc[:1000,:].copy())
+    expected = find_flag_pattern(expected.iloc[:1000,:].reset_index())
+    assert flags["flag_point"].dropna().tolist() == expected["flag_point"].dropna().tolist()
+
+
+def test_read_ohlc_csv_chunks():
+    """
+    Test reading the file in chunks gives the same dataframe
+    """
+
+    ohlc   = read_ohlc_csv("./data/eurusd-4h.csv")
+    chunks = list(iter_ohlc_csv("./data/eurusd-4h.csv", chunksize=10_000))
+
+    assert [len(chunk) for chunk in chunks] == [10_000, 10_000, len(ohlc) - 20_000]
+    pd.testing.assert_frame_equal(pd.concat(chunks), ohlc)
+    pd.testing.assert_frame_equal(read_ohlc_csv("./data/eurusd-4h.csv", chunksize=7_000), ohlc)
+
+
+def test_parse_dates():
+    """
+    Test the timestamps not in the exact layout are parsed by pandas and the invalid ones are rejected
+    """
+
+    dates = parse_dates(np.array(["04.05.2003 21:00:00.000", "29.02.2004 23:59:59.999"], dtype=object))
+    np.testing.assert_array_equal(dates, np.array(["2003-05-04T21:00:00.000", "2004-02-29T23:59:59.999"], dtype="datetime64[ms]"))
+
+    dates = parse_dates(np.array(["4.5.2003 21:00:00.000"], dtype=object))
+    np.testing.assert_array_equal(dates, np.array(["2003-05-04T21:00:00"], dtype="datetime64[ms]"))
+
+    for date in ["31.04.2003 21:00:00.000", "04.05.2003 24:00:00.000", "04.05.2003 21:60:00.000"]:
+        with pytest.raises(ValueError):
+            parse_dates(np.array(["04.05.2003 21:00:00.000", date], dtype=object))
+
+    # Leap seconds are left to pandas, which accepts them
+    dates = parse_dates(np.array(["04.05.2003 21:00:60.000"], dtype=object))
+    np.testing.assert_array_equal(dates, pd.to_datetime(["04.05.2003 21:00:60.000"], format=DATE_FORMAT).to_numpy())
+
+
+def test_read_ohlc_csv_empty(tmp_path):
+    """
+    Test a file with only the header gives the same empty dataframe with and without chunks
+    """
+
+    pd.read_csv("./data/eurusd-4h.csv").iloc[:0,:].to_csv(tmp_path / "empty.csv", index=False)
+
+    ohlc = read_ohlc_csv(str(tmp_path / "empty.csv"))
+    assert ohlc.shape[0] == 0
+    assert ohlc.columns.tolist()[1:5] == ["open", "high", "low", "close"]
+    pd.testing.assert_frame_equal(read_ohlc_csv(str(tmp_path / "empty.csv"), chunksize=10), ohlc)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.matches import CHART_TYPES, PATTERN_TYPES, PatternMatches
+from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+
+def test_pattern_matches_frame():
+    """
+    Test the compact table gives back the same dataframe as `scan_all_patterns`
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:8000,:].reset_index()
+
+    expected = scan_all_patterns(ohlc.copy())
+    matches  = scan_all_patterns(ohlc.copy(), sparse=True)
+
+    assert len(matches) == expected.shape[0]
+    assert matches.nbytes < expected.memory_usage(deep=True).sum()
+    pd.testing.assert_frame_equal(matches.to_frame(), expected)
+    pd.testing.assert_frame_equal(PatternMatches.from_frame(expected).to_frame(), expected)
+
+
+def test_pattern_matches_select():
+    """
+    Test selecting the patterns of one chart type
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:8000,:].reset_index()
+    matches = scan_all_patterns(ohlc, sparse=True)
+    frame   = matches.to_frame()
+
+    for chart_type in ["flag", "triangle", "double", "hs"]:
+        selected = matches.select(chart_type).to_frame()
+        expected = frame[frame["chart_type"] == chart_type].dropna(axis=1, how="all").reset_index(drop=True)
+
+        assert selected.shape[0] > 0
+        pd.testing.assert_frame_equal(selected, expected[selected.columns], check_dtype=False)
+
+    assert len(PatternMatches().select("flag")) == 0
+    assert PatternMatches().to_frame().columns.tolist() == ["candle_idx", "chart_type"]
+
+
+def test_pattern_matches_take_concat():
+    """
+    Test splitting the table and joining the parts back, and the keys of the patterns
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:3000,:].reset_index()
+    matches = scan_all_patterns(ohlc, sparse=True)
+    parts   = [matches.take(np.arange(0, 20)), PatternMatches(), matches.take(np.arange(20, len(matches)))]
+
+    pd.testing.assert_frame_equal(PatternMatches.concat(parts).to_frame(), matches.to_frame())
+    assert matches.take([7]).keys() == [matches.keys()[7]]
+    assert len(set(matches.keys())) == len(matches)
+
+
+def test_pattern_matches_codes():
+    """
+    Test the chart and pattern types are stored as codes and the triangle points have their prices
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:8000,:].reset_index()
+    matches = scan_all_patterns(ohlc, {"triangle": [{"triangle_type": "ascending"}, {"triangle_type": "descending"}]}, sparse=True)
+
+    assert len(matches) > 0
+    assert matches.records.dtype["chart_type"].itemsize == matches.records.dtype["pattern_type"].itemsize == 1
+    assert {CHART_TYPES[code] for code in matches.records["chart_type"]} == {"triangle"}
+    assert {PATTERN_TYPES[code] for code in matches.records["pattern_type"]} <= {"ascending", "descending"}
+
+    points = matches.points
+    np.testing.assert_array_equal(points["price"][points["kind"] == 2], ohlc["high"].to_numpy()[points["idx"][points["kind"] == 2]])
+    np.testing.assert_array_equal(points["price"][points["kind"] == 1], ohlc["low"].to_numpy()[points["idx"][points["kind"] == 1]])
+
+    # Read back from the dataframe with the prices of the series
+    from_frame = PatternMatches.from_frame(matches.to_frame(), ohlc["high"].to_numpy(), ohlc["low"].to_numpy())
+    np.testing.assert_array_equal(from_frame.points, matches.points)
+    assert np.isnan(PatternMatches.from_frame(matches.to_frame()).points["price"]).all()
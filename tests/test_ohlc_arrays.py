@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.doubles import find_doubles_pattern
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders_all import find_all_head_and_shoulders
+from chart_patterns.chart_patterns.ohlc_arrays import OHLCArrays
+from chart_patterns.chart_patterns.pennant import find_pennant
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
+from chart_patterns.chart_patterns.triangles import find_triangle_pattern
+
+
+
+def test_ohlc_arrays():
+    """
+    Test the container holds views of the float columns and its slices are views too
+    """
+
+    ohlc   = pd.read_csv("./data/eurusd-4h.csv")
+    arrays = OHLCArrays.from_frame(ohlc)
+
+    assert len(arrays) == len(ohlc)
+    assert np.shares_memory(arrays.high, ohlc["High"].to_numpy())
+    assert not arrays.low.flags.writeable
+    assert list(ohlc.columns) == ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+    part = arrays[1000:3000]
+    assert len(part) == 2000 and np.shares_memory(part.close, arrays.close)
+    np.testing.assert_array_equal(part.high, ohlc["High"].to_numpy()[1000:3000])
+
+    with pytest.raises(ValueError):
+        OHLCArrays(arrays.open, arrays.high, arrays.low[:10], arrays.close)
+
+    with pytest.raises(ValueError):
+        arrays[::2]
+
+
+def test_find_patterns_ohlc_arrays():
+    """
+    Test every detector finds the same patterns in a slice of the container as in the dataframe slice
+    """
+
+    ohlc   = pd.read_csv("./data/eurusd-4h.csv")
+    arrays = OHLCArrays.from_frame(ohlc)[2000:5000]
+    frame  = ohlc.iloc[2000:5000,:].reset_index()
+
+    codes = find_all_pivot_points(arrays)
+    np.testing.assert_array_equal(codes, find_all_pivot_points(frame.copy())["pivot"].to_numpy())
+
+    detectors = [(find_flag_pattern, {}, "flag_point"), (find_pennant, {}, "pennant_point"),
+                 (find_triangle_pattern, {"triangle_type": "symmetrical"}, "triangle_high_idx"),
+                 (find_doubles_pattern, {"double": "both"}, "double_idx")]
+
+    for find, params, column in detectors:
+        expected = find(frame.copy(), **params)
+        expected = expected.index[expected[column].notna() if expected[column].dtype != object else
+                                  expected[column].str.len() > 0].tolist()
+
+        assert find(arrays, **params).records["candle_idx"].tolist() == expected
+
+    matches  = find_all_head_and_shoulders(arrays)
+    expected = find_all_head_and_shoulders(frame.copy())
+    assert matches.records["candle_idx"].tolist() == expected.index[expected["chart_type"] != ""].tolist()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.pivot_cache import PivotCache
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
+
+
+
+def test_pivot_cache_hits():
+    """
+    Test repeat pivot requests on the same data and window are served from the cache
+    """
+
+    cache = PivotCache()
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc  = ohlc.iloc[:500,:].reset_index()
+
+    expected = find_all_pivot_points(ohlc.copy(), cache=False)
+    first    = find_all_pivot_points(ohlc.copy(), cache=cache)
+    second   = find_all_pivot_points(ohlc.copy(), cache=cache)
+    find_all_pivot_points(ohlc.copy(), left_count=5, right_count=5, cache=cache)
+
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+    # Different prices must not hit the cache
+    ohlc.loc[10, "High"] = ohlc.loc[10, "High"] + 1
+    find_all_pivot_points(ohlc.copy(), cache=cache)
+    assert cache.stats()["misses"] == 3
+
+
+def test_pivot_cache_eviction():
+    """
+    Test the least recently used entries are evicted when over the memory limit
+    """
+
+    codes = np.zeros(100, dtype=np.int64)
+    cache = PivotCache(max_bytes=2 * codes.nbytes)
+
+    cache.put(("a", 3, 3), codes)
+    cache.put(("b", 3, 3), codes)
+    cache.get(("a", 3, 3))
+    cache.put(("c", 3, 3), codes)
+
+    assert cache.get(("b", 3, 3)) is None
+    assert cache.get(("a", 3, 3)) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["nbytes"] <= cache.max_bytes
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.charts_utils import find_points
+from chart_patterns.chart_patterns.pivot_index import PivotIndex
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
+
+
+
+def test_pivot_index_window():
+    """
+    Test the pivot points of a window are the same as scanning the window
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc  = ohlc.iloc[:500,:].reset_index()
+    ohlc  = find_all_pivot_points(ohlc)
+    index = PivotIndex.from_ohlc(ohlc)
+
+    for start, stop in [(0, 26), (100, 126), (480, 500), (10, 10)]:
+        sub_ohlc = ohlc.iloc[start:stop]
+        maxim, minim, xxmax, xxmin = index.window(start, stop)
+
+        np.testing.assert_array_equal(xxmax, sub_ohlc.index[sub_ohlc["pivot"] == 2])
+        np.testing.assert_array_equal(maxim, sub_ohlc.loc[sub_ohlc["pivot"] == 2, "high"])
+        np.testing.assert_array_equal(xxmin, sub_ohlc.index[sub_ohlc["pivot"] == 1])
+        np.testing.assert_array_equal(minim, sub_ohlc.loc[sub_ohlc["pivot"] == 1, "low"])
+
+        pivot_indx, pivots = index.pivots(start, stop)
+        np.testing.assert_array_equal(pivot_indx, sub_ohlc.index[sub_ohlc["pivot"] != 0])
+        np.testing.assert_array_equal(pivots, sub_ohlc.loc[sub_ohlc["pivot"] != 0, "pivot_pos"])
+
+    # The window points are views of the index arrays
+    assert index.window(100, 126)[0].base is not None
+
+
+def test_find_points_without_index():
+    """
+    Test the points of a window are the same with and without a prebuilt pivot index
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc  = ohlc.iloc[:500,:].reset_index()
+    ohlc  = find_all_pivot_points(ohlc, left_count=5, right_count=5, name_pivot="short_pivot")
+    index = PivotIndex.from_ohlc(ohlc, "short_pivot")
+
+    for candle_idx in [20, 60, 250, 499]:
+        expected = find_points(ohlc, candle_idx, 20, index)
+        result   = find_points(ohlc, candle_idx, 20)
+        for expected_value, value in zip(expected, result):
+            np.testing.assert_array_equal(value, expected_value)
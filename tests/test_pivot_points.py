@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.pivot_points import (_extreme_reach, _extreme_reach_loop, find_all_pivot_points, find_pivot_codes,
+                                                       find_pivot_strength)
+
+
+
+def test_find_all_pivot_points_numpy_matches_python():
+    """
+    Test the numpy engine gives the same pivot points as the row by row engine
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc = ohlc.iloc[:600,:].reset_index()
+
+    expected = find_all_pivot_points(ohlc.copy(), engine="python")
+    expected = find_all_pivot_points(expected, left_count=5, right_count=2, name_pivot="short_pivot", engine="python")
+    result   = find_all_pivot_points(ohlc.copy())
+    result   = find_all_pivot_points(result, left_count=5, right_count=2, name_pivot="short_pivot")
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_find_all_pivot_points_short_series():
+    """
+    Test a series shorter than the pivot window has no pivot points
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc = ohlc.iloc[:5,:].reset_index()
+    ohlc = find_all_pivot_points(ohlc)
+
+    assert (ohlc["pivot"] == 0).all()
+    assert ohlc["pivot_pos"].isna().all()
+
+
+def test_pivot_strength_matches_pivot_codes():
+    """
+    Test the pivot strength index gives the same pivot points as a full scan for any window
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc = ohlc.iloc[:2000,:].reset_index()
+    ohlc.loc[100:110, "High"] = ohlc.loc[100, "High"] # Add ties
+
+    strength = find_pivot_strength(ohlc)
+    high     = ohlc["high"].to_numpy()
+    low      = ohlc["low"].to_numpy()
+
+    for left_count, right_count in [(0, 0), (1, 4), (3, 3), (5, 5), (10, 10), (25, 2)]:
+        expected = find_pivot_codes(high, low, left_count, right_count)
+        np.testing.assert_array_equal(strength.pivot_codes(left_count, right_count), expected)
+
+
+def test_extreme_reach_vectorized():
+    """
+    Test the vectorized reach is the same as the monotonic stack, with ties, NaN and long trends across the blocks
+    """
+
+    rng = np.random.default_rng(0)
+    for size in [0, 1, 31, 32, 33, 500]:
+        values = rng.integers(0, 5, size).astype(float)
+        values[rng.random(size) < 0.1] = np.nan
+        np.testing.assert_array_equal(_extreme_reach(values), _extreme_reach_loop(values))
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    for values in [ohlc["Low"].to_numpy(), -ohlc["High"].to_numpy(), -np.abs(np.arange(5000) - 2500.0)]:
+        np.testing.assert_array_equal(_extreme_reach(values), _extreme_reach_loop(values))
@@ -0,0 +1,107 @@
+import json
+import numpy as np
+import os
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.plotting import ChartTemplate, decimate_ohlc, export_chart_patterns
+from chart_patterns.chart_patterns.pivot_points import find_all_pivot_points
+from chart_patterns.chart_patterns.scan import scan_all_patterns
+
+
+
+def test_export_chart_patterns(tmp_path):
+    """
+    Test the charts of all the patterns are written by the worker processes and their paths returned
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:1500,:].reset_index()
+    flags = find_flag_pattern(ohlc.copy())
+    found = flags.index[flags["chart_type"] == "flag"].tolist()
+
+    paths = export_chart_patterns(flags, "flag", folder=str(tmp_path / "flags"), image_format="json", workers=2)
+
+    assert paths == [str(tmp_path / "flags" / f"fig{idx}.json") for idx in found]
+    assert len(found) > 1 and all(os.path.exists(path) for path in paths)
+
+    with open(paths[0]) as file:
+        figure = json.load(file)
+    assert figure["data"][0]["type"] == "candlestick"
+
+
+def test_export_chart_patterns_matches(tmp_path):
+    """
+    Test the charts of a patterns table are the same in this process and in the workers
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:1500,:].reset_index()
+    matches = scan_all_patterns(ohlc.copy(), {"double": {"double": "both"}}, sparse=True)
+
+    serial   = export_chart_patterns(ohlc.copy(), "double", folder=str(tmp_path / "serial"), matches=matches,
+                                     image_format="html", workers=1)
+    parallel = export_chart_patterns(ohlc.copy(), "double", folder=str(tmp_path / "parallel"), matches=matches,
+                                     image_format="html", workers=2)
+
+    assert len(serial) == len(matches) and [os.path.basename(path) for path in serial] == [os.path.basename(path) for path in parallel]
+
+    with pytest.raises(ValueError):
+        export_chart_patterns(ohlc, "double", image_format="gif")
+
+
+def test_export_chart_patterns_inputs(tmp_path):
+    """
+    Test the chart exports leave the column names of the dataframe of the caller unchanged
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:1500,:].reset_index()
+    columns = list(ohlc.columns)
+    matches = scan_all_patterns(ohlc.copy(), {"double": {"double": "both"}}, sparse=True)
+
+    export_chart_patterns(ohlc, "double", folder=str(tmp_path / "matches"), matches=matches, image_format="json", workers=1)
+    assert list(ohlc.columns) == columns
+
+    flags   = find_flag_pattern(ohlc.copy()).rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close"})
+    columns = list(flags.columns)
+
+    export_chart_patterns(flags, "flag", folder=str(tmp_path / "flags"), image_format="json", workers=1)
+    assert list(flags.columns) == columns
+
+
+def test_decimate_ohlc():
+    """
+    Test the merged candlesticks keep the open, highest high, lowest low and close of their bars
+    """
+
+    ohlc      = pd.read_csv("./data/eurusd-4h.csv").iloc[:1003,:].reset_index()
+    ohlc      = ohlc.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close"})
+    decimated = decimate_ohlc(ohlc, 100)
+
+    assert len(decimated) == 92 and decimated.index[:3].tolist() == [0, 11, 22]
+    assert decimated["high"].iloc[1] == ohlc["high"].iloc[11:22].max()
+    assert decimated["low"].iloc[-1] == ohlc["low"].iloc[1001:].min()
+    assert decimated["open"].iloc[0] == ohlc["open"].iloc[0] and decimated["close"].iloc[-1] == ohlc["close"].iloc[-1]
+    assert decimated["high"].max() == ohlc["high"].max() and decimated["low"].min() == ohlc["low"].min()
+
+
+def test_chart_template():
+    """
+    Test the template figure is reused and the long series are decimated with their extreme pivot points
+    """
+
+    ohlc     = pd.read_csv("./data/eurusd-4h.csv").iloc[:3000,:].reset_index()
+    ohlc     = find_all_pivot_points(ohlc)
+    template = ChartTemplate()
+
+    fig = template.render(ohlc.iloc[:60], lines=[([1, 5], [1.1, 1.2])])
+    assert len(fig.data[0].x) == 60 and list(fig.data[3].x) == [1, 5] and len(fig.data[4].x) == 0
+    assert fig.data[2].y.max() == ohlc.loc[:59].loc[ohlc["pivot"] == 2, "pivot_pos"].max()
+
+    fig_long = template.render(ohlc, max_bars=200)
+    assert fig_long is fig and len(fig.data[0].x) == 200 and len(fig.data[3].x) == 0
+    assert np.max(fig.data[0].high) == ohlc["high"].max()
+    assert len(fig.data[2].x) <= 200 and fig.data[2].y.max() == ohlc.loc[ohlc["pivot"] == 2, "pivot_pos"].max()
+
+    with pytest.raises(ValueError):
+        template.render(ohlc, lines=[([], [])] * 3)
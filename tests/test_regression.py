@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.regression import linregress_points, linregress_windows
+from scipy.stats import linregress
+
+
+
+def test_linregress_windows_matches_scipy():
+    """
+    Test the batched regression gives the same numbers as scipy linregress on pivot like windows
+    """
+
+    ohlc   = pd.read_csv("./data/eurusd-4h.csv")
+    x      = np.sort(np.random.default_rng(0).choice(len(ohlc), 3000, replace=False)).astype(float)
+    y      = ohlc["Low"].to_numpy()[x.astype(int)]
+    starts = np.arange(0, 2990)
+    stops  = starts + np.random.default_rng(1).integers(2, 10, len(starts))
+
+    slope, intercept, r = linregress_windows(x, y, starts, stops)
+
+    for k in range(len(starts)):
+        expected = linregress(x[starts[k]:stops[k]], y[starts[k]:stops[k]])
+        np.testing.assert_allclose([slope[k], intercept[k], r[k]], [expected.slope, expected.intercept, expected.rvalue],
+                                   rtol=1e-9, atol=1e-12)
+
+
+def test_linregress_points_edge_cases():
+    """
+    Test the single and constant point cases behave like scipy linregress
+    """
+
+    slope, intercept, r = linregress_points(np.array([5.0]), np.array([1.1]))
+    assert np.isnan(slope) and np.isnan(intercept) and r == 0.0
+
+    slope, intercept, r = linregress_points(np.array([1.0, 4.0, 6.0]), np.array([1.1, 1.1, 1.1]))
+    assert slope == 0.0 and intercept == 1.1 and r == 0.0
+
+    slope, intercept, r = linregress_windows(np.array([1.0, 2.0]), np.array([1.0, 2.0]), [1], [1])
+    assert np.isnan(slope[0]) and np.isnan(r[0])
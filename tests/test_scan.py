@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.doubles import find_doubles_pattern
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import find_inverse_head_and_shoulders
+from chart_patterns.chart_patterns.matches import PatternMatches
+from chart_patterns.chart_patterns.pennant import find_pennant
+from chart_patterns.chart_patterns.pivot_points import find_pivot_strength
+from chart_patterns.chart_patterns.scan import (rescan_appended, scan_all_patterns, scan_all_patterns_chunked,
+                                               scan_all_patterns_stream, scan_state)
+from chart_patterns.chart_patterns.triangles import find_triangle_pattern
+
+
+
+def assert_same_matches(matches: pd.DataFrame, ohlc: pd.DataFrame, columns: list):
+    """
+    Check the matches are the same as the patterns found by the batch function
+    """
+
+    assert matches["candle_idx"].tolist() == ohlc.index[ohlc[columns[0]].str.len() > 0].tolist()
+
+    for _, match in matches.iterrows():
+        for column in columns:
+            np.testing.assert_array_equal(np.asarray(match[column], dtype=float),
+                                          np.asarray(ohlc.at[match["candle_idx"], column], dtype=float))
+
+
+def test_scan_all_patterns():
+    """
+    Test the single pass scan finds the same patterns as the `find_*` functions
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc    = ohlc.iloc[:1500,:].reset_index()
+    matches = scan_all_patterns(ohlc.copy(), {"flag": {}, "pennant": {}, "triangle": [{"triangle_type": "ascending"}, 
+                                             {"triangle_type": "symmetrical"}], "double": [{"double": "tops"}, {"double": "bottoms"}]})
+
+    flags = matches[matches["chart_type"] == "flag"]
+    assert_same_matches(flags, find_flag_pattern(ohlc.copy()), ["flag_highs_idx", "flag_lows", "flag_slmax", "flag_intercmin"])
+
+    pennants = matches[matches["chart_type"] == "pennant"]
+    assert_same_matches(pennants, find_pennant(ohlc.copy()), ["pennant_highs_idx", "pennant_lows", "pennant_slmin"])
+
+    for triangle_type in ["ascending", "symmetrical"]:
+        triangles = matches[matches["triangle_type"] == triangle_type]
+        assert_same_matches(triangles, find_triangle_pattern(ohlc.copy(), triangle_type=triangle_type), 
+                            ["triangle_high_idx", "triangle_low_idx", "triangle_slmax"])
+
+    for double in ["tops", "bottoms"]:
+        doubles = matches[matches["double_type"] == double]
+        assert_same_matches(doubles, find_doubles_pattern(ohlc.copy(), double=double), ["double_idx", "double_point"])
+        assert len(doubles) > 0
+
+
+def test_scan_all_head_and_shoulders():
+    """
+    Test the single pass scan finds the same head and shoulders patterns
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc    = ohlc.iloc[4100:5000,:].reset_index()
+    matches = scan_all_patterns(ohlc.copy(), {"hs": {}, "ihs": {}})
+
+    assert_same_matches(matches[matches["chart_type"] == "hs"], find_head_and_shoulders(ohlc.copy()), ["hs_idx", "hs_point"])
+    assert_same_matches(matches[matches["chart_type"] == "ihs"], find_inverse_head_and_shoulders(ohlc.copy()), ["ihs_idx", "ihs_point"])
+
+
+def test_scan_all_patterns_chunked():
+    """
+    Test scanning the chunks of the series in parallel gives the same result as scanning it at once
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:6000,:].reset_index()
+
+    expected = scan_all_patterns(ohlc.copy())
+    for chunk_size, workers in [(500, 2), (1234, 1)]:
+        found = scan_all_patterns_chunked(ohlc.copy(), chunk_size=chunk_size, workers=workers)
+        pd.testing.assert_frame_equal(found, expected)
+
+
+def test_scan_all_patterns_stream(tmp_path):
+    """
+    Test scanning a CSV file or chunks of bars one at a time gives the same result as scanning the series at once
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:6000,:]
+    ohlc.to_csv(tmp_path / "ohlc.csv", index=False)
+
+    expected = scan_all_patterns(ohlc.copy(), sparse=True).to_frame()
+
+    found = PatternMatches.from_results(scan_all_patterns_stream(str(tmp_path / "ohlc.csv"), chunksize=1000))
+    pd.testing.assert_frame_equal(found.to_frame(), expected)
+
+    chunks = (ohlc.iloc[start:start + 7] for start in range(0, len(ohlc), 7))
+    found  = PatternMatches.from_results(scan_all_patterns_stream(chunks))
+    pd.testing.assert_frame_equal(found.to_frame(), expected)
+
+
+def test_scan_all_patterns_stream_lazy():
+    """
+    Test the patterns are yielded before the whole history is read
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv").iloc[:6000,:]
+    read = []
+
+    def chunks():
+        for start in range(0, len(ohlc), 500):
+            read.append(start)
+            yield ohlc.iloc[start:start + 500]
+
+    candle_idx, match = next(scan_all_patterns_stream(chunks(), {"double": {"double": "both"}}))
+
+    assert match["chart_type"] == "double" and candle_idx < read[-1] + 500 and len(read) < 12
+
+
+def test_rescan_appended():
+    """
+    Test rescanning the appended bars gives the same patterns as scanning the whole series again
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:4000,:].reset_index()
+    state = scan_state(ohlc.iloc[:3000])
+    added = removed = 0
+
+    for length in range(3006, 4000, 6):
+        state, diff = rescan_appended(ohlc.iloc[:length], state)
+        added      += len(diff.added)
+        removed    += len(diff.removed)
+
+        if length % 300 == 0:
+            expected = scan_all_patterns(ohlc.iloc[:length].copy(), sparse=True)
+            pd.testing.assert_frame_equal(state.matches.to_frame(), expected.to_frame())
+
+    expected = scan_all_patterns(ohlc.iloc[:state.length].copy(), sparse=True)
+    pd.testing.assert_frame_equal(state.matches.to_frame(), expected.to_frame())
+    assert added - removed == len(expected) - len(scan_all_patterns(ohlc.iloc[:3000].copy(), sparse=True))
+
+    with pytest.raises(ValueError):
+        rescan_appended(ohlc.iloc[:100], state)
+
+
+def test_find_patterns_readonly():
+    """
+    Test the read-only mode finds the same patterns without changing the dataframe
+    """
+
+    ohlc     = pd.read_csv("./data/eurusd-4h.csv").iloc[:6000,:].reset_index()
+    original = ohlc.copy()
+
+    matches = find_flag_pattern(ohlc, readonly=True).to_frame()
+    assert_same_matches(matches, find_flag_pattern(original.copy()), ["flag_highs_idx", "flag_lows", "flag_slmax", "flag_intercmin"])
+
+    matches = find_triangle_pattern(ohlc, triangle_type="symmetrical", readonly=True).to_frame()
+    assert_same_matches(matches, find_triangle_pattern(original.copy(), triangle_type="symmetrical"), 
+                        ["triangle_high_idx", "triangle_low_idx", "triangle_slmin"])
+
+    matches = find_doubles_pattern(ohlc, double="both", readonly=True).to_frame()
+    assert_same_matches(matches, find_doubles_pattern(original.copy(), double="both"), ["double_idx", "double_point"])
+
+    matches = find_head_and_shoulders(ohlc, readonly=True).to_frame()
+    assert_same_matches(matches, find_head_and_shoulders(original.copy()), ["hs_idx", "hs_point"])
+    assert len(matches) > 0
+
+    pd.testing.assert_frame_equal(ohlc, original)
+
+
+def test_readonly_engine_strength():
+    """
+    Test the read-only detectors use the engine and the pivot strength index they are given
+    """
+
+    ohlc     = pd.read_csv("./data/eurusd-4h.csv").iloc[:2000,:].reset_index()
+    strength = find_pivot_strength(ohlc)
+    expected = find_head_and_shoulders(ohlc.copy(), readonly=True).to_frame()
+
+    for engine in ["python", "numba"]:
+        found = find_head_and_shoulders(ohlc, readonly=True, engine=engine, strength=strength)
+        pd.testing.assert_frame_equal(found.to_frame(), expected)
+
+    with pytest.raises(ValueError):
+        find_flag_pattern(ohlc, readonly=True, engine="cuda")
+
+    with pytest.raises(ValueError):
+        find_inverse_head_and_shoulders(ohlc, readonly=True, strength=find_pivot_strength(ohlc.iloc[:100,:]))
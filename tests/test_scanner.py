@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.doubles import find_doubles_pattern
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.inverse_head_and_shoulders import find_inverse_head_and_shoulders
+from chart_patterns.chart_patterns.pennant import find_pennant
+from chart_patterns.chart_patterns.scanner import PatternScanner, _HeadShouldersScanner, _WindowScanner
+from chart_patterns.chart_patterns.triangles import find_triangle_pattern
+
+
+
+def replay(ohlc: pd.DataFrame, patterns: dict) -> list:
+    """
+    Replay the candles bar by bar through a PatternScanner
+    """
+
+    scanner = PatternScanner(patterns)
+    matches = []
+    for high, low in zip(ohlc["High"], ohlc["Low"]):
+        matches += scanner.update(high, low)
+
+    return matches + scanner.flush()
+
+
+def assert_same_matches(matches: list, ohlc: pd.DataFrame, chart_type: str):
+    """
+    Check the scanner matches are the same as the patterns found by the batch function
+    """
+
+    expected = ohlc.index[ohlc["chart_type"] == chart_type].tolist()
+    assert sorted(candle_idx for candle_idx, _ in matches) == expected
+    assert len(expected) > 0
+
+    for candle_idx, result in matches:
+        for column, value in result.items():
+            if isinstance(value, str):
+                assert ohlc.loc[candle_idx, column] == value
+            else:
+                np.testing.assert_array_equal(np.asarray(value, dtype=float), np.asarray(ohlc.at[candle_idx, column], dtype=float))
+
+
+@pytest.mark.parametrize("rows, pattern, params, find", [
+    ((900, 1200), "flag", {}, find_flag_pattern),
+    ((3400, 3600), "pennant", {}, find_pennant),
+    ((7200, 7400), "triangle", {"triangle_type": "ascending"}, find_triangle_pattern),
+    ((0, 160), "triangle", {"triangle_type": "symmetrical"}, find_triangle_pattern),
+    ((0, 37), "double", {"double": "bottoms"}, find_doubles_pattern),
+    ((400, 440), "double", {"double": "tops"}, find_doubles_pattern),
+    ((4100, 4400), "hs", {}, find_head_and_shoulders),
+    ((4700, 5000), "ihs", {}, find_inverse_head_and_shoulders),
+])
+def test_pattern_scanner_matches_batch(rows, pattern, params, find):
+    """
+    Test replaying the candles bar by bar finds the same patterns as the batch functions
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc    = ohlc.iloc[rows[0]:rows[1],:].reset_index()
+    matches = replay(ohlc, {pattern: params})
+
+    assert_same_matches(matches, find(ohlc, **params), pattern)
+
+
+def test_pattern_scanner_all_patterns():
+    """
+    Test all the scanners run together on a longer history
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc    = ohlc.iloc[:1500,:].reset_index()
+    matches = replay(ohlc, None)
+
+    flags = [match for match in matches if match[1]["chart_type"] == "flag"]
+    assert_same_matches(flags, find_flag_pattern(ohlc.copy()), "flag")
+
+
+def test_pattern_scanner_order():
+    """
+    Test the matches of each bar are ordered by candlestick, and a scanner without a check cannot be built
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:1500,:].reset_index()
+    scanner = PatternScanner({"hs": {}, "flag": {}, "double": {"double": "both"}})
+
+    for high, low in zip(ohlc["High"], ohlc["Low"]):
+        matches = scanner.update(high, low)
+        assert [candle_idx for candle_idx, _ in matches] == sorted(candle_idx for candle_idx, _ in matches)
+
+    class NoCheckScanner(_WindowScanner):
+        pass
+
+    class NoCheckHeadShouldersScanner(_HeadShouldersScanner):
+        pivot_code = 2
+
+    with pytest.raises(TypeError):
+        NoCheckScanner(25)
+
+    with pytest.raises(TypeError):
+        NoCheckHeadShouldersScanner()
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.loader import read_ohlc_csv
+from chart_patterns.chart_patterns.scan import scan_all_patterns, scan_all_patterns_chunked
+from chart_patterns.chart_patterns.store import OHLCStore
+
+
+
+def test_store_append(tmp_path):
+    """
+    Test the store holds the bars written and appended, and another reader sees the appended bars after a refresh
+    """
+
+    ohlc   = read_ohlc_csv("./data/eurusd-4h.csv").iloc[:3000,:]
+    store  = OHLCStore.create(str(tmp_path / "eurusd"), ohlc.iloc[:2000,:])
+    reader = OHLCStore(str(tmp_path / "eurusd"))
+
+    store.append(ohlc.iloc[2000:,:])
+    assert len(store) == 3000 and len(reader) == 2000
+
+    reader.refresh()
+    pd.testing.assert_frame_equal(reader.to_frame(), ohlc.reset_index(drop=True))
+    assert isinstance(reader.column("high"), np.memmap)
+    assert not reader.column("high").flags.writeable
+
+    with pytest.raises(ValueError):
+        store.append(ohlc.iloc[:10,:])
+
+    with pytest.raises(ValueError):
+        OHLCStore.create(str(tmp_path / "eurusd"), ohlc)
+
+
+def test_store_scan(tmp_path):
+    """
+    Test the detectors find the same patterns in the store as in the dataframe
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:4000,:].reset_index()
+    store = OHLCStore.create(str(tmp_path / "eurusd"), ohlc)
+
+    expected = scan_all_patterns(ohlc.copy())
+    pd.testing.assert_frame_equal(scan_all_patterns(store), expected)
+    pd.testing.assert_frame_equal(scan_all_patterns_chunked(store, chunk_size=1500, workers=2), expected)
+
+    flags = find_flag_pattern(store, readonly=True).to_frame()
+    assert flags["candle_idx"].tolist() == expected.loc[expected["chart_type"] == "flag", "candle_idx"].tolist()
+
+
+def test_store_overwrite(tmp_path):
+    """
+    Test overwriting a store leaves the columns mapped by a reader unchanged and no temporary directory behind
+    """
+
+    ohlc   = read_ohlc_csv("./data/eurusd-4h.csv").iloc[:3000,:]
+    OHLCStore.create(str(tmp_path / "eurusd"), ohlc)
+    reader = OHLCStore(str(tmp_path / "eurusd"))
+    high   = reader.column("high")
+
+    store = OHLCStore.create(str(tmp_path / "eurusd"), ohlc.iloc[:100,:], overwrite=True)
+
+    assert len(store) == 100
+    np.testing.assert_array_equal(high, ohlc["high"].to_numpy())
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["eurusd"]
+
+    # The header switches to a new data directory and the old one is removed
+    files = sorted(path.name for path in (tmp_path / "eurusd").iterdir())
+    assert len(files) == 2 and files[0].startswith("data-") and files[1] == "meta.json"
+    assert files[0] != reader.meta["data"]
+
+    reader.refresh()
+    pd.testing.assert_frame_equal(reader.to_frame(), ohlc.iloc[:100,:].reset_index(drop=True))
+
+
+def test_store_append_undated(tmp_path):
+    """
+    Test bars without a date column can be appended after dated bars
+    """
+
+    ohlc  = read_ohlc_csv("./data/eurusd-4h.csv").iloc[:200,:]
+    store = OHLCStore.create(str(tmp_path / "eurusd"), ohlc.iloc[:100,:])
+
+    store.append(ohlc.iloc[100:,:].drop(columns=["date"]))
+
+    assert len(store) == 200
+    assert (store.column("timestamp")[100:] == 0).all()
+    np.testing.assert_array_equal(store.column("high"), ohlc["high"].to_numpy())
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+import os
+
+
+from chart_patterns.chart_patterns.pivot_points import find_pivot_point
+from chart_patterns.chart_patterns.streaming import StreamingPivotDetector
+from chart_patterns.chart_patterns.utils import check_ohlc_names
+
+
+
+def test_streaming_pivot_detector():
+    """
+    Test the streaming pivot points are the same as the ones from `find_pivot_point`
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc = ohlc.iloc[:400,:].reset_index()
+    ohlc = check_ohlc_names(ohlc)
+
+    for left_count, right_count in [(3, 3), (5, 2), (10, 10)]:
+        detector = StreamingPivotDetector(left_count, right_count)
+        codes    = np.zeros(len(ohlc), dtype=int)
+
+        for high, low in zip(ohlc["high"], ohlc["low"]):
+            event = detector.update(high, low)
+            if event is not None:
+                assert event.index == detector.confirmed
+                codes[event.index] = event.pivot
+
+        expected = [find_pivot_point(ohlc, idx, left_count, right_count) for idx in range(len(ohlc))]
+        np.testing.assert_array_equal(codes, expected)
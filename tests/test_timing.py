@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+import threading
+
+
+from chart_patterns.chart_patterns.flag import find_flag_pattern
+from chart_patterns.chart_patterns.head_and_shoulders import find_head_and_shoulders
+from chart_patterns.chart_patterns.timing import collect_stats, stage, STAGES
+
+
+
+def test_collect_stats():
+    """
+    Test the stages of the detectors run inside the context are timed and the windows are counted
+    """
+
+    ohlc  = pd.read_csv("./data/eurusd-4h.csv").iloc[:1500,:].reset_index()
+    calls = []
+
+    with collect_stats(lambda detector, name, seconds: calls.append((detector, name))) as stats:
+        flags = find_flag_pattern(ohlc.copy())
+        find_flag_pattern(ohlc.copy())
+        find_head_and_shoulders(ohlc.copy())
+
+    result = stats.to_dict()
+    assert sorted(result) == ["flag", "hs"]
+
+    flag = result["flag"]
+    assert list(flag["stages"]) == STAGES
+    assert all(stats["calls"] == 2 for stats in flag["stages"].values())
+    assert flag["seconds"] == pytest.approx(sum(stats["seconds"] for stats in flag["stages"].values()))
+    assert flag["windows_evaluated"] + flag["windows_skipped"] == 2 * (len(ohlc) - 25)
+    assert flag["windows_evaluated"] >= 2 * (flags["flag_point"].notna().sum())
+
+    assert result["hs"]["windows_evaluated"] > 0
+    assert calls.count(("flag", "check")) == 2
+
+
+def test_stats_disabled():
+    """
+    Test nothing is recorded outside of the context
+    """
+
+    with collect_stats() as stats:
+        pass
+
+    find_flag_pattern(pd.read_csv("./data/eurusd-4h.csv").iloc[:200,:].reset_index())
+    with stage("flag", "check"):
+        pass
+
+    assert stats.to_dict() == {}
+
+
+def test_stats_per_thread():
+    """
+    Test the collections of two threads do not mix
+    """
+
+    ohlc    = pd.read_csv("./data/eurusd-4h.csv").iloc[:500,:].reset_index()
+    results = {}
+
+    def collect(name, find):
+        with collect_stats() as stats:
+            find(ohlc.copy())
+        results[name] = stats.to_dict()
+
+    threads = [threading.Thread(target=collect, args=("flag", find_flag_pattern)),
+               threading.Thread(target=collect, args=("hs", find_head_and_shoulders))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results["flag"]) == ["flag"]
+    assert sorted(results["hs"]) == ["hs"]
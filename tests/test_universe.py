@@ -0,0 +1,77 @@
+import pandas as pd 
+import pytest
+import os 
+
+
+from chart_patterns.chart_patterns.scan import scan_all_patterns
+from chart_patterns.chart_patterns.universe import scan_universe
+
+
+PATTERNS = {"flag": {}, "double": [{"double": "tops"}, {"double": "bottoms"}], "hs": {}}
+
+
+def test_scan_universe():
+    """
+    Test scanning many symbols on a process pool gives the same patterns as scanning them one by one
+    """
+
+    ohlc     = pd.read_csv("./data/eurusd-4h.csv")
+    universe = {"eurusd": ohlc.iloc[:3000,:].reset_index(), "eurusd_2": ohlc.iloc[4000:5000,:].reset_index()}
+
+    results = scan_universe(universe, PATTERNS, workers=2)
+
+    for symbol, ohlc_symbol in universe.items():
+        expected = scan_all_patterns(ohlc_symbol.copy(), PATTERNS)
+        found    = results[symbol].matches
+
+        assert results[symbol].errors == {}
+        assert found.shape[0] == expected.shape[0] > 0
+        assert sorted(zip(found["candle_idx"], found["chart_type"])) == sorted(zip(expected["candle_idx"], expected["chart_type"]))
+
+
+def test_scan_universe_errors(tmp_path):
+    """
+    Test a bad symbol does not stop the scan of a directory of CSV files
+    """
+
+    ohlc = pd.read_csv("./data/eurusd-4h.csv")
+    ohlc.iloc[:1000,:].to_csv(tmp_path / "good.csv", index=False)
+    ohlc.iloc[:1000,:].drop(columns=["Low"]).to_csv(tmp_path / "bad.csv", index=False)
+
+    results = scan_universe(str(tmp_path), {"double": {"double": "both"}}, workers=1)
+
+    assert sorted(results) == ["bad", "good"]
+    assert results["good"].errors == {}
+    assert results["good"].matches.shape[0] > 0
+    assert "double" in results["bad"].errors
+    assert results["bad"].matches.shape[0] == 0
+
+
+class _KillWorker:
+    """
+    Symbol source that kills the worker process unpickling it
+    """
+
+    def __len__(self) -> int:
+        return 10**6
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def test_scan_universe_dead_worker():
+    """
+    Test a worker process dying only fails its own symbol and the other symbols are scanned again
+    """
+
+    ohlc     = pd.read_csv("./data/eurusd-4h.csv")
+    universe = {"eurusd": ohlc.iloc[:1000,:].reset_index(), "crash": _KillWorker(), "eurusd_2": ohlc.iloc[4000:5000,:].reset_index()}
+
+    results = scan_universe(universe, PATTERNS, workers=2)
+
+    assert sorted(results["crash"].errors) == sorted(PATTERNS)
+    assert all(error.startswith("BrokenProcessPool") for error in results["crash"].errors.values())
+    for symbol in ["eurusd", "eurusd_2"]:
+        expected = scan_all_patterns(universe[symbol].copy(), PATTERNS)
+        assert results[symbol].errors == {}
+        assert results[symbol].matches.shape[0] == expected.shape[0] > 0